@@ -74,7 +74,7 @@ setup(
     keywords=["vivarium", "medyan"],
     name="vivarium_medyan",
     package_data={
-        '': ['templates/*']},
+        '': ['templates/*', 'benchmarks/baselines.json']},
     packages=find_packages(exclude=["tests", "*.tests", "*.tests.*"]),
     python_requires=">=3.8",
     setup_requires=setup_requirements,
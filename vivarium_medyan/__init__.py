@@ -14,3 +14,28 @@ def get_module_version():
 
 
 from .processes.medyan import MedyanProcess  # noqa: F401
+from .processes.fiber_observables import FiberObservables  # noqa: F401
+
+from vivarium.core.registry import (
+    divider_registry,
+    emitter_registry,
+    serializer_registry,
+    updater_registry,
+)
+from .library.fiber_arrays import (
+    FiberArrays,
+    FiberArraysSerializer,
+    divide_fiber_arrays,
+    update_fiber_arrays,
+)
+from .library.trajectory import FiberTrajectoryEmitter
+
+# register updaters, dividers and serializers for the compact fiber state
+updater_registry.register("fiber_arrays", update_fiber_arrays)
+divider_registry.register("fiber_arrays", divide_fiber_arrays)
+serializer_registry.register(
+    "fiber_arrays", FiberArraysSerializer(), alternate_keys=(str(FiberArrays),)
+)
+
+# write fiber trajectories to columnar chunks on disk
+emitter_registry.register("fiber_trajectory", FiberTrajectoryEmitter)
@@ -0,0 +1,79 @@
+"""
+Step many MedyanProcess instances from one asyncio event loop with
+async_next_update, against stepping them one after another. Each
+instance runs the fake engine as a subprocess that first waits for
+--delay seconds, standing in for a MEDYAN run, so the concurrent steps
+should take about as long as the slowest one.
+
+    python -m vivarium_medyan.benchmarks.async_steps [--instances N] [--delay S]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from vivarium_medyan.benchmarks.executor import random_fibers
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+
+
+def delayed_medyan(directory, delay):
+    return MedyanProcess(
+        {
+            "time_step": 10.0,
+            "input_directory": str(Path(directory) / "in"),
+            "output_directory": str(Path(directory) / "out"),
+            "template_directory": TEMPLATE_DIRECTORY,
+            "runner": "binary",
+            "medyan_command": [
+                sys.executable,
+                "-m",
+                "vivarium_medyan.library.fake_medyan",
+                "--delay",
+                str(delay),
+            ],
+            "isolate_workspace": True,
+        }
+    )
+
+
+async def step_all(processes, states):
+    return await asyncio.gather(
+        *[process.async_next_update(10.0, states) for process in processes]
+    )
+
+
+def main(instances=8, delay=1.0, n_fibers=1000):
+    states = random_fibers(n_fibers, 10)
+    with tempfile.TemporaryDirectory() as directory:
+        processes = [delayed_medyan(directory, delay) for _ in range(instances)]
+        start = time.perf_counter()
+        for process in processes:
+            process.next_update(10.0, states)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run(step_all(processes, states))
+        concurrent = time.perf_counter() - start
+
+        single = time.perf_counter()
+        asyncio.run(step_all(processes[:1], states))
+        single = time.perf_counter() - single
+
+    print(f"{instances} instances, {delay} s per MEDYAN run")
+    print(f"sequential next_update:  {sequential:7.2f} s")
+    print(f"one async_next_update:   {single:7.2f} s")
+    print(f"{instances} concurrent:           {concurrent:7.2f} s")
+    return {"sequential": sequential, "single": single, "concurrent": concurrent}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+    main(args.instances, args.delay)
@@ -0,0 +1,74 @@
+"""
+Throughput of many isolated MedyanProcess instances stepped together
+through MedyanExecutor with the fake runner, for an increasing number
+of workers.
+
+    python -m vivarium_medyan.benchmarks.executor [--kind process] [--instances N]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from vivarium_medyan.library.executor import MedyanExecutor
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+
+
+def random_fibers(n_fibers, points_per_fiber, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.0, 2000.0, (n_fibers, points_per_fiber, 3))
+    return {
+        "fibers": {
+            str(fiber_id): {"type_name": "Actin-Polymer", "points": points[fiber_id]}
+            for fiber_id in range(n_fibers)
+        }
+    }
+
+
+def main(kind="process", instances=16, n_fibers=1000, points_per_fiber=20):
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= multiprocessing.cpu_count():
+        worker_counts.append(worker_counts[-1] * 2)
+    states = random_fibers(n_fibers, points_per_fiber)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        processes = [
+            MedyanProcess(
+                {
+                    "time_step": 10.0,
+                    "input_directory": str(Path(directory) / "in"),
+                    "output_directory": str(Path(directory) / "out"),
+                    "template_directory": TEMPLATE_DIRECTORY,
+                    "runner": "fake",
+                    "isolate_workspace": True,
+                }
+            )
+            for _ in range(instances)
+        ]
+        for workers in worker_counts:
+            with MedyanExecutor(max_workers=workers, kind=kind) as executor:
+                # warm up the workers before timing
+                executor.map(processes[:workers], 10.0, [states] * workers)
+                start = time.perf_counter()
+                executor.map(processes, 10.0, [states] * instances)
+                elapsed = time.perf_counter() - start
+            results[workers] = instances / elapsed
+            print(
+                f"{workers:>3} workers: {results[workers]:7.2f} steps/s "
+                f"(speedup {results[workers] / results[1]:.2f})"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", default="process", choices=["thread", "process"])
+    parser.add_argument("--instances", type=int, default=16)
+    args = parser.parse_args()
+    main(args.kind, args.instances)
@@ -0,0 +1,65 @@
+"""
+Compare the memory held by 10^5 fibers in the dict form
+(a list of point arrays per fiber) and as FiberArrays.
+
+    python -m vivarium_medyan.benchmarks.fiber_arrays
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+
+N_FIBERS = 10**5
+POINTS_PER_FIBER = 10
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fibers = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fibers, elapsed, current
+
+
+def main(n_fibers=N_FIBERS, points_per_fiber=POINTS_PER_FIBER):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0.0, 2000.0, (n_fibers, points_per_fiber, 3))
+    type_names = ["Actin-Polymer", "Microtubule"]
+
+    def build_dict():
+        return {
+            str(fiber_id): {
+                "type_name": type_names[fiber_id % 2],
+                "points": [np.array(point) for point in points[fiber_id].tolist()],
+            }
+            for fiber_id in range(n_fibers)
+        }
+
+    fibers, dict_time, dict_bytes = measure(build_dict)
+    arrays, arrays_time, arrays_bytes = measure(lambda: FiberArrays.from_dict(fibers))
+    start = time.perf_counter()
+    arrays.to_dict()
+    to_dict_time = time.perf_counter() - start
+
+    print(f"{n_fibers} fibers x {points_per_fiber} points")
+    print(f"dict form:   {dict_bytes / 1e6:9.2f} MB  built in {dict_time:.3f} s")
+    print(
+        f"FiberArrays: {arrays_bytes / 1e6:9.2f} MB  converted in "
+        f"{arrays_time:.3f} s ({arrays.nbytes / 1e6:.2f} MB of arrays)"
+    )
+    print(f"to_dict:     {to_dict_time:.3f} s")
+    return {
+        "dict_bytes": dict_bytes,
+        "arrays_bytes": arrays_bytes,
+        "dict_seconds": dict_time,
+        "arrays_seconds": arrays_time,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per step overhead of MedyanProcess.next_update with the runner pool
+off (a new runner each step) and on (warm runners shared between steps).
+Uses the fake MEDYAN executable unless --docker is given.
+
+    python -m vivarium_medyan.benchmarks.runner_pool [--docker] [--steps N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+FAKE_MEDYAN = [sys.executable, "-m", "vivarium_medyan.library.fake_medyan"]
+
+
+def time_steps(parameters, steps):
+    medyan = MedyanProcess(parameters)
+    # the first step pays for starting pooled runners
+    medyan.next_update(parameters["time_step"], initial_fibers)
+    start = time.perf_counter()
+    for _ in range(steps):
+        medyan.next_update(parameters["time_step"], initial_fibers)
+    elapsed = (time.perf_counter() - start) / steps
+    if parameters["runner_pool_size"] > 0:
+        medyan.runner_pool().shutdown()
+    return elapsed
+
+
+def main(docker=False, steps=5):
+    results = {}
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        for pool_size in (0, 1):
+            parameters = {
+                "time_step": 1.0,
+                "input_directory": str(Path(directory) / "in"),
+                "output_directory": str(Path(directory) / "out"),
+                "template_directory": TEMPLATE_DIRECTORY,
+                "runner": "docker" if docker else "binary",
+                "medyan_command": FAKE_MEDYAN,
+                "runner_pool_size": pool_size,
+                "workspace_root": directory,
+            }
+            results[pool_size] = time_steps(parameters, steps)
+    print(f"pool off: {results[0]:.3f} s per step")
+    print(f"pool on:  {results[1]:.3f} s per step")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docker", action="store_true")
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+    main(args.docker, args.steps)
@@ -0,0 +1,103 @@
+"""
+Compare peak memory and time of reading the whole snapshot.traj
+against reading only its last frame, on synthetic trajectories
+of 10^3 to 10^6 lines.
+
+    python -m vivarium_medyan.benchmarks.snapshot
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from vivarium_medyan.library.snapshot import read_last_frame, write_snapshot
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+FIBERS_PER_FRAME = 100
+POINTS_PER_FIBER = 4
+LINE_COUNTS = [10**3, 10**4, 10**5, 10**6]
+
+
+def synthetic_frames(n_frames, n_fibers=FIBERS_PER_FRAME, seed=0):
+    rng = np.random.default_rng(seed)
+    for frame in range(n_frames):
+        points = rng.uniform(0.0, 2000.0, (n_fibers, POINTS_PER_FIBER, 3))
+        fibers = [
+            (fiber_id, 0, points[fiber_id].tolist()) for fiber_id in range(n_fibers)
+        ]
+        yield float(frame), fibers
+
+
+def parse_fibers(snapshot_lines):
+    fibers = {}
+    index = 0
+    while index < len(snapshot_lines):
+        line = snapshot_lines[index]
+        if "FILAMENT" in line:
+            fiber_id = line.split(" ")[1]
+            fibers[fiber_id] = MedyanProcess.read_coordinates(snapshot_lines[index + 1])
+            index += 2
+        else:
+            index += 1
+    return fibers
+
+
+def read_whole(snapshot_path):
+    with open(snapshot_path, "r") as snapshot:
+        return parse_fibers(snapshot.read().split("\n"))
+
+
+def read_last(snapshot_path):
+    return parse_fibers(read_last_frame(snapshot_path))
+
+
+def measure(reader, snapshot_path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fibers = reader(snapshot_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fibers, elapsed, peak
+
+
+def main(line_counts=None):
+    line_counts = line_counts or LINE_COUNTS
+    lines_per_frame = 2 * FIBERS_PER_FRAME + 2
+    results = []
+    print(
+        f"{'lines':>9} {'frames':>7} {'MB':>8} "
+        f"{'whole s':>9} {'whole MB':>9} {'last s':>9} {'last MB':>9}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for n_lines in line_counts:
+            n_frames = max(1, n_lines // lines_per_frame)
+            snapshot_path = os.path.join(directory, f"snapshot_{n_lines}.traj")
+            write_snapshot(snapshot_path, synthetic_frames(n_frames))
+            size = os.path.getsize(snapshot_path) / 1e6
+            whole, whole_time, whole_peak = measure(read_whole, snapshot_path)
+            last, last_time, last_peak = measure(read_last, snapshot_path)
+            assert whole.keys() == last.keys()
+            print(
+                f"{n_lines:>9} {n_frames:>7} {size:>8.1f} "
+                f"{whole_time:>9.4f} {whole_peak / 1e6:>9.2f} "
+                f"{last_time:>9.4f} {last_peak / 1e6:>9.2f}"
+            )
+            results.append(
+                {
+                    "lines": n_lines,
+                    "frames": n_frames,
+                    "whole_seconds": whole_time,
+                    "whole_peak_bytes": whole_peak,
+                    "last_seconds": last_time,
+                    "last_peak_bytes": last_peak,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Radius and nearest segment queries through the compartment-aligned
+SegmentGrid against a brute-force scan over every segment, along with
+the time to build the grid and to update it after some fibers move.
+
+    python -m vivarium_medyan.benchmarks.spatial_index [--segments N ...] [--queries N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vivarium_medyan.data.networks import isotropic_network
+from vivarium_medyan.library.simplify import point_segment_distances
+from vivarium_medyan.library.spatial_index import SegmentGrid, fiber_segments
+
+BOX_EXTENT = np.array([7500.0, 7500.0, 7500.0])
+N_COMPARTMENTS = [15, 15, 15]
+COMPARTMENT_SIZE = [500.0, 500.0, 500.0]
+POINTS_PER_FIBER = 11  # ten segments per fiber
+
+
+def brute_force_radius(starts, ends, point, radius):
+    distances = point_segment_distances(
+        np.broadcast_to(point, starts.shape), starts, ends
+    )
+    return np.flatnonzero(distances <= radius)
+
+
+def brute_force_nearest(starts, ends, point):
+    distances = point_segment_distances(
+        np.broadcast_to(point, starts.shape), starts, ends
+    )
+    return distances.argmin()
+
+
+def timed(function, queries):
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(segment_counts=(10**4, 10**5, 10**6), n_queries=50, radius=100.0):
+    rng = np.random.default_rng(0)
+    queries = rng.uniform(0.0, 1.0, (n_queries, 3)) * BOX_EXTENT
+    results = {}
+    for n_segments in segment_counts:
+        n_fibers = n_segments // (POINTS_PER_FIBER - 1)
+        fibers = isotropic_network(
+            n_fibers, POINTS_PER_FIBER, BOX_EXTENT, fiber_length=500.0, seed=0
+        )
+        starts, ends, _, _ = fiber_segments(fibers.points, fibers.offsets)
+
+        grid = SegmentGrid(N_COMPARTMENTS, COMPARTMENT_SIZE)
+        start = time.perf_counter()
+        grid.update(fibers)
+        build = time.perf_counter() - start
+
+        # move one fiber in a hundred and update incrementally
+        moved = fibers.copy()
+        moved.points[: len(moved.points) // 100] += 1.0
+        start = time.perf_counter()
+        grid.update(moved)
+        update = time.perf_counter() - start
+        starts, ends, _, _ = fiber_segments(moved.points, moved.offsets)
+
+        result = {
+            "build": build,
+            "update": update,
+            "grid_radius": timed(lambda point: grid.radius(point, radius), queries),
+            "brute_radius": timed(
+                lambda point: brute_force_radius(starts, ends, point, radius), queries
+            ),
+            "grid_nearest": timed(grid.nearest, queries),
+            "brute_nearest": timed(
+                lambda point: brute_force_nearest(starts, ends, point), queries
+            ),
+        }
+        results[n_segments] = result
+        print(
+            f"{n_segments:>8} segments: build {result['build']:.3f} s, "
+            f"update 1% {result['update']:.3f} s"
+        )
+        for query in ["radius", "nearest"]:
+            grid_time = result[f"grid_{query}"]
+            brute_time = result[f"brute_{query}"]
+            print(
+                f"  {query:8} grid {grid_time * 1e3:8.3f} ms, brute force "
+                f"{brute_time * 1e3:8.3f} ms, {brute_time / grid_time:6.1f}x"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--segments", type=int, nargs="+", default=[10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--radius", type=float, default=100.0)
+    args = parser.parse_args()
+    main(args.segments, args.queries, args.radius)
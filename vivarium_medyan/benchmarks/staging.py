@@ -0,0 +1,60 @@
+"""
+Time the input staging phase of each step (copying configs and
+rendering systeminput.txt) with the staging cache on and off. Point
+--directory at a network filesystem to see the saving there.
+
+    python -m vivarium_medyan.benchmarks.staging [--directory PATH] [--steps N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+
+
+def time_staging(directory, staging_cache, steps):
+    medyan = MedyanProcess(
+        {
+            "time_step": 10.0,
+            "input_directory": str(Path(directory) / "in"),
+            "output_directory": str(Path(directory) / "out"),
+            "template_directory": TEMPLATE_DIRECTORY,
+            "isolate_workspace": True,
+            "staging_cache": staging_cache,
+        }
+    )
+    durations = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        medyan.move_configs_to_input_dir()
+        medyan.render_template(10.0)
+        durations.append(time.perf_counter() - start)
+    return durations, medyan.staging.stats
+
+
+def main(directory=None, steps=100):
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as workspace:
+        for staging_cache in (False, True):
+            durations, stats = time_staging(workspace, staging_cache, steps)
+            results[staging_cache] = {"durations": durations, **stats}
+            label = "cache on " if staging_cache else "cache off"
+            print(
+                f"{label}: first step {durations[0] * 1e3:7.3f} ms, "
+                f"later steps {sum(durations[1:]) / (steps - 1) * 1e3:7.3f} ms, "
+                f"{stats['files_written']} files / {stats['bytes_written']} bytes "
+                f"written, {stats['files_skipped']} files skipped"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--steps", type=int, default=100)
+    args = parser.parse_args()
+    main(args.directory, args.steps)
@@ -0,0 +1,193 @@
+"""
+Time the hot paths of MedyanProcess on generated fiber networks of
+increasing size, and compare how they scale against stored baselines
+so regressions are caught. Timings are kept as the per-fiber cost at
+each size relative to the per-fiber cost at REFERENCE_SIZE, which is
+always run: 1.0 means linear scaling, and the ratio does not depend on
+the speed of the machine. A benchmark fails when its ratio is larger
+than its baseline by more than the given factor.
+
+    python -m vivarium_medyan.benchmarks.suite [--sizes 1000 10000 100000]
+        [--network branched] [--save-baseline] [--factor 1.5]
+
+Baselines are saved to baselines.json with --save-baseline. It is run
+on pushes to main (see .github/workflows/build-main.yml) and with
+tox -e benchmarks.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from vivarium_medyan.data.networks import NETWORKS, network_state
+from vivarium_medyan.library.snapshot import write_snapshot
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+SIZES = [10**2, 10**3, 10**4, 10**5]
+REFERENCE_SIZE = 10**2
+POINTS_PER_FIBER = 10
+MIN_SECONDS = 0.2  # fast benchmarks are repeated for at least this long
+
+
+def best_time(function, repeat, min_seconds=MIN_SECONDS):
+    best = float("inf")
+    runs = 0
+    total = 0.0
+    while runs < repeat or total < min_seconds:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best
+
+
+def fake_medyan(directory, **parameters):
+    return MedyanProcess(
+        {
+            "time_step": 10.0,
+            "input_directory": str(Path(directory) / "in"),
+            "output_directory": str(Path(directory) / "out"),
+            "template_directory": TEMPLATE_DIRECTORY,
+            "transform_points": [2000.0, 1000.0, 1000.0],
+            "runner": "fake",
+            **parameters,
+        }
+    )
+
+
+def run_suite(sizes=None, network="branched", repeat=3):
+    """
+    Seconds taken by each benchmark, as {name: {size: seconds}}
+    """
+    sizes = sorted(set(sizes or SIZES) | {REFERENCE_SIZE})
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        medyan = fake_medyan(directory)
+        arrays_medyan = fake_medyan(directory, fiber_representation="arrays")
+        for size in sizes:
+            state = network_state(
+                network, size, points_per_fiber=POINTS_PER_FIBER, seed=0
+            )
+            arrays = state["fibers"]
+            fibers = arrays.to_dict()
+            copies = {fiber_id: dict(fiber) for fiber_id, fiber in fibers.items()}
+            snapshot_path = Path(directory) / f"snapshot_{size}.traj"
+            write_snapshot(
+                snapshot_path,
+                [
+                    (
+                        0.0,
+                        [
+                            (fiber_id, 0, fiber["points"])
+                            for fiber_id, fiber in fibers.items()
+                        ],
+                    )
+                ],
+            )
+            # create_fiber_input_file runs first, filling in the type names
+            # the snapshot's type indices refer to
+            benchmarks = {
+                "create_fiber_input_file": lambda: medyan.create_fiber_input_file(
+                    fibers
+                ),
+                "create_fiber_input_file_arrays": (
+                    lambda: arrays_medyan.create_fiber_input_file(arrays)
+                ),
+                "read_snapshot": lambda: medyan.read_snapshot(snapshot_path),
+                "read_snapshot_arrays": lambda: medyan.read_snapshot_arrays(
+                    snapshot_path
+                ),
+                # transform_fiber replaces the points of the fiber it is given,
+                # so it works on copies, leaving fibers where next_update expects
+                "transform_fiber": lambda: [
+                    medyan.transform_fiber(fiber) for fiber in copies.values()
+                ],
+                "transform_points": lambda: medyan.transform_points(arrays.points),
+                "next_update": lambda: medyan.next_update(10.0, {"fibers": fibers}),
+                "next_update_arrays": lambda: arrays_medyan.next_update(
+                    10.0, {"fibers": arrays}
+                ),
+            }
+            for name, benchmark in benchmarks.items():
+                seconds = best_time(benchmark, repeat)
+                results.setdefault(name, {})[str(size)] = seconds
+                print(f"{name:>32} {size:>9} fibers: {seconds:10.5f} s")
+    return results
+
+
+def scaling(results):
+    """
+    Per-fiber cost of each benchmark at each size, relative to its
+    per-fiber cost at REFERENCE_SIZE, as {name: {size: ratio}}
+    """
+    ratios = {}
+    for name, sizes in results.items():
+        reference = sizes[str(REFERENCE_SIZE)] / REFERENCE_SIZE
+        ratios[name] = {
+            size: seconds / int(size) / reference
+            for size, seconds in sizes.items()
+            if int(size) != REFERENCE_SIZE
+        }
+    return ratios
+
+
+def compare(ratios, baselines, factor):
+    """
+    Benchmarks scaling worse than factor times their baseline,
+    as (name, size, ratio, baseline ratio)
+    """
+    regressions = []
+    for name, sizes in ratios.items():
+        for size, ratio in sizes.items():
+            baseline = baselines.get(name, {}).get(size)
+            if baseline is not None and ratio > factor * baseline:
+                regressions.append((name, size, ratio, baseline))
+    return regressions
+
+
+def main(
+    sizes=None,
+    network="branched",
+    save_baseline=False,
+    factor=1.5,
+    baseline_path=BASELINE_PATH,
+):
+    ratios = scaling(run_suite(sizes, network))
+    baseline_path = Path(baseline_path)
+    baselines = {}
+    if baseline_path.exists():
+        baselines = json.loads(baseline_path.read_text()).get(network, {})
+    regressions = compare(ratios, baselines, factor)
+    for name, size, ratio, baseline in regressions:
+        print(
+            f"REGRESSION {name} at {size} fibers: per-fiber cost {ratio:.3f} "
+            f"times that at {REFERENCE_SIZE} fibers, against a baseline of "
+            f"{baseline:.3f}"
+        )
+    if save_baseline:
+        stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        for name, sizes in ratios.items():
+            stored.setdefault(network, {}).setdefault(name, {}).update(sizes)
+        baseline_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--network", default="branched", choices=sorted(NETWORKS))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--factor", type=float, default=1.5)
+    parser.add_argument("--baselines", default=str(BASELINE_PATH))
+    args = parser.parse_args()
+    regressions = main(
+        args.sizes, args.network, args.save_baseline, args.factor, args.baselines
+    )
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,86 @@
+"""
+Write and read throughput of fiber trajectories through vivarium's
+in-RAM emitter and the columnar fiber_trajectory emitter, plus random
+access to single frames of the written trajectory.
+
+    python -m vivarium_medyan.benchmarks.trajectory [--fibers N] [--frames N]
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from vivarium.core.emitter import RAMEmitter
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.trajectory import FiberTrajectoryEmitter
+
+
+def random_frames(n_fibers, points_per_fiber, n_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.0, 2000.0, (n_fibers, points_per_fiber, 3))
+    for step in range(n_frames):
+        fibers = {
+            str(fiber_id): {"type_name": "Actin-Polymer", "points": points[fiber_id]}
+            for fiber_id in range(n_fibers)
+        }
+        yield float(step), fibers
+        points = points + rng.normal(0.0, 1.0, points.shape)
+
+
+def emit_all(emitter, frames):
+    start = time.perf_counter()
+    for step, fibers in frames:
+        emitter.emit({"table": "history", "data": {"time": step, "fibers": fibers}})
+    if hasattr(emitter, "close"):
+        emitter.close()
+    return time.perf_counter() - start
+
+
+def main(n_fibers=10**4, points_per_fiber=10, n_frames=50):
+    frames = list(random_frames(n_fibers, points_per_fiber, n_frames))
+    megabytes = n_fibers * points_per_fiber * 3 * 8 * n_frames / 1e6
+    results = {}
+
+    ram = RAMEmitter({})
+    results["ram_write"] = emit_all(ram, frames)
+    start = time.perf_counter()
+    for data in ram.get_data().values():
+        FiberArrays.from_dict(data["fibers"])
+    results["ram_read"] = time.perf_counter() - start
+
+    for compress in [False, True]:
+        label = "npz" if compress else "npy"
+        with tempfile.TemporaryDirectory() as directory:
+            emitter = FiberTrajectoryEmitter(
+                {"path": directory, "chunk_size": 16, "compress": compress}
+            )
+            results[f"{label}_write"] = emit_all(emitter, frames)
+            reader = emitter.reader()
+            start = time.perf_counter()
+            for _, fibers in reader:
+                np.asarray(fibers.points).sum()
+            results[f"{label}_read"] = time.perf_counter() - start
+            start = time.perf_counter()
+            for index in np.random.default_rng(1).integers(0, n_frames, 20):
+                np.asarray(reader.frame(int(index))[1].points).sum()
+            results[f"{label}_random_frame"] = (time.perf_counter() - start) / 20
+
+    print(f"{n_fibers} fibers x {points_per_fiber} points x {n_frames} frames")
+    for name in ["ram", "npy", "npz"]:
+        print(
+            f"{name}: write {megabytes / results[f'{name}_write']:8.1f} MB/s, "
+            f"read {megabytes / results[f'{name}_read']:8.1f} MB/s"
+        )
+    for name in ["npy", "npz"]:
+        print(f"{name}: one random frame in {results[f'{name}_random_frame']:.4f} s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fibers", type=int, default=10**4)
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+    main(n_fibers=args.fibers, n_frames=args.frames)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+
 initial_fibers = {
     "fibers_box_extent": np.array([4000.0, 2000.0, 2000.0]),
     "fibers": {
@@ -215,3 +217,8 @@ initial_fibers = {
         },
     },
 }
+
+initial_fiber_arrays = {
+    "fibers_box_extent": initial_fibers["fibers_box_extent"],
+    "fibers": FiberArrays.from_dict(initial_fibers["fibers"]),
+}
@@ -0,0 +1,157 @@
+import numpy as np
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+
+DEFAULT_BOX_EXTENT = np.array([4000.0, 2000.0, 2000.0])
+ARP23_BRANCH_ANGLE = np.radians(70.0)
+
+
+def unit_vectors(rng, n):
+    """
+    Directions uniformly distributed on the sphere
+    """
+    vectors = rng.normal(size=(n, 3))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def straight_fibers(starts, directions, length, points_per_fiber):
+    """
+    (n, points_per_fiber, 3) points of straight fibers of the given
+    length(s) from each start along each direction
+    """
+    steps = np.linspace(0.0, 1.0, points_per_fiber)
+    lengths = np.broadcast_to(length, (len(starts),))
+    return (
+        starts[:, None, :]
+        + steps[None, :, None] * (directions * lengths[:, None])[:, None, :]
+    )
+
+
+def fiber_network(points, type_name="Actin-Polymer"):
+    """
+    FiberArrays of fibers with ids "0".."n-1" from (n, points_per_fiber, 3)
+    points, all of one type
+    """
+    n_fibers, points_per_fiber, _ = points.shape
+    return FiberArrays(
+        [str(fiber_id) for fiber_id in range(n_fibers)],
+        np.zeros(n_fibers, dtype=np.int32),
+        np.arange(n_fibers + 1, dtype=np.int64) * points_per_fiber,
+        points.reshape(-1, 3),
+        [type_name],
+    )
+
+
+def bundle_network(
+    n_fibers,
+    points_per_fiber=2,
+    box_extent=DEFAULT_BOX_EXTENT,
+    radius=100.0,
+    length_fraction=0.5,
+    seed=None,
+):
+    """
+    Parallel fibers along x, with starts spread over a disk of the given
+    radius around the center of the box and staggered along the bundle
+    """
+    rng = np.random.default_rng(seed)
+    box_extent = np.asarray(box_extent, dtype=np.float64)
+    length = length_fraction * box_extent[0]
+    # uniform over the disk's area
+    distance = radius * np.sqrt(rng.uniform(size=n_fibers))
+    angle = rng.uniform(0.0, 2 * np.pi, n_fibers)
+    starts = np.empty((n_fibers, 3))
+    starts[:, 0] = rng.uniform(0.0, box_extent[0] - length, n_fibers)
+    starts[:, 1] = box_extent[1] / 2 + distance * np.cos(angle)
+    starts[:, 2] = box_extent[2] / 2 + distance * np.sin(angle)
+    directions = np.tile([1.0, 0.0, 0.0], (n_fibers, 1))
+    points = straight_fibers(starts, directions, length, points_per_fiber)
+    return fiber_network(points)
+
+
+def isotropic_network(
+    n_fibers,
+    points_per_fiber=2,
+    box_extent=DEFAULT_BOX_EXTENT,
+    fiber_length=500.0,
+    seed=None,
+):
+    """
+    Straight fibers starting uniformly in the box, pointing in uniformly
+    random directions, clipped to the box
+    """
+    rng = np.random.default_rng(seed)
+    box_extent = np.asarray(box_extent, dtype=np.float64)
+    starts = rng.uniform(0.0, 1.0, (n_fibers, 3)) * box_extent
+    directions = unit_vectors(rng, n_fibers)
+    points = straight_fibers(starts, directions, fiber_length, points_per_fiber)
+    return fiber_network(np.clip(points, 0.0, box_extent))
+
+
+def branched_network(
+    n_fibers,
+    points_per_fiber=2,
+    box_extent=DEFAULT_BOX_EXTENT,
+    fiber_length=500.0,
+    n_mothers=None,
+    branch_angle=ARP23_BRANCH_ANGLE,
+    seed=None,
+):
+    """
+    Isotropic mother fibers, then generations of daughters that each
+    branch from a random point of an earlier fiber at branch_angle
+    to it, like Arp2/3 branches, clipped to the box
+    """
+    rng = np.random.default_rng(seed)
+    box_extent = np.asarray(box_extent, dtype=np.float64)
+    n_mothers = n_mothers or max(1, n_fibers // 10)
+    n_mothers = min(n_mothers, n_fibers)
+    starts = rng.uniform(0.0, 1.0, (n_mothers, 3)) * box_extent
+    directions = unit_vectors(rng, n_mothers)
+    while len(starts) < n_fibers:
+        # each generation at most doubles the network
+        n_daughters = min(len(starts), n_fibers - len(starts))
+        parents = rng.integers(0, len(starts), n_daughters)
+        along = rng.uniform(0.0, fiber_length, n_daughters)
+        parent_directions = directions[parents]
+        # rotate each parent direction by branch_angle about a random
+        # axis perpendicular to it
+        random = unit_vectors(rng, n_daughters)
+        perpendicular = random - (
+            np.sum(random * parent_directions, axis=1, keepdims=True)
+            * parent_directions
+        )
+        perpendicular /= np.linalg.norm(perpendicular, axis=1, keepdims=True)
+        starts = np.concatenate(
+            [starts, starts[parents] + along[:, None] * parent_directions]
+        )
+        directions = np.concatenate(
+            [
+                directions,
+                np.cos(branch_angle) * parent_directions
+                + np.sin(branch_angle) * perpendicular,
+            ]
+        )
+    points = straight_fibers(starts, directions, fiber_length, points_per_fiber)
+    return fiber_network(np.clip(points, 0.0, box_extent))
+
+
+NETWORKS = {
+    "bundle": bundle_network,
+    "isotropic": isotropic_network,
+    "branched": branched_network,
+}
+
+
+def network_state(
+    kind, n_fibers, representation="arrays", box_extent=DEFAULT_BOX_EXTENT, **kwargs
+):
+    """
+    Initial state for MedyanProcess with a generated network of the
+    given kind, with fibers as FiberArrays or in the dict form
+    """
+    fibers = NETWORKS[kind](n_fibers, box_extent=box_extent, **kwargs)
+    return {
+        "fibers_box_extent": np.asarray(box_extent, dtype=np.float64),
+        "fibers": fibers if representation == "arrays" else fibers.to_dict(),
+    }
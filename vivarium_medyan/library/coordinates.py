@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def parse_coordinates(coordinates_line):
+    """
+    Parse one line of space separated coordinates into an (n, 3) array
+    """
+    return np.fromstring(coordinates_line, dtype=np.float64, sep=" ").reshape(-1, 3)
+
+
+def parse_coordinate_lines(coordinates_lines):
+    """
+    Parse the coordinate lines of a whole frame in one pass into a
+    contiguous (n_points, 3) float64 buffer, along with the offsets
+    of each line's first point (n_lines + 1 entries)
+    """
+    counts = np.array(
+        [len(line.split()) // 3 for line in coordinates_lines], dtype=np.int64
+    )
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    values = np.fromstring(" ".join(coordinates_lines), dtype=np.float64, sep=" ")
+    if values.size != 3 * offsets[-1]:
+        raise ValueError(
+            f"expected {3 * offsets[-1]} coordinate values, found {values.size}"
+        )
+    return values.reshape(-1, 3), offsets
+
+
+def split_points(points, offsets):
+    """
+    Split a contiguous (n_points, 3) buffer into per fiber views
+    """
+    return [points[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def segment_indices(offsets, fibers):
+    """
+    Indices of the points of the given fibers, in order, along with
+    the number of points of each fiber
+    """
+    fibers = np.asarray(fibers, dtype=np.int64)
+    starts = offsets[fibers]
+    lengths = offsets[fibers + 1] - starts
+    # each point's index is its fiber's start plus its position in the fiber
+    first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    indices = np.repeat(starts, lengths) + np.arange(lengths.sum()) - first
+    return indices, lengths
+
+
+def concatenate_points(fiber_points):
+    """
+    Gather the points of many fibers into one contiguous (n_points, 3)
+    buffer along with per fiber point offsets
+    """
+    fiber_points = [
+        np.asarray(points, dtype=np.float64).reshape(-1, 3) for points in fiber_points
+    ]
+    offsets = np.zeros(len(fiber_points) + 1, dtype=np.int64)
+    np.cumsum([len(points) for points in fiber_points], out=offsets[1:])
+    if not fiber_points:
+        return np.zeros((0, 3)), offsets
+    return np.concatenate(fiber_points), offsets
+
+
+def format_values(points):
+    """
+    Format every coordinate of an array at once, giving the same
+    shortest round-trip strings as calling str() on each float
+    """
+    return list(map(str, np.asarray(points, dtype=np.float64).ravel().tolist()))
+
+
+def format_fiber_lines(type_indices, points, offsets):
+    """
+    Format the filaments.txt lines for every fiber from a contiguous
+    (n_points, 3) buffer and per fiber point offsets
+    """
+    values = format_values(points)
+    return [
+        " ".join(["FILAMENT", str(type_index)] + values[3 * start : 3 * end])
+        for type_index, start, end in zip(
+            type_indices, offsets[:-1].tolist(), offsets[1:].tolist()
+        )
+    ]
@@ -0,0 +1,134 @@
+import itertools
+
+import numpy as np
+
+from vivarium_medyan.library.coordinates import segment_indices
+
+
+class Subdomain:
+    """
+    A block of compartments of the simulation box, owning the fibers
+    whose centers lie in [lower, upper). MEDYAN runs it in a smaller box
+    extended by halo compartments on each side (within the whole box),
+    [halo_lower, halo_upper), where fibers of neighbours appear as ghosts.
+    """
+
+    def __init__(self, index, lower, upper, halo_lower, halo_upper, compartments):
+        self.index = index
+        self.lower = lower
+        self.upper = upper
+        self.halo_lower = halo_lower
+        self.halo_upper = halo_upper
+        self.compartments = compartments
+
+    @property
+    def name(self):
+        return "subdomain_" + "_".join(str(index) for index in self.index)
+
+    def __repr__(self):
+        return (
+            f"Subdomain({self.index}, {self.lower.tolist()} to {self.upper.tolist()}, "
+            f"{self.compartments.tolist()} compartments with halo)"
+        )
+
+
+class Decomposition:
+    """
+    Split a box of compartments into splits[axis] blocks along each
+    axis, with block boundaries on compartment boundaries
+    """
+
+    def __init__(self, n_compartments, compartment_size, splits, halo_compartments=1):
+        self.n_compartments = np.asarray(n_compartments, dtype=np.int64)
+        self.compartment_size = np.asarray(compartment_size, dtype=np.float64)
+        self.splits = np.asarray(splits, dtype=np.int64)
+        if np.any(self.splits < 1) or np.any(self.splits > self.n_compartments):
+            raise ValueError(
+                f"can't split {self.n_compartments.tolist()} compartments "
+                f"into {self.splits.tolist()} subdomains"
+            )
+        self.halo_compartments = halo_compartments
+        # compartment index of each block boundary along each axis
+        self.boundaries = [
+            np.array([0] + [block[-1] + 1 for block in np.array_split(np.arange(n), s)])
+            for n, s in zip(self.n_compartments, self.splits)
+        ]
+        self.subdomains = []
+        for index in itertools.product(*[range(s) for s in self.splits]):
+            start = np.array([self.boundaries[axis][i] for axis, i in enumerate(index)])
+            end = np.array(
+                [self.boundaries[axis][i + 1] for axis, i in enumerate(index)]
+            )
+            halo_start = np.maximum(start - halo_compartments, 0)
+            halo_end = np.minimum(end + halo_compartments, self.n_compartments)
+            self.subdomains.append(
+                Subdomain(
+                    index,
+                    start * self.compartment_size,
+                    end * self.compartment_size,
+                    halo_start * self.compartment_size,
+                    halo_end * self.compartment_size,
+                    halo_end - halo_start,
+                )
+            )
+
+    def __len__(self):
+        return len(self.subdomains)
+
+    def owners(self, points, offsets):
+        """
+        Index of the subdomain owning each fiber, the one holding
+        the mean of its points
+        """
+        lengths = np.diff(offsets)
+        centers = np.zeros((len(lengths), 3))
+        filled = lengths > 0
+        if filled.any():
+            sums = np.add.reduceat(points, offsets[:-1][filled], axis=0)
+            centers[filled] = sums / lengths[filled, None]
+        block = [
+            np.searchsorted(
+                self.boundaries[axis][1:-1] * self.compartment_size[axis],
+                centers[:, axis],
+                side="right",
+            )
+            for axis in range(3)
+        ]
+        return np.ravel_multi_index(block, self.splits)
+
+    def split(self, points, offsets):
+        """
+        For each subdomain, the indices of the fibers it owns and of
+        the ghosts: fibers of other subdomains with a point in its halo
+        """
+        owners = self.owners(points, offsets)
+        lengths = np.diff(offsets)
+        filled = np.flatnonzero(lengths > 0)
+        indices, _ = segment_indices(offsets, filled)
+        starts = np.cumsum(lengths[filled]) - lengths[filled]
+        parts = []
+        for position, subdomain in enumerate(self.subdomains):
+            owned = np.flatnonzero(owners == position)
+            inside = np.all(
+                (points[indices] >= subdomain.halo_lower)
+                & (points[indices] < subdomain.halo_upper),
+                axis=1,
+            )
+            touching = np.zeros(len(lengths), dtype=bool)
+            if len(filled):
+                touching[filled] = np.logical_or.reduceat(inside, starts)
+            ghosts = np.flatnonzero(touching & (owners != position))
+            parts.append((owned, ghosts))
+        return parts
+
+
+def reconcile_points(original, clipped, output):
+    """
+    Operator split stitching for a fiber cut to fit a subdomain's box:
+    apply the displacement MEDYAN gave each clipped point to the
+    original point, so parts outside the box move with the rest
+    """
+    if len(output) != len(clipped):
+        # MEDYAN changed the fiber's length, so its output is used as is
+        return output
+    return original + (output - clipped)
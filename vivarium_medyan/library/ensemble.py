@@ -0,0 +1,275 @@
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from vivarium_medyan.library.observables import fiber_quantities, summarize
+from vivarium_medyan.library.runners import check_medyan_logs
+
+# network observables reduced across replicates by default
+ENSEMBLE_OBSERVABLES = (
+    "n_fibers",
+    "total_length",
+    "mean_length",
+    "mean_end_to_end",
+    "mean_curvature",
+    "nematic_order",
+    "radius_of_gyration",
+)
+
+
+def frame_observables(fibers):
+    """
+    The default reducers' input: ENSEMBLE_OBSERVABLES of one frame
+    """
+    summary = summarize(fiber_quantities(fibers.points, fibers.offsets))
+    return {name: summary[name] for name in ENSEMBLE_OBSERVABLES}
+
+
+def fiber_lengths(fibers):
+    return fiber_quantities(fibers.points, fibers.offsets)["length"]
+
+
+class RunningStats:
+    """
+    Mean and variance of values (scalars or arrays of one shape) added
+    one at a time, with Welford's algorithm, so nothing is kept but the
+    count, mean and sum of squared deviations
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.squares = 0.0
+
+    def add(self, value):
+        value = np.asarray(value, dtype=np.float64)
+        self.count += 1
+        delta = value - self.mean
+        self.mean = self.mean + delta / self.count
+        self.squares = self.squares + delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """
+        Sample variance, zero until two values were added
+        """
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return self.squares / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class RunningHistogram:
+    """
+    Counts of values added in batches, in fixed bins; values outside
+    the edges are counted in underflow and overflow
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.counts += np.histogram(values, self.edges)[0]
+        self.underflow += int(np.sum(values < self.edges[0]))
+        self.overflow += int(np.sum(values > self.edges[-1]))
+
+
+class MedyanEnsemble:
+    """
+    Run replicates of one MedyanProcess configuration from the same
+    fibers, at most max_workers at once, folding each replicate's
+    frames into running statistics as soon as it finishes and then
+    deleting its output, so memory does not grow with the ensemble.
+
+    Configs, filaments.txt and the system input are staged once, in the
+    process's input directory, and hardlinked into each replicate's
+    input directory. Each replicate gets a seed, passed to MEDYAN by
+    appending seed_directive (formatted with {seed}) to its system
+    input, or to runner_factory(seed), which returns the runner of the
+    replicate (e.g. a FakeRunner); without either, replicates only
+    differ by MEDYAN's own randomness.
+
+    reducers map names to functions of the fibers of a frame (a
+    FiberArrays in store coordinates) returning a value or a dict of
+    named values, reduced to mean and variance at every frame.
+    histograms map names to (function, bin edges), binning the values
+    at the last frame of each replicate.
+    """
+
+    def __init__(
+        self,
+        process,
+        n_replicates,
+        seeds=None,
+        max_workers=4,
+        seed_directive=None,
+        runner_factory=None,
+        reducers=None,
+        histograms=None,
+        keep_outputs=False,
+    ):
+        self.process = process
+        self.n_replicates = n_replicates
+        self.seeds = list(seeds if seeds is not None else range(n_replicates))
+        if len(self.seeds) != n_replicates:
+            raise ValueError(f"expected {n_replicates} seeds, got {len(self.seeds)}")
+        self.max_workers = max_workers
+        self.seed_directive = seed_directive
+        self.runner_factory = runner_factory
+        self.reducers = reducers or {"observables": frame_observables}
+        self.histograms = histograms or {}
+        self.keep_outputs = keep_outputs
+        self.reset()
+
+    def reset(self):
+        self.stats = {}
+        self.histogram_counts = {
+            name: RunningHistogram(edges)
+            for name, (_, edges) in self.histograms.items()
+        }
+        self.times = None
+        self.completed = 0
+        self.peak_running = 0
+
+    def replicate_paths(self, replicate):
+        name = f"replicate_{replicate}"
+        return self.process.input_path / name, self.process.output_path / name
+
+    def stage(self, timestep, init_fibers):
+        """
+        Write the inputs shared by every replicate, once
+        """
+        process = self.process
+        process.move_configs_to_input_dir()
+        process.create_fiber_input_file(init_fibers)
+        return process.render_template(timestep)
+
+    def stage_replicate(self, replicate, system_text):
+        input_path, output_path = self.replicate_paths(replicate)
+        os.makedirs(input_path, exist_ok=True)
+        os.makedirs(output_path, exist_ok=True)
+        for entry in os.scandir(self.process.input_path):
+            if not entry.is_file():
+                continue
+            destination = input_path / entry.name
+            if os.path.exists(destination):
+                os.remove(destination)
+            try:
+                os.link(entry.path, destination)
+            except OSError:
+                shutil.copyfile(entry.path, destination)
+        if self.seed_directive is not None:
+            seed = self.seeds[replicate]
+            seeded = system_text + "\n" + self.seed_directive.format(seed=seed) + "\n"
+            os.remove(input_path / "systeminput.txt")
+            (input_path / "systeminput.txt").write_text(seeded)
+        return input_path, output_path
+
+    def run_replicate(self, replicate, system_text):
+        """
+        Run one replicate and reduce it to its frame times and, for each
+        reducer, a dict of values stacked over frames, plus the values
+        binned by each histogram
+        """
+        input_path, output_path = self.stage_replicate(replicate, system_text)
+        try:
+            if self.runner_factory is not None:
+                runner = self.runner_factory(self.seeds[replicate])
+                logs = runner.run_monitored(
+                    input_path, output_path, self.process.log_monitor()
+                )
+            else:
+                logs = self.process.run_runner(input_path, output_path)
+            check_medyan_logs(logs)
+            times = []
+            reduced = {name: [] for name in self.reducers}
+            fibers = None
+            for frame_time, fibers in self.process.iter_snapshot(
+                output_path / "snapshot.traj", "arrays"
+            ):
+                times.append(frame_time)
+                for name, reducer in self.reducers.items():
+                    reduced[name].append(reducer(fibers))
+            binned = {
+                name: function(fibers)
+                for name, (function, _) in self.histograms.items()
+            }
+        finally:
+            if not self.keep_outputs:
+                shutil.rmtree(input_path, ignore_errors=True)
+                shutil.rmtree(output_path, ignore_errors=True)
+        return np.array(times), reduced, binned
+
+    def fold(self, times, reduced, binned):
+        if self.times is None:
+            self.times = times
+        elif len(times) != len(self.times):
+            raise ValueError(
+                f"replicates wrote {len(self.times)} and {len(times)} frames"
+            )
+        for name, frames in reduced.items():
+            if isinstance(frames[0], dict):
+                values = {
+                    f"{name}.{key}": np.array([frame[key] for frame in frames])
+                    for key in frames[0]
+                }
+            else:
+                values = {name: np.array(frames)}
+            for key, value in values.items():
+                self.stats.setdefault(key, RunningStats()).add(value)
+        for name, values in binned.items():
+            self.histogram_counts[name].add(values)
+        self.completed += 1
+
+    def run(self, timestep, init_fibers):
+        """
+        Run every replicate for timestep from init_fibers, returning
+        the summary of the ensemble
+        """
+        self.reset()
+        system_text = self.stage(timestep, init_fibers)
+        replicates = iter(range(self.n_replicates))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            while True:
+                # keep at most max_workers replicates staged or running
+                while len(pending) < self.max_workers:
+                    replicate = next(replicates, None)
+                    if replicate is None:
+                        break
+                    pending.add(
+                        executor.submit(self.run_replicate, replicate, system_text)
+                    )
+                self.peak_running = max(self.peak_running, len(pending))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.fold(*future.result())
+        return self.summary()
+
+    def summary(self):
+        return {
+            "n_replicates": self.completed,
+            "times": self.times,
+            "mean": {name: stats.mean for name, stats in self.stats.items()},
+            "variance": {name: stats.variance for name, stats in self.stats.items()},
+            "histograms": {
+                name: {
+                    "edges": histogram.edges,
+                    "counts": histogram.counts,
+                    "underflow": histogram.underflow,
+                    "overflow": histogram.overflow,
+                }
+                for name, histogram in self.histogram_counts.items()
+            },
+        }
@@ -0,0 +1,87 @@
+import multiprocessing
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def next_update(process, timestep, states):
+    return process.next_update(timestep, states)
+
+
+def copy_next_update(process, timestep, states):
+    """
+    next_update of a copy of a process, returning the update and the
+    state the copy reached, to be merged back into the original
+    """
+    update = process.next_update(timestep, states)
+    return update, process.__getstate__()
+
+
+class MedyanExecutor:
+    """
+    Run the next_update of many MedyanProcess instances at once,
+    at most max_workers at a time.
+
+    With kind="thread" (the default) the processes themselves are used,
+    which suits runners that do their work outside Python (Docker or a
+    local binary). With kind="process" each call gets a pickled copy of
+    its process in a worker OS process, so CPU bound work like the fake
+    runner or large trajectory parsing scales across cores; the state
+    the copy reaches (simulation time, spatial index, metrics, ...) is
+    merged back into the process before its future completes. Processes
+    must not share a workspace (use isolate_workspace).
+    """
+
+    def __init__(self, max_workers=None, kind="thread"):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.kind = kind
+        if kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        elif kind == "process":
+            # match vivarium's parallel processes, forking is unsafe here
+            start_method = (
+                "forkserver" if sys.platform not in ("darwin", "win32") else "spawn"
+            )
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+        else:
+            raise ValueError(f"unknown executor kind {kind}")
+
+    def submit(self, process, timestep, states):
+        if self.kind == "thread":
+            return self.executor.submit(next_update, process, timestep, states)
+        copied = self.executor.submit(copy_next_update, process, timestep, states)
+        merged = Future()
+
+        def merge(copied):
+            try:
+                update, state = copied.result()
+                process.merge_state(state)
+            except BaseException as error:
+                merged.set_exception(error)
+            else:
+                merged.set_result(update)
+
+        copied.add_done_callback(merge)
+        return merged
+
+    def map(self, processes, timestep, states):
+        """
+        Run one step of every process, each with its own states, and
+        return their updates in order
+        """
+        futures = [
+            self.submit(process, timestep, process_states)
+            for process, process_states in zip(processes, states)
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,185 @@
+"""
+A stand-in for the MEDYAN executable that accepts the same
+``-i/-o/-s`` arguments, reads filaments.txt and writes a
+snapshot.traj holding those filaments at every snapshot (unchanged,
+or moved by gaussian jitter), along with placeholder forces, tensions
+(cylinder lengths), birth times and filament counts for each
+OUTPUTTYPE requested. When the system input names a RESTARTFILE it
+continues from that checkpoint's last frame instead.
+
+    python -m vivarium_medyan.library.fake_medyan -i in/ -o out/ -s in/systeminput.txt
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from vivarium_medyan.library.coordinates import format_values, parse_coordinates
+from vivarium_medyan.library.outputs import OUTPUT_FILES
+from vivarium_medyan.library.runners import DONE_MESSAGE, MedyanRunner
+from vivarium_medyan.library.snapshot import read_last_frame, write_snapshot
+from vivarium_medyan.library.system_input import (
+    read_system_text,
+    read_system_texts,
+    read_system_value,
+)
+
+
+def read_filaments(filament_path):
+    fibers = []
+    with open(filament_path, "r") as filament_file:
+        for line in filament_file:
+            if not line.startswith("FILAMENT"):
+                continue
+            _, type_index, coordinates = line.split(" ", 2)
+            points = parse_coordinates(coordinates)
+            fibers.append((len(fibers), int(type_index), points))
+    return fibers
+
+
+def read_restart(restart_path):
+    """
+    Read the time and filaments of the last frame of a checkpoint
+    trajectory, as MEDYAN does when restarting
+    """
+    lines = read_last_frame(restart_path)
+    time = float(lines[0].split()[1])
+    fibers = []
+    for fiber_line, coordinates_line in zip(lines[1:], lines[2:]):
+        if fiber_line.startswith("FILAMENT"):
+            _, fiber_id, type_index = fiber_line.split(" ")[:3]
+            points = parse_coordinates(coordinates_line)
+            fibers.append((int(fiber_id), int(type_index), points))
+    return time, fibers
+
+
+def fake_frames(fibers, times, jitter=0.0, seed=None):
+    """
+    Yield (time, fibers) frames, moving every point by gaussian
+    noise with standard deviation jitter at each snapshot
+    """
+    rng = np.random.default_rng(seed)
+    for frame_time in times:
+        if jitter > 0.0:
+            fibers = [
+                (fiber_id, type_index, points + rng.normal(0.0, jitter, points.shape))
+                for fiber_id, type_index, points in fibers
+            ]
+        yield float(frame_time), fibers
+
+
+def format_output_frame(output, step, time, fibers):
+    """
+    Format one frame of an auxiliary output, in the layout MEDYAN
+    writes it
+    """
+    if output == "chemistry":
+        lines = [f"{step} {time}"]
+        types = sorted({type_index for _, type_index, _ in fibers})
+        for species in ("FILAMENT", "PLUSEND", "MINUSEND"):
+            for type_index in types:
+                count = sum(1 for _, index, _ in fibers if index == type_index)
+                lines.append(f"{species}:{type_index} {count}")
+        return "\n".join(lines) + "\n"
+    lines = [f"{step} {time} {len(fibers)} 0 0 0"]
+    for fiber_id, type_index, points in fibers:
+        if output == "tensions":
+            # one per cylinder
+            values = np.linalg.norm(np.diff(points, axis=0), axis=1)
+        else:
+            # forces and birth times, one per bead
+            values = np.zeros(len(points))
+        lines.append(f"FILAMENT {fiber_id} {type_index} {len(points) - 1} 0 0")
+        lines.append(" ".join(format_values(values)))
+    return "\n".join(lines) + "\n"
+
+
+def write_outputs(output_path, outputs, frames):
+    for output in outputs:
+        with open(os.path.join(output_path, OUTPUT_FILES[output]), "w") as file:
+            file.write(
+                "\n".join(
+                    format_output_frame(output, step, time, fibers)
+                    for step, (time, fibers) in enumerate(frames)
+                )
+            )
+
+
+def run_fake_medyan(input_path, output_path, system_path, jitter=0.0, seed=None):
+    with open(system_path, "r") as system_file:
+        system_text = system_file.read()
+    runtime = read_system_value(system_text, "RUNTIME")
+    snapshot_time = read_system_value(system_text, "SNAPSHOTTIME", runtime)
+    start_time = 0.0
+    restart_file = read_system_text(system_text, "RESTARTFILE")
+    if restart_file is not None:
+        # continue from the checkpoint, ignoring filaments.txt
+        if read_system_text(system_text, "RESTARTPHASE") != "ON":
+            return "RESTARTFILE given without RESTARTPHASE: ON"
+        restart_path = os.path.join(input_path, restart_file)
+        if not os.path.exists(restart_path):
+            return f"restart file {restart_file} not found"
+        start_time, fibers = read_restart(restart_path)
+    else:
+        fibers = read_filaments(os.path.join(input_path, "filaments.txt"))
+    n_snapshots = int(runtime / snapshot_time) if snapshot_time > 0 else 0
+    times = start_time + np.arange(n_snapshots + 1) * snapshot_time
+    os.makedirs(output_path, exist_ok=True)
+    frames = list(fake_frames(fibers, times, jitter, seed))
+    write_snapshot(os.path.join(output_path, "snapshot.traj"), frames)
+    outputs = [
+        output.lower()
+        for output in read_system_texts(system_text, "OUTPUTTYPE")
+        if output.lower() in OUTPUT_FILES
+    ]
+    write_outputs(output_path, outputs, frames)
+    progress = [f"Current simulation time = {time}" for time in times]
+    return "\n".join(progress + [DONE_MESSAGE])
+
+
+class FakeRunner(MedyanRunner):
+    """
+    Run the fake engine in this process, so no container or
+    executable is needed
+    """
+
+    def __init__(self, jitter=0.0, seed=None):
+        self.jitter = jitter
+        self.seed = seed
+
+    def version(self):
+        return f"fake jitter={self.jitter} seed={self.seed}"
+
+    def run(self, input_path, output_path):
+        system_path = os.path.join(input_path, "systeminput.txt")
+        return run_fake_medyan(
+            input_path, output_path, system_path, self.jitter, self.seed
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake MEDYAN executable")
+    parser.add_argument("-i", dest="input_path", required=True)
+    parser.add_argument("-o", dest="output_path", required=True)
+    parser.add_argument("-s", dest="system_path", required=True)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    # seconds to wait first, standing in for MEDYAN's run time
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    time.sleep(args.delay)
+    print(
+        run_fake_medyan(
+            args.input_path,
+            args.output_path,
+            args.system_path,
+            args.jitter,
+            args.seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
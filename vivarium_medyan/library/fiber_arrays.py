@@ -0,0 +1,343 @@
+import sys
+
+import numpy as np
+from vivarium.core.registry import Serializer
+
+from vivarium_medyan.library.coordinates import (
+    concatenate_points,
+    segment_indices,
+    split_points,
+)
+
+
+def intern_type_names(type_names, table):
+    """
+    Map type names to integer codes in a type name table,
+    appending (interned) names the table has not seen yet
+    """
+    lookup = {name: code for code, name in enumerate(table)}
+    codes = np.empty(len(type_names), dtype=np.int32)
+    for index, type_name in enumerate(type_names):
+        code = lookup.get(type_name)
+        if code is None:
+            code = lookup[type_name] = len(table)
+            table.append(sys.intern(type_name))
+        codes[index] = code
+    return codes
+
+
+class FiberArrays:
+    """
+    Compact struct of arrays for a fiber network: every point in one
+    (n_points, 3) float64 buffer, per fiber offsets into it, and integer
+    type codes indexing a shared table of type names
+    """
+
+    def __init__(self, fiber_ids, type_codes, offsets, points, type_names):
+        self.fiber_ids = list(fiber_ids)
+        self.type_codes = np.asarray(type_codes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.type_names = list(type_names)
+
+    @classmethod
+    def empty(cls, type_names=None):
+        return cls([], [], [0], np.zeros((0, 3)), type_names or [])
+
+    @classmethod
+    def from_dict(cls, fibers, type_names=None):
+        """
+        Convert the dict form {fiber_id: {"type_name", "points"}}
+        """
+        type_names = list(type_names or [])
+        values = list(fibers.values())
+        type_codes = intern_type_names(
+            [fiber["type_name"] for fiber in values], type_names
+        )
+        points, offsets = concatenate_points([fiber["points"] for fiber in values])
+        return cls(fibers.keys(), type_codes, offsets, points, type_names)
+
+    def to_dict(self):
+        """
+        Convert back to the dict form, with points as views of the buffer
+        """
+        return {
+            fiber_id: {"type_name": self.type_names[type_code], "points": points}
+            for fiber_id, type_code, points in zip(
+                self.fiber_ids,
+                self.type_codes.tolist(),
+                split_points(self.points, self.offsets),
+            )
+        }
+
+    def select(self, fibers):
+        """
+        A new FiberArrays holding only the fibers at the given indices
+        """
+        fibers = np.asarray(fibers, dtype=np.int64)
+        indices, lengths = segment_indices(self.offsets, fibers)
+        offsets = np.zeros(len(fibers) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return FiberArrays(
+            [self.fiber_ids[fiber] for fiber in fibers.tolist()],
+            self.type_codes[fibers],
+            offsets,
+            self.points[indices],
+            self.type_names,
+        )
+
+    def extend(self, other):
+        """
+        A new FiberArrays with the fibers of other appended, mapping
+        its type codes onto this table
+        """
+        type_names = list(self.type_names)
+        table = intern_type_names(other.type_names, type_names)
+        return FiberArrays(
+            self.fiber_ids + other.fiber_ids,
+            np.concatenate([self.type_codes, table[other.type_codes]]),
+            np.concatenate([self.offsets[:-1], other.offsets + self.offsets[-1]]),
+            np.concatenate([self.points, other.points]),
+            type_names,
+        )
+
+    def type_name_array(self):
+        return np.array(self.type_names, dtype=object)[self.type_codes]
+
+    def copy(self):
+        return FiberArrays(
+            self.fiber_ids,
+            self.type_codes.copy(),
+            self.offsets.copy(),
+            self.points.copy(),
+            self.type_names,
+        )
+
+    def transform(self, translation):
+        """
+        Translate every point with a single broadcast add
+        """
+        return FiberArrays(
+            self.fiber_ids,
+            self.type_codes,
+            self.offsets,
+            self.points + np.asarray(translation, dtype=np.float64),
+            self.type_names,
+        )
+
+    @property
+    def nbytes(self):
+        return self.type_codes.nbytes + self.offsets.nbytes + self.points.nbytes
+
+    def __len__(self):
+        return len(self.fiber_ids)
+
+    def __eq__(self, other):
+        if not isinstance(other, FiberArrays):
+            return NotImplemented
+        return (
+            self.fiber_ids == other.fiber_ids
+            and np.array_equal(self.offsets, other.offsets)
+            and np.array_equal(self.points, other.points)
+            and [self.type_names[code] for code in self.type_codes.tolist()]
+            == [other.type_names[code] for code in other.type_codes.tolist()]
+        )
+
+    def __repr__(self):
+        return (
+            f"FiberArrays({len(self)} fibers, {len(self.points)} points, "
+            f"types {self.type_names})"
+        )
+
+
+def concatenate_fiber_arrays(fiber_arrays, type_names=None):
+    """
+    One FiberArrays holding the fibers of each in turn, in a single
+    pass, along with the index of each one's first fiber
+    """
+    type_names = list(type_names or [])
+    fiber_arrays = list(fiber_arrays)
+    counts = np.array([len(arrays) for arrays in fiber_arrays], dtype=np.int64)
+    fiber_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=fiber_offsets[1:])
+    if not fiber_arrays:
+        return FiberArrays.empty(type_names), fiber_offsets
+    point_bases = np.cumsum([0] + [len(arrays.points) for arrays in fiber_arrays])
+    fibers = FiberArrays(
+        [fiber_id for arrays in fiber_arrays for fiber_id in arrays.fiber_ids],
+        np.concatenate(
+            [
+                intern_type_names(arrays.type_names, type_names)[arrays.type_codes]
+                for arrays in fiber_arrays
+            ]
+        ),
+        np.concatenate(
+            [
+                arrays.offsets[:-1] + base
+                for arrays, base in zip(fiber_arrays, point_bases)
+            ]
+            + [point_bases[-1:]]
+        ),
+        np.concatenate([arrays.points for arrays in fiber_arrays]),
+        type_names,
+    )
+    return fibers, fiber_offsets
+
+
+def diff_fiber_arrays(previous, current, tolerance=0.0):
+    """
+    Compare two networks, returning the indices of fibers in current
+    that were added or changed and the ids of fibers that were removed.
+    A fiber changed if its type or number of points changed, or any
+    point moved by more than tolerance along any axis.
+    """
+    previous_index = {
+        fiber_id: index for index, fiber_id in enumerate(previous.fiber_ids)
+    }
+    current_ids = set(current.fiber_ids)
+    removed = [
+        fiber_id for fiber_id in previous.fiber_ids if fiber_id not in current_ids
+    ]
+    matches = np.array(
+        [previous_index.get(fiber_id, -1) for fiber_id in current.fiber_ids],
+        dtype=np.int64,
+    )
+    added = np.flatnonzero(matches < 0)
+    common = np.flatnonzero(matches >= 0)
+    matched = matches[common]
+
+    lengths = np.diff(current.offsets)[common]
+    changed = (lengths != np.diff(previous.offsets)[matched]) | (
+        current.type_name_array()[common] != previous.type_name_array()[matched]
+    )
+    # compare the points of fibers whose shape is unchanged, all at once
+    same = np.flatnonzero(~changed & (lengths > 0))
+    current_points, same_lengths = segment_indices(current.offsets, common[same])
+    previous_points, _ = segment_indices(previous.offsets, matched[same])
+    if len(same):
+        displacement = np.abs(
+            current.points[current_points] - previous.points[previous_points]
+        ).max(axis=1)
+        starts = np.cumsum(same_lengths) - same_lengths
+        changed[same] = np.maximum.reduceat(displacement, starts) > tolerance
+    return added, common[changed], removed
+
+
+def fiber_delta(previous, current, tolerance=0.0):
+    """
+    A vivarium update taking the fibers state from previous to current,
+    holding only the fibers that were added, removed or changed:
+    ``{"_add": [{"key", "state"}], "_delete": [fiber_id], fiber_id: fiber}``
+    """
+    added, changed, removed = diff_fiber_arrays(previous, current, tolerance)
+    added_fibers = current.select(added).to_dict()
+    changed_fibers = current.select(changed).to_dict()
+    return {
+        "_add": [
+            {"key": fiber_id, "state": fiber}
+            for fiber_id, fiber in added_fibers.items()
+        ],
+        "_delete": removed,
+        **changed_fibers,
+    }
+
+
+def is_fiber_delta(update):
+    return isinstance(update, dict) and ("_add" in update or "_delete" in update)
+
+
+def apply_fiber_delta(current, delta):
+    """
+    Apply an update made by fiber_delta. Patched fibers with unchanged
+    point counts are written in place, others are replaced at the end.
+    """
+    index = {fiber_id: position for position, fiber_id in enumerate(current.fiber_ids)}
+    keep = np.ones(len(current), dtype=bool)
+    for fiber_id in delta.get("_delete", []):
+        if fiber_id in index:
+            keep[index[fiber_id]] = False
+    patches = {
+        key: value for key, value in delta.items() if key not in ("_add", "_delete")
+    }
+    points = current.points.copy()
+    type_codes = current.type_codes.copy()
+    type_names = list(current.type_names)
+    appended = {}
+    for fiber_id, patch in patches.items():
+        position = index.get(fiber_id)
+        if position is None or not keep[position]:
+            appended[fiber_id] = patch
+            continue
+        start, end = current.offsets[position], current.offsets[position + 1]
+        if "type_name" in patch:
+            (type_codes[position],) = intern_type_names(
+                [patch["type_name"]], type_names
+            )
+        if "points" in patch:
+            patch_points = np.asarray(patch["points"], dtype=np.float64).reshape(-1, 3)
+            if len(patch_points) == end - start:
+                points[start:end] = patch_points
+            else:
+                keep[position] = False
+                appended[fiber_id] = {
+                    "type_name": type_names[type_codes[position]],
+                    "points": patch_points,
+                }
+    for added in delta.get("_add", []):
+        appended[added["key"]] = added["state"]
+    updated = FiberArrays(
+        current.fiber_ids, type_codes, current.offsets, points, type_names
+    )
+    if keep.all() and not appended:
+        return updated
+    return updated.select(np.flatnonzero(keep)).extend(
+        FiberArrays.from_dict(appended, type_names)
+    )
+
+
+def update_fiber_arrays(current_value, new_value):
+    """
+    Set the fiber network, accepting either a FiberArrays or the dict
+    form, or apply a delta made by fiber_delta
+    """
+    if isinstance(new_value, FiberArrays):
+        return new_value
+    if is_fiber_delta(new_value):
+        return apply_fiber_delta(current_value, new_value)
+    return FiberArrays.from_dict(new_value, current_value.type_names)
+
+
+def divide_fiber_arrays(state):
+    """
+    Both daughters get an independent copy of the network,
+    as with the "set" divider on the dict form
+    """
+    return [state.copy(), state.copy()]
+
+
+class FiberArraysSerializer(Serializer):
+    """
+    Emit FiberArrays as a dict of flat arrays, which orjson serializes
+    natively. Emitted data is not deserialized automatically since it
+    is an ordinary dict; use ``deserialize`` to rebuild a FiberArrays.
+    """
+
+    python_type = FiberArrays
+
+    def serialize(self, data):
+        return {
+            "fiber_ids": data.fiber_ids,
+            "type_codes": data.type_codes,
+            "offsets": data.offsets,
+            "points": data.points,
+            "type_names": data.type_names,
+        }
+
+    def deserialize(self, data):
+        return FiberArrays(
+            data["fiber_ids"],
+            data["type_codes"],
+            data["offsets"],
+            data["points"],
+            data["type_names"],
+        )
@@ -0,0 +1,174 @@
+import asyncio
+import collections
+import queue
+import re
+import threading
+import time
+
+DONE_MESSAGE = "Done with simulation!"
+# lines after which MEDYAN will not complete
+ERROR_PATTERNS = (
+    r"Segmentation fault",
+    r"core dumped",
+    r"terminate called",
+    r"\bAborted\b",
+    r"\bExiting\b",
+    r"\bERROR\b",
+)
+# progress lines carry the current simulated time
+PROGRESS_PATTERN = r"[Cc]urrent simulation time\s*[=:]\s*([-+0-9.eE]+)"
+
+
+class MedyanRunError(Exception):
+    """
+    A MEDYAN run failed, timed out or did not complete. ``logs``
+    holds the last lines of its output.
+    """
+
+    def __init__(self, message, logs=""):
+        super().__init__(message)
+        self.logs = logs
+
+
+class MedyanTimeout(MedyanRunError):
+    pass
+
+
+class LogMonitor:
+    """
+    Consume MEDYAN's output as it is written: keep only the last
+    buffer_lines lines, report simulated time from progress lines,
+    and raise MedyanRunError on known error patterns or when the run
+    exceeds the wall clock timeout or prints nothing for idle_timeout
+    seconds
+    """
+
+    def __init__(
+        self,
+        wall_timeout=None,
+        idle_timeout=None,
+        error_patterns=ERROR_PATTERNS,
+        progress_pattern=PROGRESS_PATTERN,
+        buffer_lines=1000,
+        progress_callback=None,
+        poll_interval=0.1,
+    ):
+        self.wall_timeout = wall_timeout
+        self.idle_timeout = idle_timeout
+        self.error_pattern = (
+            re.compile("|".join(f"(?:{pattern})" for pattern in error_patterns))
+            if error_patterns
+            else None
+        )
+        self.progress_pattern = re.compile(progress_pattern)
+        self.lines = collections.deque(maxlen=buffer_lines)
+        self.progress_callback = progress_callback
+        self.poll_interval = poll_interval
+        self.simulated_time = None
+        self.done = False
+        self.line_count = 0
+        self._partial = ""
+        self.start()
+
+    def start(self):
+        self.started = self.last_output = time.monotonic()
+
+    def feed(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8", errors="replace")
+        self.last_output = time.monotonic()
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.feed_line(line)
+
+    def feed_line(self, line):
+        line = line.rstrip("\r")
+        self.lines.append(line)
+        self.line_count += 1
+        if DONE_MESSAGE in line:
+            self.done = True
+        progress = self.progress_pattern.search(line)
+        if progress:
+            self.simulated_time = float(progress.group(1))
+            if self.progress_callback is not None:
+                self.progress_callback(self.simulated_time)
+        if self.error_pattern is not None and self.error_pattern.search(line):
+            raise MedyanRunError(f"MEDYAN reported an error: {line}", self.logs())
+
+    def finish(self):
+        if self._partial:
+            line, self._partial = self._partial, ""
+            self.feed_line(line)
+
+    def check_timeouts(self):
+        now = time.monotonic()
+        if self.wall_timeout is not None and now - self.started > self.wall_timeout:
+            raise MedyanTimeout(
+                f"MEDYAN ran for more than {self.wall_timeout} s", self.logs()
+            )
+        if self.idle_timeout is not None and now - self.last_output > self.idle_timeout:
+            raise MedyanTimeout(
+                f"MEDYAN printed nothing for {self.idle_timeout} s", self.logs()
+            )
+
+    def logs(self):
+        return "\n".join(self.lines)
+
+    def follow(self, chunks, kill):
+        """
+        Feed chunks from an iterable that blocks while waiting for
+        output, checking timeouts meanwhile; kill() stops the run when
+        it fails or following it is interrupted by any exception, e.g.
+        KeyboardInterrupt or one raised by progress_callback. Returns
+        the buffered logs.
+        """
+        pending = queue.Queue()
+
+        def pump():
+            try:
+                for chunk in chunks:
+                    pending.put(chunk)
+            finally:
+                pending.put(None)
+
+        threading.Thread(target=pump, daemon=True).start()
+        try:
+            while True:
+                try:
+                    chunk = pending.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    self.check_timeouts()
+                    continue
+                if chunk is None:
+                    break
+                self.feed(chunk)
+                self.check_timeouts()
+            self.finish()
+        except BaseException:
+            kill()
+            raise
+        return self.logs()
+
+    async def follow_async(self, readline, kill):
+        """
+        follow for asyncio, awaiting lines from readline
+        until it returns an empty line. The run is also killed when
+        the awaiting task is cancelled
+        """
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(readline(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    self.check_timeouts()
+                    continue
+                if not line:
+                    break
+                self.feed(line)
+                self.check_timeouts()
+            self.finish()
+        except BaseException:
+            kill()
+            raise
+        return self.logs()
@@ -0,0 +1,52 @@
+import contextlib
+import json
+import time
+
+
+class StepMetrics:
+    """
+    Wall time spent in each phase of one MedyanProcess step, along with
+    counters such as bytes written and fibers read
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def record(self, **fields):
+        return {**fields, "durations": dict(self.durations), **self.counts}
+
+
+class NullMetrics:
+    """
+    Used while metrics are off, so instrumented code only pays
+    for a method call that does nothing
+    """
+
+    _null_phase = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._null_phase
+
+    def count(self, name, value):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def append_json_line(path, record):
+    with open(path, "a") as metrics_file:
+        metrics_file.write(json.dumps(record) + "\n")
@@ -0,0 +1,171 @@
+import numpy as np
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays, diff_fiber_arrays
+
+# per fiber quantities, from which every network observable is summed
+FIBER_COLUMNS = (
+    "length",  # contour length
+    "end_to_end",  # distance between the first and last points
+    "turning",  # total angle between consecutive segments
+    "orientation",  # (3, 3) sum of d d^T / |d| over segments d
+    "n_points",
+    "point_sum",  # (3,) sum of the points
+    "square_sum",  # sum of the squared norms of the points
+)
+
+
+def fiber_quantities(points, offsets):
+    """
+    Every per fiber quantity in FIBER_COLUMNS, computed for all
+    fibers at once over the segments of the whole points buffer
+    """
+    n_fibers = len(offsets) - 1
+    lengths = np.diff(offsets)
+    point_fibers = np.repeat(np.arange(n_fibers), lengths)
+    segments = np.diff(points, axis=0)
+    # segments joining the last point of one fiber to the next fiber's first
+    inside = point_fibers[:-1] == point_fibers[1:]
+    segment_fibers = point_fibers[:-1][inside]
+    segments = segments[inside]
+    segment_lengths = np.linalg.norm(segments, axis=1)
+
+    # angles between consecutive segments of the same fiber
+    directions = np.divide(
+        segments,
+        segment_lengths[:, None],
+        out=np.zeros_like(segments),
+        where=segment_lengths[:, None] > 0,
+    )
+    consecutive = segment_fibers[:-1] == segment_fibers[1:]
+    cosines = np.einsum("ij,ij->i", directions[:-1], directions[1:])[consecutive]
+    angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+
+    weighted = np.einsum("ij,ik->ijk", segments, directions).reshape(-1, 9)
+    orientation = np.stack(
+        [
+            np.bincount(segment_fibers, weighted[:, component], minlength=n_fibers)
+            for component in range(9)
+        ],
+        axis=1,
+    ).reshape(-1, 3, 3)
+
+    filled = lengths > 0
+    end_to_end = np.zeros(n_fibers)
+    end_to_end[filled] = np.linalg.norm(
+        points[offsets[1:][filled] - 1] - points[offsets[:-1][filled]], axis=1
+    )
+    return {
+        "length": np.bincount(segment_fibers, segment_lengths, minlength=n_fibers),
+        "end_to_end": end_to_end,
+        "turning": np.bincount(
+            segment_fibers[:-1][consecutive], angles, minlength=n_fibers
+        ),
+        "orientation": orientation,
+        "n_points": lengths.astype(np.float64),
+        "point_sum": np.stack(
+            [
+                np.bincount(point_fibers, points[:, axis], minlength=n_fibers)
+                for axis in range(3)
+            ],
+            axis=1,
+        ),
+        "square_sum": np.bincount(
+            point_fibers, np.einsum("ij,ij->i", points, points), minlength=n_fibers
+        ),
+    }
+
+
+def summarize(quantities):
+    """
+    Network observables from per fiber quantities: mean fiber length
+    and end to end distance, mean curvature (turning per contour
+    length), the nematic order parameter and director of segments
+    weighted by length, and the radius of gyration of all points
+    """
+    n_fibers = len(quantities["length"])
+    total_length = quantities["length"].sum()
+    n_points = quantities["n_points"].sum()
+    summary = {
+        "n_fibers": n_fibers,
+        "total_length": total_length,
+        "mean_length": total_length / n_fibers if n_fibers else 0.0,
+        "mean_end_to_end": quantities["end_to_end"].mean() if n_fibers else 0.0,
+        "mean_curvature": (
+            quantities["turning"].sum() / total_length if total_length else 0.0
+        ),
+        "nematic_order": 0.0,
+        "director": np.zeros(3),
+        "radius_of_gyration": 0.0,
+    }
+    if total_length > 0:
+        # Q = (3 <u u^T> - I) / 2, its largest eigenvalue is the order
+        order = 1.5 * quantities["orientation"].sum(axis=0) / total_length
+        order -= 0.5 * np.eye(3)
+        eigenvalues, eigenvectors = np.linalg.eigh(order)
+        summary["nematic_order"] = eigenvalues[-1]
+        summary["director"] = eigenvectors[:, -1]
+    if n_points > 0:
+        center = quantities["point_sum"].sum(axis=0) / n_points
+        spread = quantities["square_sum"].sum() / n_points - center @ center
+        summary["radius_of_gyration"] = np.sqrt(max(spread, 0.0))
+    return summary
+
+
+class IncrementalObservables:
+    """
+    Network observables kept up to date across steps: only fibers that
+    were added or changed since the previous network are recomputed,
+    the rest reuse their cached quantities. Contraction is the radius
+    of gyration relative to the first network seen.
+    """
+
+    def __init__(self):
+        self.previous = None
+        self.quantities = None
+        self.initial_radius = None
+        self.recomputed = 0
+
+    def update(self, fibers):
+        if not isinstance(fibers, FiberArrays):
+            fibers = FiberArrays.from_dict(fibers)
+        if fibers is self.previous:
+            recompute = np.zeros(0, dtype=np.int64)
+            quantities = self.quantities
+        elif self.previous is None:
+            recompute = np.arange(len(fibers))
+            quantities = fiber_quantities(fibers.points, fibers.offsets)
+        else:
+            previous_index = {
+                fiber_id: index
+                for index, fiber_id in enumerate(self.previous.fiber_ids)
+            }
+            matches = np.array(
+                [previous_index.get(fiber_id, -1) for fiber_id in fibers.fiber_ids],
+                dtype=np.int64,
+            )
+            added, changed, _ = diff_fiber_arrays(self.previous, fibers)
+            recompute = np.sort(np.concatenate([added, changed]))
+            selected = fibers.select(recompute)
+            fresh = fiber_quantities(selected.points, selected.offsets)
+            quantities = {}
+            for column in FIBER_COLUMNS:
+                cached = self.quantities[column]
+                values = np.zeros((len(fibers),) + cached.shape[1:])
+                kept = matches >= 0
+                values[kept] = cached[matches[kept]]
+                values[recompute] = fresh[column]
+                quantities[column] = values
+        self.previous = fibers
+        self.quantities = quantities
+        self.recomputed = len(recompute)
+
+        summary = summarize(quantities)
+        if self.initial_radius is None:
+            self.initial_radius = summary["radius_of_gyration"]
+        summary["contraction"] = (
+            summary["radius_of_gyration"] / self.initial_radius
+            if self.initial_radius
+            else 1.0
+        )
+        summary["recomputed_fibers"] = self.recomputed
+        return summary
@@ -0,0 +1,189 @@
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+
+from vivarium_medyan.library.snapshot import FRAME_SEPARATOR
+
+# auxiliary outputs, turned on by OUTPUTTYPE in the system input
+OUTPUT_FILES = {
+    "forces": "forces.traj",
+    "tensions": "tensions.traj",
+    "birthtimes": "birthtimes.traj",
+    "chemistry": "chemistry.traj",
+}
+# in per element outputs, each of these header lines is followed
+# by a line of values: per bead forces or birth times, per cylinder
+# tensions, or the coordinates in snapshot.traj
+ELEMENT_KINDS = ("FILAMENT", "LINKER", "MOTOR", "BRANCHER", "BUBBLE")
+
+
+def index_frames(data):
+    """
+    Byte offsets where each frame of a trajectory starts, found by
+    searching for the blank lines between frames without parsing them
+    """
+    starts = []
+    position = 0
+    while position < len(data):
+        # skip any blank lines before a frame
+        while position < len(data) and data[position : position + 1] in b"\r\n":
+            position += 1
+        if position == len(data):
+            break
+        starts.append(position)
+        separator = data.find(FRAME_SEPARATOR, position)
+        if separator < 0:
+            break
+        position = separator + 1
+    return np.array(starts, dtype=np.int64)
+
+
+def parse_value_lines(value_lines):
+    """
+    Parse lines of space separated values in one pass into a flat
+    float64 buffer, along with the offsets of each line's first value
+    """
+    counts = np.array([len(line.split()) for line in value_lines], dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    values = np.fromstring(" ".join(value_lines), dtype=np.float64, sep=" ")
+    return values, offsets
+
+
+class OutputFrame:
+    """
+    One frame of a MEDYAN trajectory output. Its lines are only split
+    into records when first asked for, and values only parsed for the
+    elements that are read.
+    """
+
+    def __init__(self, text):
+        self.lines = text.strip().split("\n")
+        header = self.lines[0].split()
+        self.step = int(header[0])
+        self.time = float(header[1])
+        self._records = None
+
+    def records(self):
+        """
+        {(kind, id): (type, index of its values line)} for every element
+        """
+        if self._records is None:
+            self._records = {}
+            for index, line in enumerate(self.lines[1:], 1):
+                fields = line.split(" ", 3)
+                if fields[0] in ELEMENT_KINDS and len(fields) > 2:
+                    self._records[fields[0], fields[1]] = (int(fields[2]), index + 1)
+        return self._records
+
+    def ids(self, kind="FILAMENT"):
+        return [
+            element_id
+            for element_kind, element_id in self.records()
+            if element_kind == kind
+        ]
+
+    def values(self, element_id, kind="FILAMENT"):
+        """
+        The values of one element, as a flat array
+        """
+        _, index = self.records()[kind, str(element_id)]
+        return np.fromstring(self.lines[index], dtype=np.float64, sep=" ")
+
+    def all_values(self, kind="FILAMENT"):
+        """
+        {id: values} for every element of a kind, parsed in one pass
+        into views of a single buffer
+        """
+        ids = self.ids(kind)
+        records = self.records()
+        values, offsets = parse_value_lines(
+            [self.lines[records[kind, element_id][1]] for element_id in ids]
+        )
+        return {
+            element_id: values[start:end]
+            for element_id, start, end in zip(ids, offsets[:-1], offsets[1:])
+        }
+
+    def counts(self):
+        """
+        Copy numbers of a chemistry frame, {"SPECIES:type": count}
+        """
+        counts = {}
+        for line in self.lines[1:]:
+            name, _, count = line.rpartition(" ")
+            if name:
+                counts[name] = int(float(count))
+        return counts
+
+
+class OutputFile:
+    """
+    Lazy, indexed access to a MEDYAN trajectory output. The first
+    access scans the file once for the offset and time of each frame,
+    again only when the file changes; frames are read one at a time.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._stamp = None
+        self.offsets = np.zeros(0, dtype=np.int64)
+        self._times = np.zeros(0)
+        self._size = 0
+
+    def exists(self):
+        return self.path.exists()
+
+    def index(self):
+        stat = os.stat(self.path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            self.offsets = np.zeros(0, dtype=np.int64)
+            self._times = np.zeros(0)
+            if stat.st_size > 0:
+                # scanned through a memory map, so the file is never read
+                # into memory as a whole
+                with open(self.path, "rb") as output_file, mmap.mmap(
+                    output_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as data:
+                    self.offsets = index_frames(data)
+                    self._times = np.array(
+                        [
+                            float(data[start : data.find(b"\n", start)].split()[1])
+                            for start in self.offsets.tolist()
+                        ]
+                    )
+            self._size = stat.st_size
+            self._stamp = stamp
+        return self.offsets
+
+    @property
+    def times(self):
+        self.index()
+        return self._times
+
+    def __len__(self):
+        return len(self.index())
+
+    def frame_text(self, index):
+        offsets = self.index()
+        if not -len(offsets) <= index < len(offsets):
+            raise IndexError(f"{self.path} has {len(offsets)} frames")
+        index %= len(offsets)
+        start = offsets[index]
+        end = offsets[index + 1] if index + 1 < len(offsets) else self._size
+        with open(self.path, "rb") as output_file:
+            output_file.seek(start)
+            return output_file.read(end - start).decode("utf-8")
+
+    def frame(self, index=-1):
+        return OutputFrame(self.frame_text(index))
+
+    def frame_at(self, time):
+        """
+        The last frame written at or before a time
+        """
+        index = np.searchsorted(self.times, time, side="right") - 1
+        return self.frame(max(int(index), 0))
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_directory(directory, version=""):
+    """
+    Hash the files directly in directory (names and contents, in sorted
+    order) together with a version string. Subdirectories, like those of
+    subdomains or ensemble replicates, are not part of a run's inputs.
+    """
+    digest = hashlib.sha256(version.encode("utf-8"))
+    directory = Path(directory)
+    for path in sorted(directory.glob("*")):
+        if not path.is_file():
+            continue
+        digest.update(b"\0" + path.name.encode("utf-8") + b"\0")
+        with open(path, "rb") as input_file:
+            for block in iter(lambda: input_file.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of MEDYAN outputs keyed by a hash of the staged input
+    directory and the MEDYAN version. The least recently used entries
+    are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def entry_path(self, key):
+        return self.directory / key[:2] / key
+
+    def get(self, key, output_path, names):
+        """
+        Copy the cached output files for key into output_path,
+        returning whether they were all there
+        """
+        entry = self.entry_path(key)
+        if not all((entry / name).exists() for name in names):
+            self.stats["misses"] += 1
+            return False
+        for name in names:
+            shutil.copyfile(entry / name, Path(output_path) / name)
+        # the modification time orders entries for eviction
+        os.utime(entry)
+        self.stats["hits"] += 1
+        return True
+
+    def put(self, key, output_path, names):
+        entry = self.entry_path(key)
+        # fill a temporary directory then rename it, so concurrent
+        # readers never see a partial entry
+        temporary = entry.with_name(f"{key}.{os.getpid()}.tmp")
+        temporary.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            shutil.copyfile(Path(output_path) / name, temporary / name)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(temporary, entry)
+        self.evict()
+
+    def entries(self):
+        entries = []
+        for entry in self.directory.glob("*/*"):
+            if entry.suffix == ".tmp":
+                continue
+            try:
+                modified = entry.stat().st_mtime_ns
+                size = sum(path.stat().st_size for path in entry.iterdir())
+            except FileNotFoundError:
+                continue
+            entries.append((modified, size, entry))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        for _, _, entry in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
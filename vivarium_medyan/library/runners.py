@@ -0,0 +1,385 @@
+import asyncio
+import atexit
+import functools
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
+
+import docker
+
+from vivarium_medyan.library.log_stream import (  # noqa: F401
+    DONE_MESSAGE,
+    LogMonitor,
+    MedyanRunError,
+)
+
+MEDYAN_IMAGE = "simularium/medyan:latest"
+MEDYAN_WORKDIR = "/root/medyan"
+
+
+def unique_name(prefix="medyan"):
+    return f"{prefix}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+async def run_in_thread(function, *args):
+    """
+    asyncio.to_thread, which needs Python 3.9: run function in a thread
+    of the event loop's default executor
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(function, *args))
+
+
+def medyan_arguments(input_path, output_path):
+    """
+    The arguments of the MEDYAN executable, as in the Dockerfile ENTRYPOINT
+    """
+    input_path = os.path.abspath(input_path)
+    output_path = os.path.abspath(output_path)
+    system_path = os.path.join(input_path, "systeminput.txt")
+    return ["-i", input_path, "-o", output_path, "-s", system_path]
+
+
+_checked_images = set()
+
+
+def ensure_image(client, image=MEDYAN_IMAGE):
+    """
+    Pull the image unless it is already present, checking
+    each image at most once per interpreter
+    """
+    if image in _checked_images:
+        return
+    repository, _, tag = image.partition(":")
+    if len(client.images.list(repository)) < 1:
+        print(f"Downloading {image} from Docker Hub...")
+        client.images.pull(repository, tag=tag or "latest")
+    else:
+        print("medyan docker image already exists, skipping download")
+    _checked_images.add(image)
+
+
+def check_medyan_logs(logs):
+    if DONE_MESSAGE not in logs:
+        # MEDYAN usually does not raise errors
+        raise MedyanRunError(
+            "MEDYAN simulation did not complete! Check output for error\n", logs
+        )
+
+
+class MedyanRunner:
+    """
+    Runs MEDYAN on a staged input directory. Runners that hold on to
+    resources between steps do so between ``start`` and ``shutdown``.
+    """
+
+    def start(self):
+        return self
+
+    def health_check(self):
+        return True
+
+    def version(self):
+        """
+        Identifies the MEDYAN build, for keying cached results
+        """
+        return type(self).__name__
+
+    def run(self, input_path, output_path):
+        """
+        Run MEDYAN and return its logs
+        """
+        raise NotImplementedError
+
+    def run_monitored(self, input_path, output_path, monitor):
+        """
+        Run MEDYAN, feeding its output to a LogMonitor, and return the
+        logs it kept. Runners that can stream output override this to
+        stop failed or stalled runs early.
+        """
+        monitor.feed(self.run(input_path, output_path))
+        monitor.finish()
+        return monitor.logs()
+
+    async def run_async(self, input_path, output_path, monitor):
+        """
+        run_monitored as a coroutine. By default the run is waited on in
+        a thread of the event loop's default executor.
+        """
+        return await run_in_thread(self.run_monitored, input_path, output_path, monitor)
+
+    def shutdown(self):
+        pass
+
+
+class DockerRunner(MedyanRunner):
+    """
+    Start a fresh container for every run and remove it afterwards
+    """
+
+    def __init__(self, image=MEDYAN_IMAGE):
+        self.image = image
+        self._client = None
+
+    def client(self):
+        # the Docker daemon is only contacted once a run is needed
+        if self._client is None:
+            self._client = docker.from_env()
+            ensure_image(self._client, self.image)
+        return self._client
+
+    def version(self):
+        return f"{self.image}@{self.client().images.get(self.image).id}"
+
+    def run(self, input_path, output_path):
+        return self.run_monitored(input_path, output_path, LogMonitor())
+
+    def run_monitored(self, input_path, output_path, monitor):
+        abs_input_path = os.path.abspath(input_path)
+        abs_output_path = os.path.abspath(output_path)
+        container = self.client().containers.run(
+            image=self.image,
+            name=unique_name("medyan-container"),
+            volumes=[
+                f"{abs_input_path}:/home/input/",
+                f"{abs_output_path}:/home/output/",
+            ],
+            detach=True,
+        )
+        try:
+            # the stream ends when the container exits
+            return monitor.follow(
+                container.logs(stream=True, follow=True), container.kill
+            )
+        finally:
+            container.remove(force=True)
+
+
+class DockerExecRunner(DockerRunner):
+    """
+    Keep one long-lived container with the workspace root mounted at the
+    same path, and run each step inside it with ``exec``
+    """
+
+    def __init__(self, image=MEDYAN_IMAGE, workspace_root="."):
+        super().__init__(image)
+        self.workspace_root = os.path.abspath(workspace_root)
+        self.name = unique_name("medyan-worker")
+        self.container = None
+
+    def start(self):
+        if self.container is None:
+            self.container = self.client().containers.run(
+                image=self.image,
+                name=self.name,
+                entrypoint=["sleep", "infinity"],
+                volumes=[f"{self.workspace_root}:{self.workspace_root}"],
+                detach=True,
+            )
+        return self
+
+    def health_check(self):
+        if self.container is None:
+            return False
+        try:
+            self.container.reload()
+        except Exception:
+            return False
+        return self.container.status == "running"
+
+    def run_monitored(self, input_path, output_path, monitor):
+        for path in (input_path, output_path):
+            path = os.path.abspath(path)
+            if os.path.commonpath([self.workspace_root, path]) != self.workspace_root:
+                raise ValueError(
+                    f"{path} is not inside the workspace root {self.workspace_root}"
+                )
+        self.start()
+        arguments = medyan_arguments(input_path, output_path)
+        _, output = self.container.exec_run(
+            ["./medyan"] + arguments,
+            workdir=MEDYAN_WORKDIR,
+            stream=True,
+        )
+
+        def kill():
+            # exec'd processes can't be killed through the API. The pattern
+            # starts with "-i", so it must follow "--"; pkill exits with 1
+            # when nothing matched, i.e. MEDYAN already stopped
+            exit_code, output = self.container.exec_run(
+                ["pkill", "-f", "--", " ".join(arguments[:2])]
+            )
+            if exit_code not in (0, 1):
+                raise RuntimeError(f"could not stop MEDYAN in {self.name}: {output!r}")
+
+        return monitor.follow(output, kill)
+
+    def shutdown(self):
+        if self.container is not None:
+            try:
+                self.container.remove(force=True)
+            finally:
+                self.container = None
+
+
+class LocalRunner(MedyanRunner):
+    """
+    Run a MEDYAN executable on this host, for example a native build
+    of ``medyan`` or the fake engine in ``fake_medyan``
+    """
+
+    def __init__(self, command=("medyan",)):
+        self.command = list(command)
+
+    def health_check(self):
+        return shutil.which(self.command[0]) is not None
+
+    def version(self):
+        # a rebuilt executable has a new modification time
+        executable = shutil.which(self.command[0]) or self.command[0]
+        stat = os.stat(executable)
+        return f"{' '.join(self.command)} {stat.st_mtime_ns} {stat.st_size}"
+
+    def run(self, input_path, output_path):
+        return self.run_monitored(input_path, output_path, LogMonitor())
+
+    def run_monitored(self, input_path, output_path, monitor):
+        process = subprocess.Popen(
+            self.command + medyan_arguments(input_path, output_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+
+        def output():
+            # closed by the thread reading it once MEDYAN exits
+            with process.stdout:
+                yield from iter(process.stdout.readline, b"")
+
+        try:
+            return monitor.follow(output(), process.kill)
+        finally:
+            process.wait()
+
+    async def run_async(self, input_path, output_path, monitor):
+        process = await asyncio.create_subprocess_exec(
+            *self.command,
+            *medyan_arguments(input_path, output_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+
+        def kill():
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass  # it exited already
+
+        try:
+            return await monitor.follow_async(process.stdout.readline, kill)
+        finally:
+            await process.wait()
+
+
+class RunnerPool:
+    """
+    A fixed number of started runners shared between steps, handed out
+    one at a time. Unhealthy runners are replaced when checked out, and
+    runners whose run raised are replaced when returned, since they may
+    still be running it.
+    """
+
+    def __init__(self, create_runner, size=1):
+        self.create_runner = create_runner
+        self.size = size
+        self.runners = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            while len(self.runners) < self.size:
+                runner = self.create_runner().start()
+                self.runners.append(runner)
+                self._idle.put(runner)
+        return self
+
+    def _replace(self, runner):
+        runner.shutdown()
+        replacement = self.create_runner().start()
+        with self._lock:
+            self.runners[self.runners.index(runner)] = replacement
+        return replacement
+
+    def health_check(self):
+        """
+        Replace idle runners that failed their health check,
+        returning the number that were replaced
+        """
+        replaced = 0
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for runner in idle:
+            if not runner.health_check():
+                runner = self._replace(runner)
+                replaced += 1
+            self._idle.put(runner)
+        return replaced
+
+    @contextmanager
+    def runner(self, timeout=None):
+        self.start()
+        runner = self._idle.get(timeout=timeout)
+        try:
+            if not runner.health_check():
+                runner = self._replace(runner)
+            yield runner
+        except BaseException:
+            runner = self._replace(runner)
+            raise
+        finally:
+            self._idle.put(runner)
+
+    def shutdown(self):
+        with self._lock:
+            runners, self.runners = self.runners, []
+            self._idle = queue.Queue()
+        for runner in runners:
+            runner.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+_runner_pools = {}
+_runner_pools_lock = threading.Lock()
+
+
+def get_runner_pool(key, create_runner, size):
+    """
+    Pools are shared by every process configured with the same key
+    and shut down when the interpreter exits
+    """
+    with _runner_pools_lock:
+        if key not in _runner_pools:
+            _runner_pools[key] = RunnerPool(create_runner, size)
+        return _runner_pools[key]
+
+
+@atexit.register
+def shutdown_runner_pools():
+    with _runner_pools_lock:
+        pools = list(_runner_pools.values())
+        _runner_pools.clear()
+    for pool in pools:
+        pool.shutdown()
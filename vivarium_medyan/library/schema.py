@@ -1,13 +1,19 @@
 import numpy as np
 
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+
+
+def fibers_box_extent_schema():
+    return {
+        "_default": np.array([4000.0, 2000.0, 2000.0]),
+        "_updater": "set",
+        "_emit": True,
+    }
+
 
 def fibers_schema():
     return {
-        "fibers_box_extent": {
-            "_default": np.array([4000.0, 2000.0, 2000.0]),
-            "_updater": "set",
-            "_emit": True,
-        },
+        "fibers_box_extent": fibers_box_extent_schema(),
         "fibers": {
             "*": {
                 "type_name": {
@@ -15,7 +21,7 @@ def fibers_schema():
                     "_updater": "set",
                     "_emit": True,
                 },
-                "points": {  # list of shape (3) numpy arrays
+                "points": {  # shape (n, 3) numpy array of points
                     "_default": [],
                     "_updater": "set",
                     "_emit": True,
@@ -23,3 +29,73 @@ def fibers_schema():
             }
         },
     }
+
+
+def fiber_arrays_schema():
+    """
+    Compact alternative to fibers_schema, storing the whole network
+    in a single FiberArrays leaf
+    """
+    return {
+        "fibers_box_extent": fibers_box_extent_schema(),
+        "fibers": {
+            "_default": FiberArrays.empty(),
+            "_updater": "fiber_arrays",
+            "_divider": "fiber_arrays",
+            "_serializer": "fiber_arrays",
+            "_emit": True,
+        },
+    }
+
+
+def metrics_schema():
+    return {
+        "_default": {},
+        "_updater": "set",
+        "_emit": True,
+    }
+
+
+def output_schema():
+    """
+    Quantities read from one of MEDYAN's auxiliary outputs
+    """
+    return {
+        "_default": {},
+        "_updater": "set",
+        "_emit": True,
+    }
+
+
+def frames_schema():
+    """
+    The snapshot frames MEDYAN wrote within a step, with the fibers of
+    every frame concatenated into one FiberArrays; frame i holds fibers
+    frame_offsets[i] to frame_offsets[i + 1]
+    """
+    return {
+        "times": {
+            "_default": np.zeros(0),
+            "_updater": "set",
+            "_emit": True,
+        },
+        "frame_offsets": {
+            "_default": np.zeros(1, dtype=np.int64),
+            "_updater": "set",
+            "_emit": True,
+        },
+        "fibers": {
+            "_default": FiberArrays.empty(),
+            "_updater": "set",
+            "_serializer": "fiber_arrays",
+            "_emit": True,
+        },
+    }
+
+
+def observables_schema():
+    return {
+        "_default": {},
+        "_updater": "set",
+        "_emit": True,
+    }
@@ -0,0 +1,151 @@
+import numpy as np
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+
+
+def point_segment_distances(points, starts, ends):
+    """
+    Distance from each point to the segment between the
+    corresponding start and end points
+    """
+    direction = ends - starts
+    squared_length = np.einsum("ij,ij->i", direction, direction)
+    projection = np.einsum("ij,ij->i", points - starts, direction)
+    along = np.divide(
+        projection,
+        squared_length,
+        out=np.zeros_like(projection),
+        where=squared_length > 0,
+    )
+    closest = starts + np.clip(along, 0.0, 1.0)[:, None] * direction
+    return np.linalg.norm(points - closest, axis=1)
+
+
+def douglas_peucker_mask(points, offsets, tolerance):
+    """
+    Which points Douglas-Peucker keeps, simplifying every fiber at
+    once: each removed point is within tolerance of the segment
+    between the kept points around it
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    lengths = np.diff(offsets)
+    filled = lengths > 0
+    keep[offsets[:-1][filled]] = True
+    keep[offsets[1:][filled] - 1] = True
+    # open segments, as indices of their first and last points
+    starts = offsets[:-1][lengths > 2]
+    ends = offsets[1:][lengths > 2] - 1
+    while len(starts):
+        counts = ends - starts - 1
+        segment_starts = np.cumsum(counts) - counts
+        interior = np.repeat(starts + 1 - segment_starts, counts) + np.arange(
+            counts.sum()
+        )
+        distances = point_segment_distances(
+            points[interior],
+            points[np.repeat(starts, counts)],
+            points[np.repeat(ends, counts)],
+        )
+        farthest = np.maximum.reduceat(distances, segment_starts)
+        # the first point of each segment at its farthest distance
+        candidates = np.flatnonzero(distances == np.repeat(farthest, counts))
+        segments = np.repeat(np.arange(len(counts)), counts)[candidates]
+        _, first = np.unique(segments, return_index=True)
+        splits = interior[candidates[first]]
+
+        far = farthest > tolerance
+        keep[splits[far]] = True
+        starts, splits, ends = starts[far], splits[far], ends[far]
+        starts = np.concatenate([starts, splits])
+        ends = np.concatenate([splits, ends])
+        remaining = ends - starts > 1
+        starts, ends = starts[remaining], ends[remaining]
+    return keep
+
+
+def resample_points(points, offsets, spacing):
+    """
+    Resample every fiber with two or more points at (nearly) equal arc
+    length steps of at most spacing, keeping both ends. Returns the new
+    points and offsets.
+    """
+    lengths = np.diff(offsets)
+    segment_lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    # segments joining the last point of a fiber to the next fiber,
+    # skipping the boundaries of empty fibers at either end
+    boundaries = offsets[1:-1]
+    boundaries = boundaries[(boundaries > 0) & (boundaries < len(points))]
+    segment_lengths[boundaries - 1] = 0.0
+    arc = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+    first = offsets[:-1]
+    # empty fibers at the end start past the last point, and are masked below
+    last = np.minimum(np.maximum(offsets[1:] - 1, first), max(len(points) - 1, 0))
+    fiber_lengths = np.where(lengths > 0, arc[last] - arc[np.minimum(first, last)], 0)
+    counts = np.where(
+        lengths > 1,
+        np.maximum(np.ceil(fiber_lengths / spacing).astype(np.int64) + 1, 2),
+        lengths,
+    )
+    new_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_offsets[1:])
+
+    fibers = np.repeat(np.arange(len(lengths)), counts)
+    step = np.arange(new_offsets[-1]) - new_offsets[fibers]
+    fraction = np.divide(
+        step,
+        counts[fibers] - 1,
+        out=np.zeros(len(step)),
+        where=counts[fibers] > 1,
+    )
+    targets = arc[first[fibers]] + fraction * fiber_lengths[fibers]
+    # the segment of each target, within its own fiber
+    segment = np.searchsorted(arc, targets, side="right") - 1
+    segment = np.clip(segment, first[fibers], np.maximum(last[fibers] - 1, 0))
+    if len(points) < 2:
+        return points.copy(), new_offsets
+    following = np.minimum(segment + 1, last[fibers])
+    span = arc[following] - arc[segment]
+    along = np.divide(
+        targets - arc[segment], span, out=np.zeros(len(targets)), where=span > 0
+    )
+    along = np.clip(along, 0.0, 1.0)[:, None]
+    new_points = points[segment] + along * (points[following] - points[segment])
+    # fibers of one point have no segment to resample, and are copied
+    single = lengths == 1
+    new_points[new_offsets[:-1][single]] = points[first[single]]
+    return new_points, new_offsets
+
+
+def simplify_points(points, offsets, tolerance, method="douglas_peucker"):
+    """
+    Simplify every fiber of a points buffer, returning the new points,
+    offsets and the compression ratio (points before over points after).
+    "douglas_peucker" keeps a subset of the points, every removed point
+    within tolerance of the simplified fiber. "resample" places points
+    at most tolerance apart along each fiber, which bounds spacing
+    rather than error.
+    """
+    if method == "douglas_peucker":
+        keep = douglas_peucker_mask(points, offsets, tolerance)
+        kept = np.concatenate([[0], np.cumsum(keep)])
+        simplified, new_offsets = points[keep], kept[offsets]
+    elif method == "resample":
+        simplified, new_offsets = resample_points(points, offsets, tolerance)
+    else:
+        raise ValueError(f"unknown simplification method {method}")
+    ratio = len(points) / len(simplified) if len(simplified) else 1.0
+    return simplified, new_offsets, ratio
+
+
+def simplify_fiber_arrays(fibers, tolerance, method="douglas_peucker"):
+    """
+    simplify_points for a FiberArrays, returning the simplified
+    FiberArrays and the compression ratio
+    """
+    points, offsets, ratio = simplify_points(
+        fibers.points, fibers.offsets, tolerance, method
+    )
+    simplified = FiberArrays(
+        fibers.fiber_ids, fibers.type_codes, offsets, points, fibers.type_names
+    )
+    return simplified, ratio
@@ -0,0 +1,98 @@
+import mmap
+import os
+
+from vivarium_medyan.library.coordinates import format_values
+
+# bytes read per backward seek when looking for the last frame
+SNAPSHOT_BLOCK_SIZE = 1 << 16
+
+# frames in snapshot.traj are separated by a single blank line
+FRAME_SEPARATOR = b"\n\n"
+
+
+def find_last_frame_offset(snapshot_file, block_size=SNAPSHOT_BLOCK_SIZE):
+    """
+    Seek backward through an open binary trajectory and return the byte
+    offset where its last frame header starts. Trailing blank lines are
+    ignored, and a file without frame separators starts at offset 0.
+    """
+    snapshot_file.seek(0, os.SEEK_END)
+    position = snapshot_file.tell()
+    content_end = None
+    overlap = b""
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        snapshot_file.seek(position)
+        block = snapshot_file.read(read_size)
+        # keep one byte of the previous block so separators that
+        # straddle a block boundary are still found
+        window = block + overlap
+        if content_end is None:
+            stripped = window.rstrip()
+            if stripped:
+                content_end = position + len(stripped)
+        if content_end is not None:
+            limit = min(len(window), content_end - position)
+            index = window.rfind(FRAME_SEPARATOR, 0, limit)
+            if index >= 0:
+                return position + index + len(FRAME_SEPARATOR)
+        overlap = block[:1]
+    return 0
+
+
+def read_last_frame(snapshot_path, block_size=SNAPSHOT_BLOCK_SIZE):
+    """
+    Read only the lines of the final frame of a snapshot.traj file,
+    so memory use depends on the size of one frame, not the whole run.
+    """
+    with open(snapshot_path, "rb") as snapshot_file:
+        offset = find_last_frame_offset(snapshot_file, block_size)
+        snapshot_file.seek(offset)
+        frame_text = snapshot_file.read().decode("utf-8")
+    return frame_text.split("\n")
+
+
+def read_last_frame_mapped(snapshot_path):
+    """
+    read_last_frame through a memory map: the separator before the last
+    frame is found in the mapped file, so only that frame is copied out
+    """
+    with open(snapshot_path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size == 0:
+            return [""]
+        with mmap.mmap(
+            snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as snapshot_map:
+            content_end = len(snapshot_map)
+            while content_end > 0 and snapshot_map[content_end - 1] in b" \t\r\n":
+                content_end -= 1
+            index = snapshot_map.rfind(FRAME_SEPARATOR, 0, content_end)
+            offset = 0 if index < 0 else index + len(FRAME_SEPARATOR)
+            frame_text = snapshot_map[offset:].decode("utf-8")
+    return frame_text.split("\n")
+
+
+def format_snapshot_frame(step, time, fibers):
+    """
+    Format one snapshot.traj frame from a list of
+    (fiber_id, type_index, points) tuples.
+    """
+    lines = [f"{step} {time} {len(fibers)} 0 0 0"]
+    for fiber_id, type_index, points in fibers:
+        coordinates = " ".join(format_values(points))
+        lines.append(f"FILAMENT {fiber_id} {type_index} {len(points) - 1} 0 0")
+        lines.append(coordinates)
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot(snapshot_path, frames):
+    """
+    Write a synthetic snapshot.traj from an iterable of
+    (time, fibers) pairs, in the format MEDYAN writes.
+    """
+    with open(snapshot_path, "w") as snapshot_file:
+        for step, (time, fibers) in enumerate(frames):
+            if step > 0:
+                snapshot_file.write("\n")
+            snapshot_file.write(format_snapshot_frame(step, time, fibers))
@@ -0,0 +1,251 @@
+import numpy as np
+
+from vivarium_medyan.library.fiber_arrays import FiberArrays, diff_fiber_arrays
+from vivarium_medyan.library.simplify import point_segment_distances
+
+
+def fiber_segments(points, offsets):
+    """
+    The start and end points of every segment of every fiber, with
+    the index of its fiber and its position along the fiber
+    """
+    lengths = np.diff(offsets)
+    point_fibers = np.repeat(np.arange(len(lengths)), lengths)
+    inside = np.flatnonzero(point_fibers[:-1] == point_fibers[1:])
+    fibers = point_fibers[inside]
+    positions = inside - offsets[fibers]
+    return points[inside], points[inside + 1], fibers, positions
+
+
+def segment_box_overlap(starts, ends, lower, upper):
+    """
+    Whether each segment intersects the box [lower, upper], by clipping
+    its parameter range against the slab of each axis
+    """
+    direction = ends - starts
+    enter = np.zeros(len(starts))
+    leave = np.ones(len(starts))
+    for axis in range(3):
+        step = direction[:, axis]
+        flat = step == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            near = (lower[axis] - starts[:, axis]) / step
+            far = (upper[axis] - starts[:, axis]) / step
+        low = np.where(flat, -np.inf, np.minimum(near, far))
+        high = np.where(flat, np.inf, np.maximum(near, far))
+        outside = flat & (
+            (starts[:, axis] < lower[axis]) | (starts[:, axis] > upper[axis])
+        )
+        enter = np.maximum(enter, low)
+        leave = np.where(outside, -1.0, np.minimum(leave, high))
+    return enter <= leave
+
+
+class SegmentGrid:
+    """
+    Uniform grid over fiber segments, with cells aligned to MEDYAN's
+    compartments. Segments longer than the smallest cell are cut into
+    pieces that short, each binned by its midpoint, so a query only
+    visits the cells within its range plus half a cell. Pieces are kept
+    sorted by cell, with offsets to each cell's first piece.
+    """
+
+    def __init__(self, n_compartments, compartment_size, origin=(0.0, 0.0, 0.0)):
+        self.n_cells = np.asarray(n_compartments, dtype=np.int64)
+        self.cell_size = np.asarray(compartment_size, dtype=np.float64)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.piece_length = self.cell_size.min()
+        self.fibers = None
+        self.handles = {}  # fiber id to a handle that lasts across updates
+        self.handle_ids = []
+        self.clear_pieces()
+
+    def clear_pieces(self):
+        self.piece_cells = np.zeros(0, dtype=np.int64)
+        self.piece_handles = np.zeros(0, dtype=np.int64)
+        self.piece_positions = np.zeros(0, dtype=np.int64)
+        self.piece_starts = np.zeros((0, 3))
+        self.piece_ends = np.zeros((0, 3))
+        self.cell_offsets = np.zeros(self.n_cells.prod() + 1, dtype=np.int64)
+
+    def __len__(self):
+        """
+        Number of pieces indexed
+        """
+        return len(self.piece_cells)
+
+    def cell_of(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.n_cells - 1)
+
+    def pieces(self, fibers, handles):
+        """
+        Cut the segments of fibers into pieces no longer than a cell
+        """
+        starts, ends, segment_fibers, positions = fiber_segments(
+            fibers.points, fibers.offsets
+        )
+        lengths = np.linalg.norm(ends - starts, axis=1)
+        counts = np.maximum(np.ceil(lengths / self.piece_length), 1).astype(np.int64)
+        parents = np.repeat(np.arange(len(starts)), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        along = (np.arange(counts.sum()) - first + 0.5) / counts[parents]
+        midpoints = starts[parents] + along[:, None] * (ends - starts)[parents]
+        return {
+            "cells": np.ravel_multi_index(self.cell_of(midpoints).T, self.n_cells),
+            "handles": handles[segment_fibers[parents]],
+            "positions": positions[parents],
+            "starts": starts[parents],
+            "ends": ends[parents],
+        }
+
+    def handles_of(self, fiber_ids):
+        handles = np.empty(len(fiber_ids), dtype=np.int64)
+        for index, fiber_id in enumerate(fiber_ids):
+            handle = self.handles.get(fiber_id)
+            if handle is None:
+                handle = self.handles[fiber_id] = len(self.handle_ids)
+                self.handle_ids.append(fiber_id)
+            handles[index] = handle
+        return handles
+
+    def update(self, fibers):
+        """
+        Index a new network, re-cutting only the fibers that were
+        added or changed since the previous one
+        """
+        if not isinstance(fibers, FiberArrays):
+            fibers = FiberArrays.from_dict(fibers)
+        if self.fibers is None:
+            self.clear_pieces()
+            changed = np.arange(len(fibers))
+            stale = np.zeros(0, dtype=np.int64)
+        else:
+            added, changed, removed = diff_fiber_arrays(self.fibers, fibers)
+            stale = np.array(
+                [self.handles.pop(fiber_id) for fiber_id in removed]
+                + [self.handles[fibers.fiber_ids[index]] for index in changed.tolist()],
+                dtype=np.int64,
+            )
+            changed = np.sort(np.concatenate([added, changed]))
+        self.fibers = fibers
+        selected = fibers.select(changed)
+        new = self.pieces(selected, self.handles_of(selected.fiber_ids))
+
+        keep = ~np.isin(self.piece_handles, stale)
+        order = np.argsort(new["cells"], kind="stable")
+        # both runs are sorted by cell, so the stable sort only merges them
+        cells = np.concatenate([self.piece_cells[keep], new["cells"][order]])
+        merged = np.argsort(cells, kind="stable")
+        self.piece_cells = cells[merged]
+        for name, values in [
+            ("piece_handles", new["handles"]),
+            ("piece_positions", new["positions"]),
+            ("piece_starts", new["starts"]),
+            ("piece_ends", new["ends"]),
+        ]:
+            combined = np.concatenate([getattr(self, name)[keep], values[order]])
+            setattr(self, name, combined[merged])
+        self.cell_offsets = np.searchsorted(
+            self.piece_cells, np.arange(self.n_cells.prod() + 1)
+        )
+        return len(changed)
+
+    def candidates(self, lower, upper):
+        """
+        Pieces in the cells overlapping [lower, upper] grown by half
+        a piece, so every piece reaching into the range is included
+        """
+        margin = 0.5 * self.piece_length
+        low = self.cell_of(np.asarray(lower, dtype=np.float64) - margin)
+        high = self.cell_of(np.asarray(upper, dtype=np.float64) + margin)
+        # the cells of each row along z are contiguous in the flat index
+        rows = np.stack(
+            np.meshgrid(
+                np.arange(low[0], high[0] + 1),
+                np.arange(low[1], high[1] + 1),
+                indexing="ij",
+            ),
+            axis=-1,
+        ).reshape(-1, 2)
+        first = np.ravel_multi_index(
+            (rows[:, 0], rows[:, 1], np.full(len(rows), low[2])), self.n_cells
+        )
+        starts = self.cell_offsets[first]
+        ends = self.cell_offsets[first + high[2] - low[2] + 1]
+        counts = ends - starts
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(starts, counts) + np.arange(counts.sum()) - offsets
+
+    def unique_segments(self, pieces, values):
+        """
+        One entry per segment cut into several pieces, with
+        fiber ids, positions along the fiber and values
+        """
+        keys = (
+            self.piece_handles[pieces] * (len(self) + 1) + self.piece_positions[pieces]
+        )
+        _, first = np.unique(keys, return_index=True)
+        pieces, values = pieces[first], values[first]
+        order = np.argsort(values, kind="stable")
+        pieces, values = pieces[order], values[order]
+        fiber_ids = [self.handle_ids[handle] for handle in self.piece_handles[pieces]]
+        return fiber_ids, self.piece_positions[pieces], values
+
+    def radius(self, point, radius):
+        """
+        Segments within radius of a point: their fiber ids, positions
+        along the fiber and distances, nearest first
+        """
+        point = np.asarray(point, dtype=np.float64)
+        pieces = self.candidates(point - radius, point + radius)
+        distances = point_segment_distances(
+            np.broadcast_to(point, (len(pieces), 3)),
+            self.piece_starts[pieces],
+            self.piece_ends[pieces],
+        )
+        within = distances <= radius
+        return self.unique_segments(pieces[within], distances[within])
+
+    def nearest(self, point):
+        """
+        The segment nearest a point, as (fiber id, position, distance),
+        or None when nothing is indexed
+        """
+        if len(self) == 0:
+            return None
+        point = np.asarray(point, dtype=np.float64)
+        radius = self.cell_size.max()
+        # beyond this every cell has been searched
+        reach = np.linalg.norm(self.cell_size * self.n_cells) + np.linalg.norm(
+            point - self.origin
+        )
+        while radius <= 2 * reach:
+            fiber_ids, positions, distances = self.radius(point, radius)
+            if fiber_ids:
+                return fiber_ids[0], positions[0], distances[0]
+            radius *= 2
+        # only segments far outside the grid are left, so check them all
+        pieces = np.arange(len(self))
+        distances = point_segment_distances(
+            np.broadcast_to(point, (len(pieces), 3)),
+            self.piece_starts,
+            self.piece_ends,
+        )
+        fiber_ids, positions, distances = self.unique_segments(pieces, distances)
+        return fiber_ids[0], positions[0], distances[0]
+
+    def box(self, lower, upper):
+        """
+        Segments intersecting the box [lower, upper]: their fiber ids
+        and positions along the fiber
+        """
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        pieces = self.candidates(lower, upper)
+        inside = segment_box_overlap(
+            self.piece_starts[pieces], self.piece_ends[pieces], lower, upper
+        )
+        pieces = pieces[inside]
+        fiber_ids, positions, _ = self.unique_segments(pieces, np.zeros(len(pieces)))
+        return fiber_ids, positions
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import shutil
+
+
+class StagingCache:
+    """
+    Remember what was staged into an input directory, so config files
+    are only copied (or hardlinked) when their source changed and text
+    files are only rewritten when their content changed. With
+    enabled=False everything is copied and written every time.
+    """
+
+    def __init__(self, enabled=True, hardlink=False):
+        self.enabled = enabled
+        self.hardlink = hardlink
+        self.signatures = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            "files_written": 0,
+            "files_skipped": 0,
+            "bytes_written": 0,
+            "bytes_skipped": 0,
+        }
+
+    def _unchanged(self, destination, signature):
+        return (
+            self.enabled
+            and self.signatures.get(destination) == signature
+            and os.path.exists(destination)
+        )
+
+    def _record(self, destination, signature, size, written):
+        self.signatures[destination] = signature
+        if written:
+            self.stats["files_written"] += 1
+            self.stats["bytes_written"] += size
+        else:
+            self.stats["files_skipped"] += 1
+            self.stats["bytes_skipped"] += size
+
+    def stage_file(self, source, destination):
+        """
+        Copy source to destination unless its mtime and size are the
+        same as when it was last staged. Returns whether it was copied.
+        """
+        destination = str(destination)
+        stat = os.stat(source)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._unchanged(destination, signature):
+            self._record(destination, signature, stat.st_size, False)
+            return False
+        if self.hardlink:
+            if os.path.exists(destination):
+                os.remove(destination)
+            try:
+                os.link(source, destination)
+            except OSError:
+                # different filesystems, fall back to copying
+                shutil.copyfile(source, destination)
+        else:
+            shutil.copyfile(source, destination)
+        self._record(destination, signature, stat.st_size, True)
+        return True
+
+    def write_text(self, destination, text):
+        """
+        Write text to destination unless the same content was last
+        written there. Returns whether it was written.
+        """
+        destination = str(destination)
+        data = text.encode("utf-8")
+        signature = hashlib.sha1(data).hexdigest()
+        if self._unchanged(destination, signature):
+            self._record(destination, signature, len(data), False)
+            return False
+        with open(destination, "wb") as text_file:
+            text_file.write(data)
+        self._record(destination, signature, len(data), True)
+        return True
@@ -0,0 +1,209 @@
+import re
+from functools import cached_property
+
+import numpy as np
+
+from vivarium_medyan.library.outputs import OUTPUT_FILES
+
+AXES = ("X", "Y", "Z")
+
+
+def read_system_text(system_text, key, default=None):
+    match = re.search(rf"^\s*{key}:\s*(\S+)", system_text, re.MULTILINE)
+    return match.group(1) if match else default
+
+
+def read_system_texts(system_text, key):
+    """
+    Every value of a key that may be repeated, like OUTPUTTYPE
+    """
+    return re.findall(rf"^\s*{key}:\s*(\S+)", system_text, re.MULTILINE)
+
+
+def read_system_value(system_text, key, default=0.0):
+    return float(read_system_text(system_text, key, default))
+
+
+def read_grid(system_text):
+    """
+    The number of compartments and the compartment size along each axis
+    """
+    return SystemInput.parse(system_text).grid
+
+
+def replace_system_values(system_text, values):
+    """
+    Replace the values of existing keys in a system input, keeping
+    the alignment of each line
+    """
+    return SystemInput.parse(system_text).with_values(values).text
+
+
+def positive_int(key, value):
+    if isinstance(value, str):
+        value = float(value)
+    if value != int(value) or int(value) <= 0:
+        raise ValueError(f"{key} must be a positive integer, got {value}")
+    return str(int(value))
+
+
+def positive_float(key, value):
+    if float(value) <= 0:
+        raise ValueError(f"{key} must be positive, got {value}")
+    return str(float(value))
+
+
+def output_types(key, value):
+    if isinstance(value, str):
+        value = [value]
+    names = [str(output).upper() for output in value]
+    unknown = sorted({name.lower() for name in names} - set(OUTPUT_FILES))
+    if unknown:
+        raise ValueError(f"unknown {key} {unknown}")
+    return names
+
+
+# keys whose overrides are checked, each formatting valid values as text;
+# keys returning a list are repeated, one line per item
+VALIDATORS = {
+    **{f"N{axis}": positive_int for axis in AXES},
+    **{f"COMPARTMENTSIZE{axis}": positive_float for axis in AXES},
+    "RUNTIME": positive_float,
+    "SNAPSHOTTIME": positive_float,
+    "OUTPUTTYPE": output_types,
+}
+
+ENTRY_PATTERN = re.compile(r"^(\s*([A-Za-z][A-Za-z0-9_]*):\s*)(.*?)\s*$")
+
+
+def format_value(key, value):
+    validator = VALIDATORS.get(key)
+    if validator is not None:
+        return validator(key, value)
+    value = str(value)
+    if "\n" in value:
+        raise ValueError(f"{key} must be a single line")
+    return value
+
+
+def index_entries(lines):
+    entries = {}
+    for index, line in enumerate(lines):
+        match = ENTRY_PATTERN.match(line)
+        if match:
+            entries.setdefault(match.group(2), []).append(index)
+    return entries
+
+
+class SystemInput:
+    """
+    A system input (or chemistry input) parsed once into lines and the
+    line numbers of each key, so values are read and overridden without
+    scanning the text again. Comment lines are kept but not indexed.
+    Instances are not modified: with_values returns a new one.
+    """
+
+    def __init__(self, lines, entries=None):
+        self.lines = lines
+        self.entries = entries if entries is not None else index_entries(lines)
+
+    @classmethod
+    def parse(cls, text):
+        return cls(text.split("\n"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as input_file:
+            return cls.parse(input_file.read())
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def values(self, key):
+        """
+        Every value of a key, which may be repeated like OUTPUTTYPE
+        """
+        return [
+            ENTRY_PATTERN.match(self.lines[line]).group(3)
+            for line in self.entries.get(key, [])
+        ]
+
+    def get(self, key, default=None):
+        values = self.values(key)
+        return values[0] if values else default
+
+    def value(self, key, default=0.0):
+        return float(self.get(key, default))
+
+    def with_values(self, values):
+        """
+        A copy with the values of keys replaced, keeping the alignment of
+        each line. Values are checked by VALIDATORS; lists of repeated
+        keys replace every line of the key, and are added at the end when
+        it is missing. Other keys must already be present.
+        """
+        lines = list(self.lines)
+        repeated = {}
+        for key, value in values.items():
+            value = format_value(key, value)
+            if isinstance(value, list):
+                repeated[key] = value
+                continue
+            if key not in self.entries:
+                raise KeyError(f"{key} is not in the system input")
+            for line in self.entries[key]:
+                prefix = ENTRY_PATTERN.match(lines[line]).group(1)
+                lines[line] = prefix + value
+        if not repeated:
+            return SystemInput(lines, self.entries)
+        for key, items in repeated.items():
+            positions = index_entries(lines).get(key)
+            if positions:
+                prefix = ENTRY_PATTERN.match(lines[positions[0]]).group(1)
+                insert = positions[0]
+                for line in reversed(positions):
+                    del lines[line]
+            else:
+                prefix = f"{key + ':':<29}"
+                insert = len(lines)
+            lines[insert:insert] = [prefix + item for item in items]
+        return SystemInput(lines)
+
+    @cached_property
+    def text(self):
+        return "\n".join(self.lines)
+
+    @cached_property
+    def n_compartments(self):
+        return np.array([int(self.value(f"N{axis}")) for axis in AXES])
+
+    @cached_property
+    def compartment_size(self):
+        return np.array([self.value(f"COMPARTMENTSIZE{axis}") for axis in AXES])
+
+    @property
+    def grid(self):
+        """
+        The number of compartments and the compartment size along each axis
+        """
+        return self.n_compartments, self.compartment_size
+
+    @cached_property
+    def box_extent(self):
+        return self.n_compartments * self.compartment_size
+
+    @property
+    def runtime(self):
+        return self.value("RUNTIME")
+
+    @property
+    def snapshot_time(self):
+        return self.value("SNAPSHOTTIME")
+
+    @property
+    def chemistry_file(self):
+        return self.get("CHEMISTRYFILE")
+
+    @property
+    def output_types(self):
+        return [output.lower() for output in self.values("OUTPUTTYPE")]
@@ -0,0 +1,276 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from vivarium.core.emitter import Emitter
+from vivarium.library.topology import assoc_path, get_in
+
+from vivarium_medyan.library.fiber_arrays import (
+    FiberArrays,
+    FiberArraysSerializer,
+    intern_type_names,
+)
+
+METADATA_FILE = "metadata.json"
+CHUNK_COLUMNS = (
+    "times",  # (n_frames,)
+    "box_extents",  # (n_frames, 3), nan where no extent was given
+    "frame_offsets",  # (n_frames + 1,) into the fiber columns
+    "fiber_ids",  # (n_fibers,) fixed width unicode
+    "type_codes",  # (n_fibers,) into the trajectory's type name table
+    "point_offsets",  # (n_fibers + 1,) into points
+    "points",  # (n_points, 3)
+)
+
+
+def as_fiber_arrays(fibers, type_names=None):
+    """
+    Accept FiberArrays, their serialized form, or the dict form
+    """
+    if isinstance(fibers, FiberArrays):
+        return fibers
+    if "fiber_ids" in fibers and "offsets" in fibers:
+        return FiberArraysSerializer().deserialize(fibers)
+    return FiberArrays.from_dict(fibers, type_names)
+
+
+class TrajectoryWriter:
+    """
+    Write fiber trajectories to a directory of columnar chunks of
+    chunk_size frames each. Uncompressed chunks are a directory of
+    .npy files per column, which readers memory map; compressed chunks
+    are a single .npz file.
+    """
+
+    def __init__(self, directory, chunk_size=64, compress=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.metadata = {"compressed": compress, "type_names": [], "chunks": []}
+        metadata_path = self.directory / METADATA_FILE
+        if metadata_path.exists():
+            # append to an existing trajectory
+            self.metadata = json.loads(metadata_path.read_text())
+        self.frames = []
+
+    def append(self, time, fibers, box_extent=None):
+        fibers = as_fiber_arrays(fibers, self.metadata["type_names"])
+        # map onto the trajectory's type table, which only grows
+        table = intern_type_names(fibers.type_names, self.metadata["type_names"])
+        if box_extent is None:
+            box_extent = np.full(3, np.nan)
+        self.frames.append(
+            (
+                float(time),
+                np.asarray(box_extent, dtype=np.float64),
+                fibers.fiber_ids,
+                table[fibers.type_codes],
+                fibers.offsets,
+                fibers.points,
+            )
+        )
+        if len(self.frames) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.frames:
+            return
+        times, box_extents, fiber_ids, type_codes, offsets, points = zip(*self.frames)
+        n_fibers = [len(frame_ids) for frame_ids in fiber_ids]
+        frame_offsets = np.zeros(len(self.frames) + 1, dtype=np.int64)
+        np.cumsum(n_fibers, out=frame_offsets[1:])
+        # shift each frame's point offsets past the points of earlier frames
+        point_starts = np.cumsum([0] + [len(frame) for frame in points[:-1]])
+        point_offsets = np.concatenate(
+            [
+                fiber_offsets[:-1] + start
+                for fiber_offsets, start in zip(offsets, point_starts)
+            ]
+            + [[sum(len(frame) for frame in points)]]
+        )
+        columns = {
+            "times": np.array(times),
+            "box_extents": np.array(box_extents).reshape(-1, 3),
+            "frame_offsets": frame_offsets,
+            "fiber_ids": np.array(
+                [fiber_id for frame in fiber_ids for fiber_id in frame], dtype=str
+            ),
+            "type_codes": np.concatenate(type_codes).astype(np.int32),
+            "point_offsets": point_offsets.astype(np.int64),
+            "points": np.concatenate(points).reshape(-1, 3),
+        }
+        name = f"chunk_{len(self.metadata['chunks']):06d}"
+        if self.compress:
+            np.savez_compressed(self.directory / f"{name}.npz", **columns)
+        else:
+            (self.directory / name).mkdir(exist_ok=True)
+            for column, values in columns.items():
+                np.save(self.directory / name / f"{column}.npy", values)
+        self.metadata["chunks"].append(
+            {"name": name, "compressed": self.compress, "times": list(times)}
+        )
+        self.frames = []
+        self.write_metadata()
+
+    def write_metadata(self):
+        # replace atomically so readers never see a partial index
+        path = self.directory / METADATA_FILE
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.metadata))
+        os.replace(temporary, path)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Random access to the frames of a trajectory written by
+    TrajectoryWriter. Uncompressed chunks are memory mapped, so
+    reading one frame only touches that frame's pages.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.metadata = json.loads((self.directory / METADATA_FILE).read_text())
+        self.type_names = self.metadata["type_names"]
+        chunk_times = [chunk["times"] for chunk in self.metadata["chunks"]]
+        self.times = np.array([time for times in chunk_times for time in times])
+        # first frame index of each chunk
+        self.chunk_starts = np.cumsum([0] + [len(times) for times in chunk_times])
+        self._chunks = {}
+
+    def __len__(self):
+        return len(self.times)
+
+    def chunk(self, chunk_index):
+        if chunk_index not in self._chunks:
+            chunk = self.metadata["chunks"][chunk_index]
+            if chunk["compressed"]:
+                # keep only the last compressed chunk decompressed
+                self._chunks = {
+                    key: value
+                    for key, value in self._chunks.items()
+                    if not self.metadata["chunks"][key]["compressed"]
+                }
+                with np.load(self.directory / f"{chunk['name']}.npz") as data:
+                    columns = {column: data[column] for column in CHUNK_COLUMNS}
+            else:
+                columns = {
+                    column: np.load(
+                        self.directory / chunk["name"] / f"{column}.npy",
+                        mmap_mode="r",
+                    )
+                    for column in CHUNK_COLUMNS
+                }
+            self._chunks[chunk_index] = columns
+        return self._chunks[chunk_index]
+
+    def locate(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame {index} out of range for {len(self)} frames")
+        chunk_index = int(np.searchsorted(self.chunk_starts, index, side="right")) - 1
+        return chunk_index, index - self.chunk_starts[chunk_index]
+
+    def frame(self, index):
+        """
+        The (time, FiberArrays) of the frame at index
+        """
+        chunk_index, frame = self.locate(index)
+        columns = self.chunk(chunk_index)
+        first, last = columns["frame_offsets"][frame : frame + 2]
+        point_offsets = np.array(columns["point_offsets"][first : last + 1])
+        fibers = FiberArrays(
+            columns["fiber_ids"][first:last].tolist(),
+            columns["type_codes"][first:last],
+            point_offsets - point_offsets[0],
+            columns["points"][point_offsets[0] : point_offsets[-1]],
+            self.type_names,
+        )
+        return float(columns["times"][frame]), fibers
+
+    def box_extent(self, index):
+        chunk_index, frame = self.locate(index)
+        return np.array(self.chunk(chunk_index)["box_extents"][frame])
+
+    def frame_at(self, time):
+        """
+        The last frame at or before time
+        """
+        index = int(np.searchsorted(self.times, time, side="right")) - 1
+        return self.frame(max(index, 0))
+
+    def __getitem__(self, index):
+        return self.frame(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.frame(index)
+
+
+class FiberTrajectoryEmitter(Emitter):
+    """
+    Emit the fibers (and box extent) of each history snapshot to a
+    columnar trajectory on disk instead of keeping nested dicts in RAM.
+    Call close() when the simulation ends to write the last chunk.
+
+    Config keys: path, chunk_size, compress, fibers_path, box_extent_path
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.path = config.get("path", "fiber_trajectory")
+        self.fibers_path = tuple(config.get("fibers_path", ("fibers",)))
+        self.box_extent_path = tuple(
+            config.get("box_extent_path", ("fibers_box_extent",))
+        )
+        self.writer = TrajectoryWriter(
+            self.path,
+            chunk_size=config.get("chunk_size", 64),
+            compress=config.get("compress", False),
+        )
+
+    def emit(self, data):
+        if data["table"] != "history":
+            return
+        emit_data = data["data"]
+        fibers = get_in(emit_data, self.fibers_path)
+        if fibers is None:
+            return
+        self.writer.append(
+            emit_data["time"],
+            fibers,
+            get_in(emit_data, self.box_extent_path),
+        )
+
+    def close(self):
+        self.writer.close()
+
+    def reader(self):
+        self.writer.flush()
+        return TrajectoryReader(self.path)
+
+    def get_data(self, query=None):
+        """
+        Read the whole trajectory back in vivarium's raw data format,
+        with fibers in the dict form
+        """
+        data = {}
+        reader = self.reader()
+        for index, (time, fibers) in enumerate(reader):
+            frame = assoc_path({}, self.fibers_path, fibers.to_dict())
+            box_extent = reader.box_extent(index)
+            if not np.isnan(box_extent).all():
+                frame = assoc_path(frame, self.box_extent_path, box_extent)
+            data[time] = frame
+        return data
@@ -0,0 +1,41 @@
+from vivarium.core.process import Step
+
+from vivarium_medyan.library.observables import IncrementalObservables
+from vivarium_medyan.library.schema import (
+    fiber_arrays_schema,
+    fibers_schema,
+    observables_schema,
+)
+
+NAME = "fiber_observables"
+
+
+class FiberObservables(Step):
+    """
+    Summarize the fiber network after every update: fiber lengths, end
+    to end distances, curvature, nematic order and contraction, only
+    recomputing the fibers that changed since the last update
+    """
+
+    name = NAME
+
+    defaults = {
+        "fiber_representation": "dict",  # or "arrays", as for MedyanProcess
+    }
+
+    def __init__(self, parameters=None):
+        super().__init__(parameters)
+        self.observables = IncrementalObservables()
+
+    def ports_schema(self):
+        if self.parameters["fiber_representation"] == "arrays":
+            fibers = fiber_arrays_schema()["fibers"]
+        else:
+            fibers = fibers_schema()["fibers"]
+        return {
+            "fibers": fibers,
+            "observables": observables_schema(),
+        }
+
+    def next_update(self, timestep, states):
+        return {"observables": self.observables.update(states["fibers"])}
@@ -1,6 +1,10 @@
 import os
-import numpy as np
 import shutil
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
 from vivarium.core.process import Process
 from vivarium.core.engine import Engine
@@ -9,7 +13,53 @@ import docker
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from pathlib import Path
-from vivarium_medyan.library.schema import fibers_schema
+from vivarium_medyan.library.schema import (
+    fibers_schema,
+    fiber_arrays_schema,
+    frames_schema,
+    metrics_schema,
+    output_schema,
+)
+from vivarium_medyan.library.fiber_arrays import (
+    FiberArrays,
+    concatenate_fiber_arrays,
+    fiber_delta,
+)
+from vivarium_medyan.library.outputs import OUTPUT_FILES, OutputFile
+from vivarium_medyan.library.simplify import simplify_points
+from vivarium_medyan.library.spatial_index import SegmentGrid
+from vivarium_medyan.library.snapshot import read_last_frame, read_last_frame_mapped
+from vivarium_medyan.library.staging import StagingCache
+from vivarium_medyan.library.decomposition import Decomposition, reconcile_points
+from vivarium_medyan.library.system_input import SystemInput, format_value
+from vivarium_medyan.library.log_stream import ERROR_PATTERNS, LogMonitor
+from vivarium_medyan.library.result_cache import ResultCache, hash_directory
+from vivarium_medyan.library.metrics import (
+    NULL_METRICS,
+    StepMetrics,
+    append_json_line,
+)
+from vivarium_medyan.library.runners import (
+    DockerExecRunner,
+    DockerRunner,
+    LocalRunner,
+    MedyanRunner,
+    check_medyan_logs,
+    ensure_image,
+    get_runner_pool,
+    run_in_thread,
+    unique_name,
+)
+from vivarium_medyan.library.fake_medyan import FakeRunner
+from vivarium_medyan.library.coordinates import (
+    concatenate_points,
+    format_fiber_lines,
+    format_values,
+    parse_coordinate_lines,
+    parse_coordinates,
+    segment_indices,
+    split_points,
+)
 from vivarium_medyan.data.fibers import initial_fibers
 
 NAME = "MEDYAN"
@@ -30,24 +80,205 @@ class MedyanProcess(Process):
         "snapshot": 1.0,
         "transform_points": np.array([0, 0, 0]),
         "filament_projection_type": "",
+        "fiber_representation": "dict",  # or "arrays" for FiberArrays
+        # "docker", "binary" (a local executable), "fake" (an in-process stub)
+        # or a MedyanRunner instance
+        "runner": "docker",
+        "medyan_command": ["medyan"],  # the executable run by "binary"
+        # keep this many started runners (containers) shared between steps
+        "runner_pool_size": 0,
+        # mounted into pooled containers, must contain the input/output dirs
+        "workspace_root": ".",
+        # give this instance its own input/output subdirectories so several
+        # instances of one model can run at once
+        "isolate_workspace": False,
+        "workspace_id": None,  # generated when isolating and not given
+        # place the input and output directories in a new directory under
+        # ram_directory (tmpfs), removed when the process is garbage
+        # collected or close() is called, instead of input_directory and
+        # output_directory. ram_directory is also the pooled containers'
+        # workspace root, and the system temp directory when it is missing
+        "ram_workspace": False,
+        "ram_directory": "/dev/shm",
+        # find the last frame of snapshot.traj through a memory map rather
+        # than seeking backward in blocks; always on with ram_workspace
+        "mmap_snapshot": False,
+        # only copy configs and rewrite systeminput.txt when they change
+        "staging_cache": True,
+        "stage_with_hardlinks": False,
+        # keep MEDYAN's state between steps: after the first step, restart
+        # from the previous step's checkpoint instead of filaments.txt, so
+        # incoming fibers are ignored and each step only advances time
+        "continuation": False,
+        "checkpoint_file": "snapshot.traj",  # output MEDYAN restarts from
+        "restart_file": "restart.traj",  # where it is kept in the input dir
+        # lines added to the system input of continued steps, formatted
+        # with {restart_file} and {time}; keys differ between MEDYAN builds
+        "restart_directives": (
+            "RESTARTPHASE:                ON\n"
+            "RESTARTFILE:                 {restart_file}"
+        ),
+        # return only the fibers MEDYAN added, removed or moved by more
+        # than delta_tolerance (along any axis) instead of the whole network
+        "delta_updates": False,
+        "delta_tolerance": 0.0,
+        # record the wall time of each phase of a step, bytes written, bytes
+        # of the snapshot's last frame read and fiber counts; reported to
+        # metrics_callback(record), appended to the JSON lines metrics_file
+        # and/or updated on a "metrics" port
+        "metrics": False,
+        "metrics_callback": None,
+        "metrics_file": None,
+        "metrics_port": False,
+        # directory of a cache of MEDYAN outputs keyed by a hash of the
+        # staged inputs and MEDYAN version, skipping runs that were done
+        # before; bypass it for stochastic runs without a fixed seed
+        "result_cache": None,
+        "result_cache_bytes": 1 << 30,  # least recently used evicted past this
+        "bypass_cache": False,
+        # MEDYAN's output is streamed: runs are stopped after wall_timeout
+        # seconds, after idle_timeout seconds without output, or on a line
+        # matching error_patterns, and only the last log_buffer_lines lines
+        # are kept. progress_callback(simulated_time) follows progress lines
+        "wall_timeout": None,
+        "idle_timeout": None,
+        "error_patterns": ERROR_PATTERNS,
+        "log_buffer_lines": 1000,
+        "progress_callback": None,
+        # split the box into this many subdomains along (x, y, z), aligned
+        # to compartments, and run them in parallel; fibers are owned by
+        # the subdomain holding their center and copied as ghosts into
+        # neighbours within halo_compartments. Approximate (operator split)
+        "decomposition": None,
+        "halo_compartments": 1,
+        "decomposition_workers": None,  # one per subdomain by default
+        # simplify fiber polylines read from MEDYAN ("output") and/or written
+        # to it ("input"): "douglas_peucker" drops points, keeping every
+        # removed point within simplify_tolerance of the simplified fiber;
+        # "resample" spaces points simplify_tolerance apart along each fiber
+        "simplify_tolerance": None,
+        "simplify_method": "douglas_peucker",
+        "simplify_stages": ("output",),
+        # auxiliary outputs MEDYAN writes, rendered as OUTPUTTYPEs: any of
+        # "forces", "tensions", "birthtimes" and "chemistry", read lazily
+        # with output_file(name). Those in output_ports are also published
+        # from the last frame of each step on ports of the same name, as
+        # {fiber_id: values} or, for chemistry, {species: count}
+        "outputs": (),
+        "output_ports": (),
+        # also return the snapshot frames written within each step, after
+        # its start, on a "frames" port (see frames_schema), so long
+        # timesteps keep the resolution of snapshot
+        "emit_frames": False,
+        # keep spatial_index, a SegmentGrid over the fiber segments with
+        # cells aligned to compartments, for radius, nearest and box
+        # queries; after each step only changed fibers are re-indexed
+        "spatial_index": False,
+        # values replacing those of the model's system input, e.g. {"NX": 20,
+        # "COMPARTMENTSIZEX": 250.0}; keys and values are checked against
+        # the template when the process is created. RUNTIME, SNAPSHOTTIME
+        # and OUTPUTTYPE follow the time step, snapshot and outputs
+        "system_overrides": {},
     }
 
     def __init__(self, parameters=None):
         super().__init__(parameters)
         assert self.parameters["time_step"] >= self.parameters["snapshot"]
+        if self.parameters["decomposition"] and self.parameters["continuation"]:
+            raise ValueError("decomposition can't be combined with continuation")
+        unknown = set(self.parameters["outputs"]) - set(OUTPUT_FILES)
+        if unknown:
+            raise ValueError(f"unknown MEDYAN outputs {sorted(unknown)}")
+        if not set(self.parameters["output_ports"]) <= set(self.parameters["outputs"]):
+            raise ValueError("output_ports must be listed in outputs")
+        if self.parameters["decomposition"] and self.parameters["output_ports"]:
+            raise ValueError("output_ports can't be combined with decomposition")
+        if self.parameters["decomposition"] and self.parameters["emit_frames"]:
+            raise ValueError("emit_frames can't be combined with decomposition")
+        derived = {"RUNTIME", "SNAPSHOTTIME", "OUTPUTTYPE"}
+        self.system_overrides = {}
+        for key, value in self.parameters["system_overrides"].items():
+            if key in derived:
+                raise ValueError(f"{key} is set by the process and can't be overridden")
+            self.system_overrides[key] = format_value(key, value)
+        if self.system_overrides:
+            # keys are plain text in the template, only some values are templated
+            template = SystemInput.load(self.template_path())
+            unknown = sorted(set(self.system_overrides) - set(template.entries))
+            if unknown:
+                raise KeyError(f"{unknown} are not in the system input")
         self._jinja_environment = None
-        self.filament_type_names = []
-        self.input_path = Path(self.parameters["input_directory"]) / Path(
-            self.parameters["model_name"]
+        self._rendered_templates = {}
+        self._chemistry_input = None
+        self.system_input = None
+        self.staging = StagingCache(
+            self.parameters["staging_cache"], self.parameters["stage_with_hardlinks"]
         )
+        self.filament_type_names = []
+        self.simulation_time = 0.0
+        self.metrics = NULL_METRICS
+        self.last_metrics = None
+        self._result_cache = None
+        self._runner_version = None
+        self._output_files = {}
+        self.spatial_index = None
+        workspace = Path(self.parameters["model_name"])
+        self.workspace_id = self.parameters["workspace_id"]
+        if self.parameters["isolate_workspace"] and not self.workspace_id:
+            self.workspace_id = unique_name("workspace")
+        if self.workspace_id:
+            workspace = workspace / self.workspace_id
+        input_directory = self.parameters["input_directory"]
+        output_directory = self.parameters["output_directory"]
+        self.workspace_root = self.parameters["workspace_root"]
+        self.ram_directory = None
+        self._remove_ram_directory = None
+        if self.parameters["ram_workspace"]:
+            self.workspace_root = self.parameters["ram_directory"]
+            if not os.path.isdir(self.workspace_root):
+                self.workspace_root = tempfile.gettempdir()
+            self.ram_directory = tempfile.mkdtemp(
+                prefix="vivarium-medyan-", dir=self.workspace_root
+            )
+            self._remove_ram_directory = weakref.finalize(
+                self, shutil.rmtree, self.ram_directory, ignore_errors=True
+            )
+            input_directory = os.path.join(self.ram_directory, "in")
+            output_directory = os.path.join(self.ram_directory, "out")
+        self.input_path = Path(input_directory) / workspace
         if not os.path.exists(self.input_path):
             os.makedirs(self.input_path)
-        self.output_path = Path(self.parameters["output_directory"]) / Path(
-            self.parameters["model_name"]
-        )
+        self.output_path = Path(output_directory) / workspace
         if not os.path.exists(self.output_path):
             os.makedirs(self.output_path)
-        self.check_pull_docker_image()
+
+    def __getstate__(self):
+        # the jinja environment is rebuilt on demand after unpickling,
+        # e.g. when running as a parallel process
+        state = self.__dict__.copy()
+        state["_jinja_environment"] = None
+        # copies share the RAM workspace, which only the original removes
+        state["_remove_ram_directory"] = None
+        return state
+
+    def merge_state(self, state):
+        """
+        Take on the state a copy of this process reached, e.g. in a
+        worker OS process, keeping what copies do not carry
+        """
+        own = {
+            "_jinja_environment": self._jinja_environment,
+            "_remove_ram_directory": self._remove_ram_directory,
+        }
+        self.__dict__.update(state)
+        self.__dict__.update(own)
+
+    def close(self):
+        """
+        Remove the RAM workspace, if there is one
+        """
+        if self._remove_ram_directory is not None:
+            self._remove_ram_directory()
 
     def jinja_environment(self):
         if self._jinja_environment is None:
@@ -58,111 +289,494 @@ class MedyanProcess(Process):
         return self._jinja_environment
 
     def check_pull_docker_image(self):
-        client = docker.from_env()
-        images = client.images.list("simularium/medyan")
-        if len(images) < 1:
-            print("Downloading simularium/medyan:latest from Docker Hub...")
-            client.images.pull("simularium/medyan")
-        else:
-            print("medyan docker image already exists, skipping download")
+        ensure_image(docker.from_env())
 
     def ports_schema(self):
-        return fibers_schema()
+        if self.parameters["fiber_representation"] == "arrays":
+            schema = fiber_arrays_schema()
+        else:
+            schema = fibers_schema()
+        if self.parameters["metrics"] and self.parameters["metrics_port"]:
+            schema["metrics"] = metrics_schema()
+        for output in self.parameters["output_ports"]:
+            schema[output] = output_schema()
+        if self.parameters["emit_frames"]:
+            schema["frames"] = frames_schema()
+        return schema
 
     def initial_state(self, config):
         return {}
 
     def next_update(self, timestep, states):
         print("in medyan process next update")
+        init_fibers = states["fibers"]
+        if self.parameters["decomposition"]:
+            return self.decomposed_update(timestep, init_fibers)
+        system_input = self.stage_inputs(timestep, init_fibers)
+        with self.metrics.phase("run"):
+            self.run_step()
+        return self.read_outputs(timestep, init_fibers, system_input)
 
-        # set up inputs
+    async def async_next_update(self, timestep, states):
+        """
+        next_update as a coroutine, so many simulations can be driven
+        from one event loop: file work runs in the default executor and
+        MEDYAN runs without blocking the loop
+        """
+        print("in medyan process next update")
         init_fibers = states["fibers"]
-        self.move_configs_to_input_dir()
-        self.create_fiber_input_file(init_fibers)
-        system_text = self.render_template(timestep)
-
-        self.run_medyan(self.input_path, self.output_path)
-
-        # get outputs
-        box_extent = MedyanProcess.read_box_extent(system_text)
-        fibers = self.read_snapshot(self.output_path / "snapshot.traj")
-        fibers = {
-            fiber_id: self.transform_fiber(fiber, inverse=True)
-            for fiber_id, fiber in fibers.items()
+        if self.parameters["decomposition"]:
+            # subdomains already run in parallel, on their own threads
+            return await run_in_thread(self.decomposed_update, timestep, init_fibers)
+        system_input = await run_in_thread(self.stage_inputs, timestep, init_fibers)
+        with self.metrics.phase("run"):
+            await self.async_run_step()
+        return await run_in_thread(
+            self.read_outputs, timestep, init_fibers, system_input
+        )
+
+    def stage_inputs(self, timestep, init_fibers):
+        """
+        Write the configs, fibers and system input of a step,
+        returning the parsed system input
+        """
+        metrics = self.start_metrics()
+        self._staged_bytes = self.staging.stats["bytes_written"]
+        self._step_start = time.perf_counter()
+        with metrics.phase("staging"):
+            self.move_configs_to_input_dir()
+        if not self.continuing():
+            with metrics.phase("serialize"):
+                self.create_fiber_input_file(init_fibers)
+        with metrics.phase("render"):
+            self.render_template(timestep)
+        return self.system_input
+
+    def read_outputs(self, timestep, init_fibers, system_input):
+        """
+        Read MEDYAN's output into the update of a step
+        """
+        metrics = self.metrics
+        box_extent = system_input.box_extent
+        snapshot_path = self.output_path / "snapshot.traj"
+        simplify = self.simplifying("output")
+        arrays = (
+            self.parameters["delta_updates"]
+            or self.parameters["fiber_representation"] == "arrays"
+            or self.parameters["spatial_index"]
+            or simplify
+        )
+        with metrics.phase("parse"):
+            if arrays:
+                fibers = self.read_snapshot_arrays(snapshot_path)
+            else:
+                fibers = self.read_snapshot(snapshot_path)
+        with metrics.phase("transform"):
+            if arrays:
+                fibers.points = self.transform_points(fibers.points, inverse=True)
+            else:
+                fibers = {
+                    fiber_id: self.transform_fiber(fiber, inverse=True)
+                    for fiber_id, fiber in fibers.items()
+                }
+        if simplify:
+            with metrics.phase("simplify"):
+                fibers.points, fibers.offsets = self.simplify_points(
+                    "output", fibers.points, fibers.offsets
+                )
+        if metrics is not NULL_METRICS:
+            metrics.count("snapshot_file_bytes", os.path.getsize(snapshot_path))
+            metrics.count("fibers_in", len(init_fibers))
+            metrics.count("fibers_out", len(fibers))
+            metrics.count(
+                "points_out",
+                (
+                    len(fibers.points)
+                    if arrays
+                    else sum(len(fiber["points"]) for fiber in fibers.values())
+                ),
+            )
+        if self.parameters["spatial_index"]:
+            with metrics.phase("index"):
+                self.index_fibers(fibers, system_input)
+        if self.parameters["delta_updates"]:
+            with metrics.phase("delta"):
+                if not isinstance(init_fibers, FiberArrays):
+                    init_fibers = FiberArrays.from_dict(init_fibers)
+                fibers = fiber_delta(
+                    init_fibers, fibers, self.parameters["delta_tolerance"]
+                )
+        elif arrays and self.parameters["fiber_representation"] != "arrays":
+            fibers = fibers.to_dict()
+        update = {"fibers_box_extent": box_extent, "fibers": fibers}
+        if self.parameters["output_ports"]:
+            with metrics.phase("outputs"):
+                update.update(self.read_output_ports())
+        if self.parameters["emit_frames"]:
+            with metrics.phase("frames"):
+                update["frames"] = self.read_frames(snapshot_path)
+        # last, since the checkpoint may be the snapshot read above
+        if self.parameters["continuation"]:
+            self.keep_checkpoint()
+
+        if metrics is not NULL_METRICS:
+            metrics.count(
+                "bytes_written",
+                self.staging.stats["bytes_written"] - self._staged_bytes,
+            )
+            record = metrics.record(
+                time=self.simulation_time,
+                timestep=timestep,
+                step_seconds=time.perf_counter() - self._step_start,
+            )
+            self.report_metrics(record)
+            if self.parameters["metrics_port"]:
+                update["metrics"] = record
+        self.simulation_time += timestep
+
+        return update
+
+    def decomposed_update(self, timestep, init_fibers):
+        """
+        Run the box as subdomains in parallel, then stitch the fibers
+        each subdomain owns back into one network
+        """
+        metrics = self.start_metrics()
+        step_start = time.perf_counter()
+        with metrics.phase("staging"):
+            self.move_configs_to_input_dir()
+        with metrics.phase("render"):
+            self.render_template(timestep)
+        system_input = self.system_input
+        if not isinstance(init_fibers, FiberArrays):
+            init_fibers = FiberArrays.from_dict(init_fibers)
+        type_indices = self.fiber_type_indices(init_fibers)
+        points, offsets = init_fibers.points, init_fibers.offsets
+        if self.simplifying("input"):
+            points, offsets = self.simplify_points("input", points, offsets)
+        points = self.transform_points(points)
+        decomposition = Decomposition(
+            *system_input.grid,
+            self.parameters["decomposition"],
+            self.parameters["halo_compartments"],
+        )
+
+        with metrics.phase("decompose"):
+            jobs = []
+            parts = decomposition.split(points, offsets)
+            for subdomain, (owned, ghosts) in zip(decomposition.subdomains, parts):
+                selected = np.concatenate([owned, ghosts])
+                indices, lengths = segment_indices(offsets, selected)
+                sub_offsets = np.zeros(len(selected) + 1, dtype=np.int64)
+                np.cumsum(lengths, out=sub_offsets[1:])
+                # MEDYAN needs every point inside the subdomain's box
+                clipped = np.clip(
+                    points[indices], subdomain.halo_lower, subdomain.halo_upper
+                )
+                input_path = self.input_path / subdomain.name
+                output_path = self.output_path / subdomain.name
+                os.makedirs(input_path, exist_ok=True)
+                os.makedirs(output_path, exist_ok=True)
+                self.move_configs_to_input_dir(input_path)
+                self.write_fiber_input(
+                    input_path,
+                    type_indices[selected].tolist(),
+                    clipped - subdomain.halo_lower,
+                    sub_offsets,
+                )
+                self.staging.write_text(
+                    input_path / "systeminput.txt",
+                    system_input.with_values(
+                        {
+                            f"N{axis}": count
+                            for axis, count in zip("XYZ", subdomain.compartments)
+                        }
+                    ).text,
+                )
+                jobs.append((subdomain, owned, indices, clipped, sub_offsets))
+
+        with metrics.phase("run"):
+            workers = self.parameters["decomposition_workers"] or len(jobs)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                runs = [
+                    executor.submit(
+                        self.run_runner,
+                        self.input_path / subdomain.name,
+                        self.output_path / subdomain.name,
+                    )
+                    for subdomain, *_ in jobs
+                ]
+                for run in runs:
+                    logs = run.result()
+                    print(logs)
+                    check_medyan_logs(logs)
+
+        with metrics.phase("stitch"):
+            stitched = {}
+            for subdomain, owned, indices, clipped, sub_offsets in jobs:
+                output = self.read_snapshot_arrays(
+                    self.output_path / subdomain.name / "snapshot.traj"
+                )
+                output_points = split_points(
+                    output.points + subdomain.halo_lower, output.offsets
+                )
+                for fiber_id, type_code, fiber_points in zip(
+                    output.fiber_ids, output.type_codes.tolist(), output_points
+                ):
+                    # MEDYAN numbers fibers in input order, owned ones first
+                    position = int(fiber_id)
+                    if position < len(owned):
+                        fiber = owned[position]
+                        start, end = sub_offsets[position : position + 2]
+                        fiber_points = reconcile_points(
+                            points[indices[start:end]],
+                            clipped[start:end],
+                            fiber_points,
+                        )
+                        fiber_id = init_fibers.fiber_ids[fiber]
+                    elif position < len(sub_offsets) - 1:
+                        continue  # a ghost, owned by a neighbour
+                    else:
+                        fiber_id = f"{subdomain.name}_{fiber_id}"
+                    stitched[fiber_id] = {
+                        "type_name": output.type_names[type_code],
+                        "points": fiber_points,
+                    }
+            fibers = FiberArrays.from_dict(stitched, init_fibers.type_names)
+            fibers.points = self.transform_points(fibers.points, inverse=True)
+        if self.simplifying("output"):
+            with metrics.phase("simplify"):
+                fibers.points, fibers.offsets = self.simplify_points(
+                    "output", fibers.points, fibers.offsets
+                )
+        if self.parameters["spatial_index"]:
+            with metrics.phase("index"):
+                self.index_fibers(fibers, system_input)
+        if self.parameters["delta_updates"]:
+            with metrics.phase("delta"):
+                fibers = fiber_delta(
+                    init_fibers, fibers, self.parameters["delta_tolerance"]
+                )
+        elif self.parameters["fiber_representation"] != "arrays":
+            fibers = fibers.to_dict()
+        update = {
+            "fibers_box_extent": system_input.box_extent,
+            "fibers": fibers,
         }
+        if metrics is not NULL_METRICS:
+            metrics.count("subdomains", len(jobs))
+            metrics.count("fibers_in", len(init_fibers))
+            metrics.count("fibers_out", len(stitched))
+            record = metrics.record(
+                time=self.simulation_time,
+                timestep=timestep,
+                step_seconds=time.perf_counter() - step_start,
+            )
+            self.report_metrics(record)
+            if self.parameters["metrics_port"]:
+                update["metrics"] = record
+        self.simulation_time += timestep
+        return update
+
+    def start_metrics(self):
+        if self.parameters["metrics"]:
+            self.metrics = StepMetrics()
+        else:
+            self.metrics = NULL_METRICS
+        return self.metrics
 
-        return {"fibers_box_extent": box_extent, "fibers": fibers}
+    def report_metrics(self, record):
+        self.last_metrics = record
+        if self.parameters["metrics_callback"] is not None:
+            self.parameters["metrics_callback"](record)
+        if self.parameters["metrics_file"]:
+            append_json_line(self.parameters["metrics_file"], record)
+
+    def continuing(self):
+        return (
+            self.parameters["continuation"]
+            and self.simulation_time > 0.0
+            and os.path.exists(self.input_path / self.parameters["restart_file"])
+        )
+
+    def keep_checkpoint(self):
+        # move, not copy, so the next run cannot truncate it while reading
+        os.replace(
+            self.output_path / self.parameters["checkpoint_file"],
+            self.input_path / self.parameters["restart_file"],
+        )
+
+    def reset_continuation(self):
+        """
+        Start the next step from the fibers state again
+        """
+        restart_path = self.input_path / self.parameters["restart_file"]
+        if os.path.exists(restart_path):
+            os.remove(restart_path)
+        self.simulation_time = 0.0
+
+    def restart_directives(self):
+        if not self.continuing():
+            return ""
+        return self.parameters["restart_directives"].format(
+            restart_file=self.parameters["restart_file"],
+            time=self.simulation_time,
+        )
 
     def transform_points(self, points, inverse=False):
-        transform = np.array(self.parameters["transform_points"])
+        transform = np.array(self.parameters["transform_points"], dtype=np.float64)
         if inverse:
             transform = -transform
-        return [transform + point for point in points]
+        return np.asarray(points, dtype=np.float64).reshape(-1, 3) + transform
 
     def transform_fiber(self, fiber, inverse=False):
         fiber["points"] = self.transform_points(fiber["points"], inverse)
         return fiber
 
     def read_snapshot(self, snapshot_path):
-        # TODO: optimize to read only the last timepoint for each fiber
-        with open(snapshot_path, "r") as snapshot:
-            snapshot_lines = snapshot.read().split("\n")
+        return self.read_snapshot_arrays(snapshot_path).to_dict()
+
+    def read_snapshot_arrays(self, snapshot_path):
+        # only the last frame is parsed, found by seeking backward or mapping
+        if self.parameters["mmap_snapshot"] or self.parameters["ram_workspace"]:
+            snapshot_lines = read_last_frame_mapped(snapshot_path)
+        else:
+            snapshot_lines = read_last_frame(snapshot_path)
+        if self.metrics is not NULL_METRICS:
+            # the bytes of the frame read out, not the whole file
+            self.metrics.count(
+                "snapshot_bytes_read",
+                sum(len(line) for line in snapshot_lines) + len(snapshot_lines) - 1,
+            )
+        return self.parse_snapshot_lines(snapshot_lines)
+
+    def parse_snapshot_lines(self, snapshot_lines):
+        fiber_ids = []
+        type_codes = []
+        coordinates_lines = []
         index = 0
-        fibers = {}
         while index < len(snapshot_lines):
             line = snapshot_lines[index]
             if "FILAMENT" in line:
-                coordinates_line = snapshot_lines[index + 1]
-                fiber = self.read_fiber(line, coordinates_line)
-                fibers.update(fiber)
+                _, fiber_id, type_index, length, delta_l, delta_r = line.split(" ")
+                fiber_ids.append(fiber_id)
+                type_codes.append(int(type_index))
+                coordinates_lines.append(snapshot_lines[index + 1])
                 index += 2
             else:
                 index += 1
+        # parse every point of the frame into one contiguous buffer
+        points, offsets = parse_coordinate_lines(coordinates_lines)
+        fibers = FiberArrays(
+            fiber_ids, type_codes, offsets, points, self.filament_type_names
+        )
+        if len(set(fiber_ids)) < len(fiber_ids):
+            # several frames were parsed, keep the last value of each fiber
+            fibers = FiberArrays.from_dict(fibers.to_dict(), fibers.type_names)
         return fibers
 
-    def fiber_to_string(self, type_name, points):
+    def index_fibers(self, fibers, system_input):
+        """
+        Bring spatial_index up to date with the fibers of a step,
+        in store coordinates
+        """
+        n_compartments, compartment_size = system_input.grid
+        grid = self.spatial_index
+        if (
+            grid is None
+            or not np.array_equal(grid.n_cells, n_compartments)
+            or not np.array_equal(grid.cell_size, compartment_size)
+        ):
+            origin = self.transform_points(np.zeros(3), inverse=True)[0]
+            self.spatial_index = SegmentGrid(n_compartments, compartment_size, origin)
+        self.metrics.count("indexed_fibers", self.spatial_index.update(fibers))
+
+    def snapshot_path(self):
+        """
+        Where the snapshot of the last step is, which is the restart file
+        once a continued step moved it there as its checkpoint
+        """
+        snapshot_path = self.output_path / "snapshot.traj"
+        restart_path = self.input_path / self.parameters["restart_file"]
+        if (
+            self.parameters["continuation"]
+            and self.parameters["checkpoint_file"] == "snapshot.traj"
+            and not os.path.exists(snapshot_path)
+            and os.path.exists(restart_path)
+        ):
+            return restart_path
+        return snapshot_path
+
+    def iter_snapshot(self, snapshot_path=None, representation=None):
+        """
+        Yield the (time, fibers) of each frame of snapshot.traj in turn,
+        in store coordinates and the fiber representation of the stores.
+        Frames are found with an index of their offsets and parsed one at
+        a time, so memory use is bounded by the size of one frame.
+        """
+        snapshot = OutputFile(snapshot_path or self.snapshot_path())
+        representation = representation or self.parameters["fiber_representation"]
+        for index in range(len(snapshot)):
+            frame = snapshot.frame(index)
+            fibers = self.parse_snapshot_lines(frame.lines)
+            fibers.points = self.transform_points(fibers.points, inverse=True)
+            if representation != "arrays":
+                fibers = fibers.to_dict()
+            yield frame.time, fibers
+
+    def read_frames(self, snapshot_path):
+        """
+        The frames written after the start of this step, with times
+        in simulation time
+        """
+        times = []
+        frames = []
+        start = None
+        for frame_time, fibers in self.iter_snapshot(snapshot_path, "arrays"):
+            if start is None:
+                # the first frame is the state the step started from
+                start = frame_time
+                continue
+            times.append(self.simulation_time + frame_time - start)
+            frames.append(fibers)
+        fibers, frame_offsets = concatenate_fiber_arrays(
+            frames, self.filament_type_names
+        )
+        return {
+            "times": np.array(times),
+            "frame_offsets": frame_offsets,
+            "fibers": fibers,
+        }
+
+    def filament_type_index(self, type_name):
         if type_name not in self.filament_type_names:
-            type_index = len(self.filament_type_names)
             self.filament_type_names.append(type_name)
-        else:
-            type_index = self.filament_type_names.index(type_name)
-        type_name = self.filament_type_names[type_index]
-        point_strs = [" ".join([str(element) for element in point]) for point in points]
-        line = " ".join(["FILAMENT", str(type_index)] + point_strs)
-        return line
+        return self.filament_type_names.index(type_name)
+
+    def fiber_to_string(self, type_name, points):
+        type_index = self.filament_type_index(type_name)
+        return " ".join(["FILAMENT", str(type_index)] + format_values(points))
 
     @staticmethod
     def read_coordinates(coordinates_line):
-        coordinate_strs = coordinates_line.strip().split(" ")
-        coordinates = []
-        for n in range(0, len(coordinate_strs), 3):
-            point = coordinate_strs[n : n + 3]
-            coordinates.append(np.array([float(p) for p in point]))
-        return coordinates
+        return parse_coordinates(coordinates_line)
 
-    def read_fiber(self, fiber_line, coordinates_line):
+    def read_fiber_header(self, fiber_line):
         _, fiber_id, type_index, length, delta_l, delta_r = fiber_line.split(" ")
-        type_name = self.filament_type_names[int(type_index)]
+        return fiber_id, self.filament_type_names[int(type_index)]
+
+    def read_fiber(self, fiber_line, coordinates_line):
+        fiber_id, type_name = self.read_fiber_header(fiber_line)
         coordinates = MedyanProcess.read_coordinates(coordinates_line)
         return {fiber_id: {"type_name": type_name, "points": coordinates}}
 
     @staticmethod
     def read_box_extent(system_text):
-        lines = system_text.split("\n")
-        n_compartments = np.zeros(3)
-        compartment_size = np.zeros(3)
-        coords = ["X", "Y", "Z"]
-        for line in lines:
-            for dim in range(len(coords)):
-                coord = coords[dim]
-                if f"N{coord}:" in line:
-                    n_compartments[dim] = int(line.split()[1])
-                if f"COMPARTMENTSIZE{coord}:" in line:
-                    compartment_size[dim] = float(line.split()[1])
-        return np.multiply(n_compartments, compartment_size)
-
-    def move_configs_to_input_dir(self):
+        return SystemInput.parse(system_text).box_extent
+
+    def move_configs_to_input_dir(self, input_path=None):
         # move additional config files to input directory
+        input_path = input_path or self.input_path
         template_directory = Path(self.parameters["template_directory"]) / Path(
             self.parameters["model_name"]
         )
@@ -173,63 +787,262 @@ class MedyanProcess(Process):
                 or "txt" not in config_file.suffix
             ):
                 continue
-            shutil.copyfile(config_file, self.input_path / config_file.name)
+            self.staging.stage_file(config_file, input_path / config_file.name)
 
     def create_fiber_input_file(self, init_fibers):
-        fiber_lines = [
-            self.fiber_to_string(
-                fiber["type_name"], self.transform_points(fiber["points"])
-            )
-            for fiber in init_fibers.values()
-        ]
+        if isinstance(init_fibers, FiberArrays):
+            type_indices = self.fiber_type_indices(init_fibers).tolist()
+            points, offsets = init_fibers.points, init_fibers.offsets
+        else:
+            fibers = list(init_fibers.values())
+            type_indices = [
+                self.filament_type_index(fiber["type_name"]) for fiber in fibers
+            ]
+            points, offsets = concatenate_points([fiber["points"] for fiber in fibers])
+        if self.simplifying("input"):
+            points, offsets = self.simplify_points("input", points, offsets)
+        points = self.transform_points(points)
+        self.write_fiber_input(self.input_path, type_indices, points, offsets)
+
+    def simplifying(self, stage):
+        return (
+            self.parameters["simplify_tolerance"] is not None
+            and stage in self.parameters["simplify_stages"]
+        )
+
+    def simplify_points(self, stage, points, offsets):
+        """
+        Simplify fibers read from or written to MEDYAN, counting
+        the points before and after and the compression ratio
+        """
+        simplified, offsets, ratio = simplify_points(
+            points,
+            offsets,
+            self.parameters["simplify_tolerance"],
+            self.parameters["simplify_method"],
+        )
+        self.metrics.count(f"simplify_{stage}_points", len(points))
+        self.metrics.count(f"simplify_{stage}_kept", len(simplified))
+        self.metrics.count(f"simplify_{stage}_ratio", ratio)
+        return simplified, offsets
+
+    def fiber_type_indices(self, fibers):
+        """
+        MEDYAN's filament type index of each fiber of a FiberArrays
+        """
+        table = [self.filament_type_index(type_name) for type_name in fibers.type_names]
+        return np.array(table, dtype=np.int64)[fibers.type_codes]
+
+    def write_fiber_input(self, input_path, type_indices, points, offsets):
+        fiber_lines = format_fiber_lines(type_indices, points, offsets)
         fiber_text = "\n".join(fiber_lines)
-        fiber_path = self.input_path / "filaments.txt"
+        fiber_path = input_path / "filaments.txt"
         with open(fiber_path, "w") as fiber_file:
             fiber_file.write(fiber_text)
+        self.metrics.count("bytes_written", len(fiber_text))
+
+    def template_path(self):
+        model_name = self.parameters["model_name"]
+        return (
+            Path(self.parameters["template_directory"])
+            / model_name
+            / (model_name + ".txt")
+        )
 
     def render_template(self, timestep):
+        """
+        Write the system input of a step, returning its text. The template
+        is rendered and parsed once per configuration, then RUNTIME and
+        system_overrides are applied to the parsed lines, and the result
+        kept as system_input
+        """
         system_template_path = str(
             Path(self.parameters["model_name"])
             / (self.parameters["model_name"] + ".txt")
         )
-        template = self.jinja_environment().get_template(system_template_path)
-        system_text = template.render(
-            timestep=timestep,
-            snapshot_time=self.parameters["snapshot"],
-            projection_type=""
+        projection_type = (
+            ""
             if not self.parameters["filament_projection_type"]
             else "PROJECTIONTYPE:               "
-            + self.parameters["filament_projection_type"],
-            # box_size=TODO
+            + self.parameters["filament_projection_type"]
+        )
+        # only RUNTIME usually changes, so renders are kept by their parameters
+        template_mtime = os.stat(self.template_path()).st_mtime_ns
+        restart = self.restart_directives()
+        # only the outputs asked for, since MEDYAN's can grow large
+        output_types = "\n".join(
+            f"OUTPUTTYPE:                 {output.upper()}"
+            for output in self.parameters["outputs"]
         )
+        render_key = (
+            template_mtime,
+            self.parameters["snapshot"],
+            projection_type,
+            restart,
+            output_types,
+        )
+        system_input = self._rendered_templates.get((render_key, timestep))
+        if system_input is None:
+            base = self._rendered_templates.get(render_key)
+            if base is None:
+                template = self.jinja_environment().get_template(system_template_path)
+                base = SystemInput.parse(
+                    template.render(
+                        timestep=timestep,
+                        snapshot_time=self.parameters["snapshot"],
+                        projection_type=projection_type,
+                        restart=restart,
+                        output_types=output_types,
+                    )
+                )
+                self._rendered_templates[render_key] = base
+            system_input = base.with_values(
+                {"RUNTIME": timestep, **self.system_overrides}
+            )
+            self._rendered_templates[(render_key, timestep)] = system_input
+        self.system_input = system_input
         system_file_path = self.input_path / "systeminput.txt"
-        with open(system_file_path, "w") as system_file:
-            system_file.write(system_text)
-        return system_text
+        self.staging.write_text(system_file_path, system_input.text)
+        return system_input.text
 
-    @staticmethod
-    def run_medyan(input_path, output_path):
-        abs_input_path = os.path.abspath(input_path)
-        abs_output_path = os.path.abspath(output_path)
-        client = docker.from_env()
-        container = client.containers.run(
-            image="simularium/medyan:latest",
-            name="medyan-container",
-            volumes=[
-                f"{abs_input_path}:/home/input/",
-                f"{abs_output_path}:/home/output/",
-            ],
-            detach=True,
+    @property
+    def chemistry_input(self):
+        """
+        The model's chemistry input, parsed once
+        """
+        if self._chemistry_input is None:
+            # the file name is not templated, so read it from the template
+            template_path = self.template_path()
+            template = SystemInput.load(template_path)
+            self._chemistry_input = SystemInput.load(
+                template_path.parent / template.chemistry_file
+            )
+        return self._chemistry_input
+
+    def output_file(self, output):
+        """
+        Indexed, lazily read auxiliary output, e.g.
+        output_file("tensions").frame(-1).values(fiber_id)
+        """
+        if output not in self._output_files:
+            self._output_files[output] = OutputFile(
+                self.output_path / OUTPUT_FILES[output]
+            )
+        return self._output_files[output]
+
+    def read_output_ports(self):
+        update = {}
+        for output in self.parameters["output_ports"]:
+            frame = self.output_file(output).frame(-1)
+            if output == "chemistry":
+                update[output] = frame.counts()
+            else:
+                update[output] = frame.all_values()
+        return update
+
+    def create_runner(self):
+        runner = self.parameters["runner"]
+        if isinstance(runner, MedyanRunner):
+            return runner
+        if runner == "docker":
+            if self.parameters["runner_pool_size"] > 0:
+                return DockerExecRunner(workspace_root=self.workspace_root)
+            return DockerRunner()
+        if runner == "binary":
+            return LocalRunner(self.parameters["medyan_command"])
+        if runner == "fake":
+            return FakeRunner()
+        raise ValueError(f"unknown MEDYAN runner {runner}")
+
+    def runner_pool(self):
+        key = (
+            str(self.parameters["runner"]),
+            tuple(self.parameters["medyan_command"]),
+            os.path.abspath(self.workspace_root),
+            self.parameters["runner_pool_size"],
+        )
+        return get_runner_pool(
+            key, self.create_runner, self.parameters["runner_pool_size"]
+        )
+
+    def log_monitor(self):
+        return LogMonitor(
+            wall_timeout=self.parameters["wall_timeout"],
+            idle_timeout=self.parameters["idle_timeout"],
+            error_patterns=self.parameters["error_patterns"],
+            buffer_lines=self.parameters["log_buffer_lines"],
+            progress_callback=self.parameters["progress_callback"],
         )
-        container.wait()  # block until container run is complete
-        logs = container.logs().decode("utf-8")  # get container logs
-        container.remove()  # remove the container
+
+    def result_cache(self):
+        if not self.parameters["result_cache"] or self.parameters["bypass_cache"]:
+            return None
+        if self._result_cache is None:
+            self._result_cache = ResultCache(
+                self.parameters["result_cache"], self.parameters["result_cache_bytes"]
+            )
+        return self._result_cache
+
+    def cached_outputs(self):
+        return sorted(
+            {"snapshot.traj", self.parameters["checkpoint_file"]}
+            | {OUTPUT_FILES[output] for output in self.parameters["outputs"]}
+        )
+
+    def cached_run(self):
+        """
+        The cache key of this step's inputs, or None without a cache,
+        and whether its outputs were restored from the cache
+        """
+        cache = self.result_cache()
+        if cache is None:
+            return None, False
+        if self._runner_version is None:
+            self._runner_version = self.create_runner().version()
+        key = hash_directory(self.input_path, self._runner_version)
+        if cache.get(key, self.output_path, self.cached_outputs()):
+            self.metrics.count("cache_hits", 1)
+            return key, True
+        return key, False
+
+    def finish_run(self, logs, key):
         print(logs)
-        if "Done with simulation!" not in logs:
-            # MEDYAN usually does not raise errors
-            raise Exception(
-                "MEDYAN simulation did not complete! Check output for error\n"
+        check_medyan_logs(logs)
+        if key is not None:
+            self.result_cache().put(key, self.output_path, self.cached_outputs())
+
+    def run_runner(self, input_path=None, output_path=None):
+        input_path = input_path or self.input_path
+        output_path = output_path or self.output_path
+        monitor = self.log_monitor()
+        if self.parameters["runner_pool_size"] > 0:
+            with self.runner_pool().runner() as runner:
+                return runner.run_monitored(input_path, output_path, monitor)
+        return self.create_runner().run_monitored(input_path, output_path, monitor)
+
+    def run_step(self):
+        key, hit = self.cached_run()
+        if not hit:
+            self.finish_run(self.run_runner(), key)
+
+    async def async_run_step(self):
+        key, hit = await run_in_thread(self.cached_run)
+        if hit:
+            return
+        if self.parameters["runner_pool_size"] > 0:
+            # checking runners in and out of the pool blocks
+            logs = await run_in_thread(self.run_runner)
+        else:
+            logs = await self.create_runner().run_async(
+                self.input_path, self.output_path, self.log_monitor()
             )
+        await run_in_thread(self.finish_run, logs, key)
+
+    @staticmethod
+    def run_medyan(input_path, output_path):
+        logs = DockerRunner().run(input_path, output_path)
+        print(logs)
+        check_medyan_logs(logs)
 
 
 def main():
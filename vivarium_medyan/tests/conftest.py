@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+TEMPLATE_DIRECTORY = str(Path(__file__).parents[1] / "templates")
+FAKE_MEDYAN = [sys.executable, "-m", "vivarium_medyan.library.fake_medyan"]
+
+
+def create_fake_medyan(directory, **parameters):
+    return MedyanProcess(
+        {
+            "time_step": 10.0,
+            "input_directory": str(Path(directory) / "in"),
+            "output_directory": str(Path(directory) / "out"),
+            "template_directory": TEMPLATE_DIRECTORY,
+            "transform_points": [2000.0, 1000.0, 1000.0],
+            "runner": "fake",
+            **parameters,
+        }
+    )
+
+
+@pytest.fixture
+def fake_medyan():
+    """
+    Create MedyanProcesses running the in-process fake engine, with
+    their workspace in a given directory: fake_medyan(tmp_path, **parameters)
+    """
+    return create_fake_medyan
+
+
+@pytest.fixture
+def fake_medyan_command():
+    """
+    The fake engine as an executable, for the "binary" runner
+    """
+    return list(FAKE_MEDYAN)
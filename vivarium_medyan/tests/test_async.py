@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fibers
+
+
+def test_async_next_update(tmp_path, fake_medyan, fake_medyan_command):
+    medyan = fake_medyan(tmp_path / "sync")
+    expected = medyan.next_update(10.0, initial_fibers)
+
+    async def step_with_ticker():
+        ticks = 0
+        medyan = fake_medyan(
+            tmp_path / "async",
+            runner="binary",
+            medyan_command=fake_medyan_command + ["--delay", "0.5"],
+            metrics=True,
+        )
+        step = asyncio.ensure_future(medyan.async_next_update(10.0, initial_fibers))
+        while not step.done():
+            ticks += 1
+            await asyncio.sleep(0.05)
+        return await step, ticks, medyan
+
+    update, ticks, medyan = asyncio.run(step_with_ticker())
+    # the loop kept running while MEDYAN did
+    assert ticks > 10
+    assert medyan.simulation_time == 10.0
+    assert medyan.last_metrics["durations"]["run"] > 0.5
+    assert update["fibers"].keys() == expected["fibers"].keys()
+    for fiber_id, fiber in expected["fibers"].items():
+        assert np.allclose(update["fibers"][fiber_id]["points"], fiber["points"])
+
+
+def test_concurrent_async_steps(tmp_path, fake_medyan):
+    processes = [
+        fake_medyan(tmp_path, isolate_workspace=True, runner="fake") for _ in range(3)
+    ]
+
+    async def step_all():
+        return await asyncio.gather(
+            *[process.async_next_update(10.0, initial_fibers) for process in processes]
+        )
+
+    updates = asyncio.run(step_all())
+    assert [len(update["fibers"]) for update in updates] == [30, 30, 30]
+
+
+def test_async_decomposed_update(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, decomposition=[3, 1, 1], metrics=True)
+    update = asyncio.run(medyan.async_next_update(10.0, initial_fibers))
+    assert medyan.last_metrics["subdomains"] == 3
+    assert (medyan.input_path / "subdomain_1_0_0" / "systeminput.txt").exists()
+    assert update["fibers"].keys() == initial_fibers["fibers"].keys()
+
+
+def test_cancelled_step_stops_medyan(tmp_path, fake_medyan, fake_medyan_command):
+    medyan = fake_medyan(
+        tmp_path,
+        runner="binary",
+        medyan_command=fake_medyan_command + ["--delay", "30"],
+    )
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            asyncio.wait_for(medyan.async_next_update(10.0, initial_fibers), 0.5)
+        )
+    assert time.monotonic() - start < 10.0
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from vivarium_medyan.benchmarks.suite import (
+    BASELINE_PATH,
+    REFERENCE_SIZE,
+    compare,
+    scaling,
+)
+
+
+def test_scaling_ratios():
+    results = {
+        "linear": {"100": 0.01, "1000": 0.1, "10000": 1.0},
+        "quadratic": {"100": 0.01, "1000": 1.0, "10000": 100.0},
+    }
+    ratios = scaling(results)
+    assert ratios["linear"] == pytest.approx({"1000": 1.0, "10000": 1.0})
+    assert ratios["quadratic"] == pytest.approx({"1000": 10.0, "10000": 100.0})
+    # a uniformly slower machine has the same ratios
+    slower = {
+        name: {size: 3.0 * seconds for size, seconds in sizes.items()}
+        for name, sizes in results.items()
+    }
+    assert scaling(slower)["quadratic"] == pytest.approx(ratios["quadratic"])
+
+    baselines = {"linear": {"1000": 1.0, "10000": 1.0}}
+    assert compare(ratios, baselines, 1.5) == []
+    assert compare(ratios, {"quadratic": {"1000": 1.0}}, 1.5) == [
+        ("quadratic", "1000", pytest.approx(10.0), 1.0)
+    ]
+
+
+def test_stored_baselines():
+    baselines = json.loads(BASELINE_PATH.read_text())
+    for sizes in baselines["branched"].values():
+        assert str(REFERENCE_SIZE) not in sizes
+        assert all(ratio > 0 for ratio in sizes.values())
@@ -0,0 +1,43 @@
+import numpy as np
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.coordinates import (
+    concatenate_points,
+    format_fiber_lines,
+    parse_coordinate_lines,
+    split_points,
+)
+
+
+def legacy_fiber_line(type_index, points):
+    point_strs = [" ".join([str(element) for element in point]) for point in points]
+    return " ".join(["FILAMENT", str(type_index)] + point_strs)
+
+
+def test_format_fiber_lines_matches_legacy():
+    rng = np.random.default_rng(1)
+    transform = np.array([2000.0, 1000.0, 1000.0])
+    fibers = list(initial_fibers["fibers"].values()) + [
+        {"points": list(rng.normal(0.0, 1e3, (5, 3)))},
+        {"points": list(rng.normal(0.0, 1e-9, (3, 3)))},
+        {"points": []},
+    ]
+    legacy_lines = [
+        legacy_fiber_line(0, [transform + point for point in fiber["points"]])
+        for fiber in fibers
+    ]
+    points, offsets = concatenate_points([fiber["points"] for fiber in fibers])
+    lines = format_fiber_lines([0] * len(fibers), points + transform, offsets)
+    assert "\n".join(lines) == "\n".join(legacy_lines)
+
+
+def test_parse_coordinate_lines():
+    lines = ["1.0 2.0 3.0 4.0 5.0 6.0 ", "-7.5 8e-05 9.0", ""]
+    points, offsets = parse_coordinate_lines(lines)
+    assert points.shape == (3, 3)
+    assert points.flags["C_CONTIGUOUS"]
+    assert offsets.tolist() == [0, 2, 3, 3]
+    first, second, third = split_points(points, offsets)
+    assert np.array_equal(first, [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    assert np.array_equal(second, [[-7.5, 8e-05, 9.0]])
+    assert third.shape == (0, 3)
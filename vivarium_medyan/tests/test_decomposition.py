@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fiber_arrays, initial_fibers
+from vivarium_medyan.library.decomposition import Decomposition
+from vivarium_medyan.library.fake_medyan import FakeRunner
+from vivarium_medyan.library.system_input import read_grid, replace_system_values
+
+
+def test_subdomains_align_to_compartments():
+    decomposition = Decomposition([15, 15, 15], [500.0] * 3, [2, 3, 1])
+    assert len(decomposition) == 6
+    first, last = decomposition.subdomains[0], decomposition.subdomains[-1]
+    assert first.lower.tolist() == [0.0, 0.0, 0.0]
+    assert first.upper.tolist() == [4000.0, 2500.0, 7500.0]
+    assert first.halo_upper.tolist() == [4500.0, 3000.0, 7500.0]
+    assert first.compartments.tolist() == [9, 6, 15]
+    assert last.upper.tolist() == [7500.0] * 3
+    with pytest.raises(ValueError):
+        Decomposition([2, 2, 2], [500.0] * 3, [3, 1, 1])
+
+
+def test_owners_and_ghosts():
+    decomposition = Decomposition([4, 1, 1], [100.0] * 3, [2, 1, 1])
+    points = np.array(
+        [
+            [10.0, 50.0, 50.0],  # fiber 0, inside the first subdomain
+            [50.0, 50.0, 50.0],
+            [150.0, 50.0, 50.0],  # fiber 1, centered in the first, ending in
+            [210.0, 50.0, 50.0],  # the second
+            [390.0, 50.0, 50.0],  # fiber 2, far inside the second
+        ]
+    )
+    offsets = np.array([0, 2, 4, 5])
+    assert decomposition.owners(points, offsets).tolist() == [0, 0, 1]
+    (owned_0, ghosts_0), (owned_1, ghosts_1) = decomposition.split(points, offsets)
+    assert owned_0.tolist() == [0, 1] and ghosts_0.tolist() == []
+    # the halo of the second subdomain starts at 100
+    assert owned_1.tolist() == [2] and ghosts_1.tolist() == [1]
+
+
+def test_system_input_overrides():
+    system_text = "NX:                          15\nCOMPARTMENTSIZEX:  500.0\n"
+    replaced = replace_system_values(system_text, {"NX": 5})
+    assert replaced == "NX:                          5\nCOMPARTMENTSIZEX:  500.0\n"
+    assert read_grid(replaced)[0].tolist() == [5, 0, 0]
+    with pytest.raises(KeyError):
+        replace_system_values(system_text, {"NZ": 5})
+
+
+@pytest.mark.parametrize("representation", ["dict", "arrays"])
+def test_decomposed_update(tmp_path, representation, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path,
+        decomposition=[5, 1, 1],
+        fiber_representation=representation,
+        metrics=True,
+    )
+    initial_state = (
+        initial_fiber_arrays if representation == "arrays" else initial_fibers
+    )
+    update = medyan.next_update(10.0, initial_state)
+    fibers = update["fibers"]
+    if representation == "arrays":
+        fibers = fibers.to_dict()
+    fibers = {fiber_id: fiber["points"] for fiber_id, fiber in fibers.items()}
+    # every fiber comes back once, under its own id, and clipped ends
+    # are restored when stitching
+    assert fibers.keys() == initial_fibers["fibers"].keys()
+    for fiber_id, fiber in initial_fibers["fibers"].items():
+        assert np.allclose(fibers[fiber_id], fiber["points"])
+    assert medyan.last_metrics["subdomains"] == 5
+    subdomain = medyan.input_path / "subdomain_2_0_0" / "systeminput.txt"
+    assert read_grid(subdomain.read_text())[0].tolist() == [5, 15, 15]
+
+
+def test_decomposed_update_moves_fibers(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path, decomposition=[3, 1, 1], runner=FakeRunner(jitter=1.0, seed=0)
+    )
+    update = medyan.next_update(10.0, initial_fibers)
+    assert update["fibers"].keys() == initial_fibers["fibers"].keys()
+    points = np.concatenate([f["points"] for f in update["fibers"].values()])
+    initial = np.concatenate([f["points"] for f in initial_fibers["fibers"].values()])
+    assert not np.allclose(points, initial)
+    assert np.allclose(points, initial, atol=20.0)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.ensemble import (
+    MedyanEnsemble,
+    RunningHistogram,
+    RunningStats,
+    fiber_lengths,
+)
+from vivarium_medyan.library.fake_medyan import FakeRunner
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.system_input import read_system_text
+
+
+def test_running_reductions():
+    values = np.random.default_rng(0).normal(size=(20, 4))
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert np.allclose(stats.mean, values.mean(axis=0))
+    assert np.allclose(stats.variance, values.var(axis=0, ddof=1))
+
+    histogram = RunningHistogram([0.0, 1.0, 2.0])
+    histogram.add([0.5, 1.5, 1.5])
+    histogram.add([-1.0, 3.0, 2.0])
+    assert histogram.counts.tolist() == [1, 3]
+    assert (histogram.underflow, histogram.overflow) == (1, 1)
+
+
+def test_ensemble(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, snapshot=5.0)
+    seen = []
+
+    def runner_factory(seed):
+        seen.append(seed)
+        return FakeRunner(jitter=2.0, seed=seed)
+
+    initial = FiberArrays.from_dict(initial_fibers["fibers"])
+
+    def displacement(fibers):
+        return np.abs(fibers.points - initial.points).mean()
+
+    ensemble = MedyanEnsemble(
+        medyan,
+        6,
+        seeds=range(100, 106),
+        max_workers=2,
+        seed_directive="RANDOMSEED:                  {seed}",
+        runner_factory=runner_factory,
+        reducers={"observables": lambda fibers: {"n_fibers": len(fibers)}},
+        histograms={"length": (fiber_lengths, np.linspace(0.0, 2000.0, 21))},
+    )
+    ensemble.reducers["displacement"] = displacement
+    summary = ensemble.run(10.0, initial_fibers["fibers"])
+
+    assert sorted(seen) == list(range(100, 106))
+    assert summary["n_replicates"] == 6 and ensemble.peak_running == 2
+    assert summary["times"].tolist() == [0.0, 5.0, 10.0]
+    assert summary["mean"]["observables.n_fibers"].tolist() == [30, 30, 30]
+    # jitter accumulates and differs between seeds
+    displaced = summary["mean"]["displacement"]
+    assert 0 < displaced[0] < displaced[1] < displaced[2]
+    assert summary["variance"]["displacement"][2] > 0
+    histogram = summary["histograms"]["length"]
+    assert histogram["counts"].sum() + histogram["overflow"] == 6 * 30
+    # replicates are deleted once folded
+    assert not any(medyan.output_path.glob("replicate_*"))
+    assert not any(medyan.input_path.glob("replicate_*"))
+
+    system_text = ensemble.stage(10.0, initial_fibers["fibers"])
+    input_path, _ = ensemble.stage_replicate(1, system_text)
+    seeded = (input_path / "systeminput.txt").read_text()
+    assert read_system_text(seeded, "RANDOMSEED") == "101"
+    assert (input_path / "filaments.txt").stat().st_nlink == 2
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from vivarium.core.engine import Engine
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.executor import MedyanExecutor
+
+
+def isolated_medyan(fake_medyan, tmp_path, **parameters):
+    return fake_medyan(
+        tmp_path,
+        time_step=2.0,
+        transform_points=[0.0, 0.0, 0.0],
+        isolate_workspace=True,
+        **parameters,
+    )
+
+
+def shifted_fibers(shift):
+    return {
+        "fibers": {
+            fiber_id: {
+                "type_name": fiber["type_name"],
+                "points": np.asarray(fiber["points"]) + shift,
+            }
+            for fiber_id, fiber in initial_fibers["fibers"].items()
+        }
+    }
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_executor_map(tmp_path, fake_medyan, kind):
+    processes = [isolated_medyan(fake_medyan, tmp_path) for _ in range(3)]
+    assert len({process.input_path for process in processes}) == 3
+    states = [shifted_fibers(10.0 * index) for index in range(3)]
+    with MedyanExecutor(max_workers=2, kind=kind) as executor:
+        updates = executor.map(processes, 2.0, states)
+    for index, update in enumerate(updates):
+        points = np.concatenate([f["points"] for f in update["fibers"].values()])
+        expected = np.concatenate(
+            [f["points"] for f in states[index]["fibers"].values()]
+        )
+        assert np.allclose(points, expected)
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_executor_keeps_process_state(tmp_path, fake_medyan, kind):
+    processes = [
+        isolated_medyan(
+            fake_medyan, tmp_path, continuation=True, emit_frames=True, metrics=True
+        )
+        for _ in range(2)
+    ]
+    with MedyanExecutor(max_workers=2, kind=kind) as executor:
+        for step in range(2):
+            updates = executor.map(processes, 2.0, [initial_fibers] * 2)
+            for update in updates:
+                times = update["frames"]["times"].tolist()
+                assert times == [2.0 * step + 1.0, 2.0 * step + 2.0]
+    for process in processes:
+        assert process.simulation_time == 4.0
+        assert process.last_metrics["time"] == 2.0
+        system_text = (process.input_path / "systeminput.txt").read_text()
+        assert "RESTARTFILE" in system_text
+
+
+def test_vivarium_parallel_process(tmp_path, fake_medyan):
+    medyan = isolated_medyan(fake_medyan, tmp_path, _parallel=True)
+    engine = Engine(
+        processes={"medyan": medyan},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+            }
+        },
+        initial_state=initial_fibers,
+    )
+    engine.update(4.0)
+    engine.end()
+    fibers = engine.state.get_value()["fibers"]
+    assert all(np.shape(fiber["points"]) == (2, 3) for fiber in fibers.values())
@@ -0,0 +1,113 @@
+import numpy as np
+from vivarium.core.serialize import serialize_value
+from vivarium.core.store import Store
+
+from vivarium_medyan.data.fibers import initial_fiber_arrays, initial_fibers
+from vivarium_medyan.library.fiber_arrays import (
+    FiberArrays,
+    FiberArraysSerializer,
+    concatenate_fiber_arrays,
+    fiber_delta,
+    update_fiber_arrays,
+)
+from vivarium_medyan.library.schema import fiber_arrays_schema
+
+
+def test_dict_round_trip():
+    fibers = initial_fibers["fibers"]
+    arrays = FiberArrays.from_dict(fibers)
+    assert len(arrays) == len(fibers)
+    assert arrays.points.shape == (2 * len(fibers), 3)
+    assert arrays.type_names == ["Actin-Polymer"]
+    round_trip = arrays.to_dict()
+    assert round_trip.keys() == fibers.keys()
+    for fiber_id, fiber in fibers.items():
+        assert round_trip[fiber_id]["type_name"] == fiber["type_name"]
+        assert np.array_equal(round_trip[fiber_id]["points"], fiber["points"])
+
+
+def test_type_names_are_interned():
+    fibers = {
+        "a": {"type_name": "Actin", "points": [[0.0, 0.0, 0.0]]},
+        "b": {"type_name": "Tubulin", "points": [[1.0, 1.0, 1.0]]},
+        "c": {"type_name": "Actin", "points": []},
+    }
+    arrays = FiberArrays.from_dict(fibers, type_names=["Tubulin"])
+    assert arrays.type_names == ["Tubulin", "Actin"]
+    assert arrays.type_codes.tolist() == [1, 0, 1]
+    assert arrays.offsets.tolist() == [0, 1, 2, 2]
+
+
+def test_concatenate():
+    first = FiberArrays.from_dict(
+        {"a": {"type_name": "Actin", "points": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]}}
+    )
+    second = FiberArrays.from_dict(
+        {
+            "b": {"type_name": "Tubulin", "points": [[2.0, 0.0, 0.0]]},
+            "c": {"type_name": "Actin", "points": []},
+        }
+    )
+    fibers, fiber_offsets = concatenate_fiber_arrays(
+        [first, FiberArrays.empty(), second]
+    )
+    assert fiber_offsets.tolist() == [0, 1, 1, 3]
+    assert fibers.fiber_ids == ["a", "b", "c"]
+    assert fibers.type_names == ["Actin", "Tubulin"]
+    assert fibers.type_codes.tolist() == [0, 1, 0]
+    assert fibers.offsets.tolist() == [0, 2, 3, 3]
+    assert fibers.select([1]).to_dict()["b"]["points"].tolist() == [[2.0, 0.0, 0.0]]
+
+
+def test_store_hooks():
+    store = Store(fiber_arrays_schema())
+    store.set_value(initial_fiber_arrays)
+    moved = initial_fiber_arrays["fibers"].transform([1.0, 0.0, 0.0])
+    store.apply_update({"fibers": moved})
+    assert store.get_value()["fibers"] == moved
+
+    # dict form updates are converted with the current type table
+    store.apply_update({"fibers": initial_fibers["fibers"]})
+    assert store.get_value()["fibers"] == initial_fiber_arrays["fibers"]
+
+    emitted = serialize_value(store.emit_data())
+    rebuilt = FiberArraysSerializer().deserialize(emitted["fibers"])
+    assert rebuilt == initial_fiber_arrays["fibers"]
+
+    daughters = store["fibers"].divide_value()
+    assert daughters[0] == daughters[1] == initial_fiber_arrays["fibers"]
+    assert daughters[0].points is not daughters[1].points
+
+
+def test_fiber_delta():
+    previous = FiberArrays.from_dict(
+        {
+            "a": {"type_name": "Actin", "points": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]},
+            "b": {"type_name": "Actin", "points": [[0.0, 1.0, 0.0], [1.0, 1.0, 0.0]]},
+            "c": {"type_name": "Actin", "points": [[0.0, 2.0, 0.0]]},
+            "d": {"type_name": "Actin", "points": [[0.0, 3.0, 0.0]]},
+        }
+    )
+    current = FiberArrays.from_dict(
+        {
+            # a moved below the tolerance, b moved above it, c grew
+            "a": {"type_name": "Actin", "points": [[0.05, 0.0, 0.0], [1.0, 0.0, 0.0]]},
+            "b": {"type_name": "Actin", "points": [[0.0, 1.0, 0.0], [1.0, 1.5, 0.0]]},
+            "c": {"type_name": "Actin", "points": [[0.0, 2.0, 0.0], [1.0, 2.0, 0.0]]},
+            "e": {"type_name": "Tubulin", "points": [[0.0, 4.0, 0.0]]},
+        }
+    )
+    delta = fiber_delta(previous, current, tolerance=0.1)
+    assert [added["key"] for added in delta["_add"]] == ["e"]
+    assert delta["_delete"] == ["d"]
+    assert sorted(delta.keys() - {"_add", "_delete"}) == ["b", "c"]
+
+    updated = update_fiber_arrays(previous, delta)
+    assert updated.fiber_ids == ["a", "b", "c", "e"]
+    assert np.array_equal(updated.to_dict()["a"]["points"], previous.points[:2])
+    for fiber_id in ["b", "c", "e"]:
+        assert np.array_equal(
+            updated.to_dict()[fiber_id]["points"], current.to_dict()[fiber_id]["points"]
+        )
+    assert updated.type_names == ["Actin", "Tubulin"]
+    assert fiber_delta(current, current) == {"_add": [], "_delete": []}
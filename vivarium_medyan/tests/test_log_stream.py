@@ -0,0 +1,89 @@
+import sys
+import time
+
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.log_stream import LogMonitor, MedyanRunError, MedyanTimeout
+from vivarium_medyan.library.runners import LocalRunner
+
+
+def python_runner(script):
+    # MEDYAN's -i/-o/-s arguments end up in sys.argv
+    return LocalRunner([sys.executable, "-u", "-c", script])
+
+
+def test_monitor():
+    progress = []
+    monitor = LogMonitor(buffer_lines=3, progress_callback=progress.append)
+    monitor.feed(b"Current simulation time = 0.5\nCurrent simu")
+    monitor.feed("lation time = 1.5\nline\nline\nDone with simulation!")
+    assert not monitor.done
+    monitor.finish()
+    assert monitor.done
+    assert progress == [0.5, 1.5]
+    assert monitor.logs() == "line\nline\nDone with simulation!"
+    assert monitor.line_count == 5
+
+    with pytest.raises(MedyanRunError, match="Segmentation fault"):
+        LogMonitor().feed("Segmentation fault (core dumped)\n")
+
+
+def test_local_runner_streams(tmp_path):
+    script = (
+        "for t in range(3): print(f'Current simulation time = {t}')\n"
+        "print('Done with simulation!')"
+    )
+    progress = []
+    monitor = LogMonitor(progress_callback=progress.append)
+    logs = python_runner(script).run_monitored(tmp_path, tmp_path, monitor)
+    assert progress == [0.0, 1.0, 2.0]
+    assert logs.endswith("Done with simulation!") and monitor.done
+
+
+@pytest.mark.parametrize(
+    "script, monitor, error",
+    [
+        (
+            "print('ERROR: mechanical minimization diverged'); "
+            "import time; time.sleep(60)",
+            LogMonitor(),
+            MedyanRunError,
+        ),
+        (
+            "print('Current simulation time = 0'); import time; time.sleep(60)",
+            LogMonitor(idle_timeout=0.5),
+            MedyanTimeout,
+        ),
+        (
+            "import time\nwhile True: print('still going'); time.sleep(0.1)",
+            LogMonitor(wall_timeout=1.0),
+            MedyanTimeout,
+        ),
+    ],
+)
+def test_runs_are_stopped_early(tmp_path, script, monitor, error):
+    start = time.monotonic()
+    with pytest.raises(error):
+        python_runner(script).run_monitored(tmp_path, tmp_path, monitor)
+    assert time.monotonic() - start < 10.0
+
+
+def test_process_progress(tmp_path, fake_medyan):
+    progress = []
+    medyan = fake_medyan(tmp_path, progress_callback=progress.append)
+    medyan.next_update(10.0, initial_fibers)
+    assert progress[0] == 0.0 and progress[-1] == 10.0
+
+
+def test_interrupted_runs_are_stopped(tmp_path):
+    def interrupt(simulated_time):
+        raise KeyboardInterrupt
+
+    script = "print('Current simulation time = 0'); import time; time.sleep(60)"
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        python_runner(script).run_monitored(
+            tmp_path, tmp_path, LogMonitor(progress_callback=interrupt)
+        )
+    assert time.monotonic() - start < 10.0
@@ -0,0 +1,262 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from vivarium.core.engine import Engine
+
+from vivarium_medyan.data.fibers import initial_fiber_arrays, initial_fibers
+from vivarium_medyan.library.fake_medyan import FakeRunner, read_restart
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+
+def run_engine(medyan, initial_state, total_time=30.0):
+    engine = Engine(
+        processes={"medyan": medyan},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+            }
+        },
+        initial_state=initial_state,
+    )
+    engine.update(total_time)
+    return engine
+
+
+def test_construct_without_docker(tmp_path, monkeypatch):
+    import docker
+
+    def no_daemon():
+        raise AssertionError("the Docker daemon was contacted")
+
+    monkeypatch.setattr(docker, "from_env", no_daemon)
+    medyan = MedyanProcess(
+        {
+            "time_step": 10.0,
+            "input_directory": str(tmp_path / "in"),
+            "output_directory": str(tmp_path / "out"),
+        }
+    )
+    assert medyan.create_runner().image == "simularium/medyan:latest"
+
+
+def test_fake_runner_dict_fibers(tmp_path, fake_medyan):
+    engine = run_engine(fake_medyan(tmp_path), initial_fibers)
+    state = engine.state.get_value()
+    assert np.array_equal(state["fibers_box_extent"], [7500.0, 7500.0, 7500.0])
+    points = [fiber["points"] for fiber in state["fibers"].values()]
+    assert all(np.shape(fiber_points) == (2, 3) for fiber_points in points)
+
+
+def test_fake_runner_fiber_arrays(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, fiber_representation="arrays")
+    engine = run_engine(medyan, initial_fiber_arrays)
+    fibers = engine.state.get_value()["fibers"]
+    assert isinstance(fibers, FiberArrays)
+    assert np.allclose(fibers.points, initial_fiber_arrays["fibers"].points)
+    assert fibers.type_names == ["Actin-Polymer"]
+
+
+@pytest.mark.parametrize("representation", ["dict", "arrays"])
+def test_delta_updates(tmp_path, representation, fake_medyan):
+    def final_fibers(path, initial_state, **parameters):
+        medyan = fake_medyan(path, runner=FakeRunner(jitter=1.0, seed=0), **parameters)
+        engine = run_engine(medyan, initial_state, total_time=10.0)
+        return engine.state.get_value()["fibers"]
+
+    expected = final_fibers(
+        tmp_path / "set", initial_fiber_arrays, fiber_representation="arrays"
+    )
+    fibers = final_fibers(
+        tmp_path / "delta",
+        initial_fiber_arrays if representation == "arrays" else initial_fibers,
+        fiber_representation=representation,
+        delta_updates=True,
+    )
+    if representation == "arrays":
+        fibers = fibers.to_dict()
+    # MEDYAN renumbers fibers from 0, so the first delta relabels the
+    # initial ids; the result still matches the full update fiber for fiber
+    assert fibers.keys() == set(expected.fiber_ids)
+    for fiber_id, fiber in expected.to_dict().items():
+        assert np.allclose(fibers[fiber_id]["points"], fiber["points"])
+
+
+def test_delta_tolerance(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, delta_updates=True, delta_tolerance=1e-6)
+    update = medyan.next_update(10.0, initial_fibers)
+    assert update["fibers"]["_delete"] == ["30"]
+    fibers = medyan.read_snapshot_arrays(medyan.output_path / "snapshot.traj")
+    fibers.points = medyan.transform_points(fibers.points, inverse=True)
+    update = medyan.next_update(10.0, {"fibers": fibers})
+    assert update["fibers"] == {"_add": [], "_delete": []}
+
+
+def test_unknown_runner(tmp_path, fake_medyan):
+    with pytest.raises(ValueError):
+        fake_medyan(tmp_path, runner="podman").create_runner()
+
+
+def test_continuation(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path, continuation=True, runner=FakeRunner(jitter=1.0, seed=0)
+    )
+    restart_path = medyan.input_path / "restart.traj"
+    medyan.next_update(10.0, initial_fibers)
+    assert restart_path.exists()
+    assert "RESTARTFILE" not in (medyan.input_path / "systeminput.txt").read_text()
+
+    # later steps continue from the checkpoint, not from filaments.txt
+    (medyan.input_path / "filaments.txt").unlink()
+    for _ in range(2):
+        update = medyan.next_update(10.0, initial_fibers)
+    assert "RESTARTFILE" in (medyan.input_path / "systeminput.txt").read_text()
+    assert read_restart(restart_path)[0] == 30.0
+    assert medyan.simulation_time == 30.0
+    points = np.concatenate([f["points"] for f in update["fibers"].values()])
+    initial = np.concatenate([f["points"] for f in initial_fibers["fibers"].values()])
+    assert not np.allclose(points, initial)
+
+    medyan.reset_continuation()
+    medyan.next_update(10.0, initial_fibers)
+    assert (medyan.input_path / "filaments.txt").exists()
+    assert read_restart(restart_path)[0] == 10.0
+
+
+def test_metrics(tmp_path, fake_medyan):
+    records = []
+    metrics_file = tmp_path / "metrics.jsonl"
+    medyan = fake_medyan(
+        tmp_path,
+        metrics=True,
+        metrics_callback=records.append,
+        metrics_file=str(metrics_file),
+        metrics_port=True,
+    )
+    engine = Engine(
+        processes={"medyan": medyan},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+                "metrics": ("metrics",),
+            }
+        },
+        initial_state=initial_fibers,
+    )
+    engine.update(20.0)
+
+    assert len(records) == 2
+    record = records[0]
+    assert set(record["durations"]) == {
+        "staging",
+        "serialize",
+        "render",
+        "run",
+        "parse",
+        "transform",
+    }
+    assert record["fibers_in"] == record["fibers_out"] == 30
+    assert record["points_out"] == 60
+    assert record["bytes_written"] > 0
+    # only the last of the snapshot's frames is read
+    assert 0 < record["snapshot_bytes_read"] < record["snapshot_file_bytes"] / 5
+    # configs are only staged on the first step
+    assert records[1]["bytes_written"] < record["bytes_written"]
+    lines = metrics_file.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == records
+    assert engine.state.get_value()["metrics"] == records[-1]
+
+
+def test_metrics_off(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path)
+    update = medyan.next_update(10.0, initial_fibers)
+    assert "metrics" not in update and medyan.last_metrics is None
+
+
+def test_ram_workspace(tmp_path, fake_medyan):
+    ram_directory = tmp_path / "shm"
+    ram_directory.mkdir()
+    medyan = fake_medyan(tmp_path, ram_workspace=True, ram_directory=str(ram_directory))
+    workspace = Path(medyan.ram_directory)
+    assert workspace.parent == ram_directory
+    assert workspace in medyan.input_path.parents
+    assert workspace in medyan.output_path.parents
+    update = medyan.next_update(10.0, initial_fibers)
+    on_disk = fake_medyan(tmp_path).next_update(10.0, initial_fibers)
+    for fiber_id, fiber in on_disk["fibers"].items():
+        assert np.array_equal(update["fibers"][fiber_id]["points"], fiber["points"])
+
+    medyan.close()
+    assert not workspace.exists()
+    # removed when the process is collected too
+    medyan = fake_medyan(tmp_path, ram_workspace=True, ram_directory=str(ram_directory))
+    workspace = Path(medyan.ram_directory)
+    del medyan
+    assert not workspace.exists()
+
+
+def test_iter_snapshot(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, snapshot=2.0, runner=FakeRunner(jitter=1.0, seed=0))
+    update = medyan.next_update(10.0, initial_fibers)
+    frames = medyan.iter_snapshot()
+    assert not isinstance(frames, (list, tuple))
+    frames = list(frames)
+    assert [frame_time for frame_time, _ in frames] == [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+    last_time, last_fibers = frames[-1]
+    for fiber_id, fiber in update["fibers"].items():
+        assert np.array_equal(last_fibers[fiber_id]["points"], fiber["points"])
+
+
+def test_emit_frames(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path,
+        snapshot=2.0,
+        emit_frames=True,
+        fiber_representation="arrays",
+        runner=FakeRunner(jitter=1.0, seed=0),
+    )
+    engine = Engine(
+        processes={"medyan": medyan},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+                "frames": ("frames",),
+            }
+        },
+        initial_state=initial_fiber_arrays,
+    )
+    engine.update(20.0)
+    state = engine.state.get_value()
+    frames = state["frames"]
+    assert frames["times"].tolist() == [12.0, 14.0, 16.0, 18.0, 20.0]
+    offsets = frames["frame_offsets"]
+    assert offsets.tolist() == [0, 30, 60, 90, 120, 150]
+    last = frames["fibers"].select(np.arange(offsets[-2], offsets[-1]))
+    assert np.array_equal(last.points, state["fibers"].points)
+    first = frames["fibers"].select(np.arange(offsets[0], offsets[1]))
+    assert not np.array_equal(first.points, last.points)
+
+
+def test_emit_frames_with_continuation(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path,
+        snapshot=2.0,
+        emit_frames=True,
+        continuation=True,
+        runner=FakeRunner(jitter=1.0, seed=0),
+    )
+    for step in range(2):
+        update = medyan.next_update(10.0, initial_fibers)
+        start = 10.0 * step
+        expected = [start + 2.0, start + 4.0, start + 6.0, start + 8.0, start + 10.0]
+        assert update["frames"]["times"].tolist() == expected
+        # the snapshot was kept as the checkpoint, and can still be read
+        assert (medyan.input_path / "restart.traj").exists()
+        last_time, last_fibers = list(medyan.iter_snapshot())[-1]
+        for fiber_id, fiber in update["fibers"].items():
+            assert np.array_equal(last_fibers[fiber_id]["points"], fiber["points"])
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+from vivarium_medyan.benchmarks import suite
+from vivarium_medyan.data.networks import (
+    ARP23_BRANCH_ANGLE,
+    NETWORKS,
+    branched_network,
+    network_state,
+)
+
+
+@pytest.mark.parametrize("kind", sorted(NETWORKS))
+def test_networks_fit_the_box(kind):
+    box_extent = np.array([1000.0, 500.0, 500.0])
+    state = network_state(kind, 200, box_extent=box_extent, points_per_fiber=5, seed=0)
+    fibers = state["fibers"]
+    assert len(fibers) == 200
+    assert fibers.points.shape == (1000, 3)
+    assert np.all(fibers.points >= 0.0) and np.all(fibers.points <= box_extent)
+    assert np.array_equal(state["fibers_box_extent"], box_extent)
+    dict_state = network_state(kind, 200, "dict", box_extent, seed=0)
+    assert len(dict_state["fibers"]) == 200
+
+
+def test_branch_angle():
+    # a large box so no fiber is clipped
+    fibers = branched_network(
+        20, box_extent=[1e6, 1e6, 1e6], n_mothers=1, fiber_length=10.0, seed=0
+    )
+    directions = fibers.points[1::2] - fibers.points[::2]
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    # the first daughter branches from the only mother
+    angle = np.arccos(np.dot(directions[0], directions[1]))
+    assert np.isclose(angle, ARP23_BRANCH_ANGLE)
+
+
+def test_suite_regressions(tmp_path):
+    baseline_path = tmp_path / "baselines.json"
+    suite.main([10], save_baseline=True, baseline_path=baseline_path)
+    results = {"next_update": {"10": 1e6}}
+    baselines = json.loads(baseline_path.read_text())["branched"]
+    assert set(baselines) >= {"read_snapshot", "next_update", "transform_fiber"}
+    assert suite.compare(results, baselines, 1.5)[0][:2] == ("next_update", "10")
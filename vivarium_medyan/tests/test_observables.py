@@ -0,0 +1,108 @@
+import numpy as np
+from vivarium.core.engine import Engine
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.fake_medyan import FakeRunner
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.observables import IncrementalObservables
+from vivarium_medyan.processes.fiber_observables import FiberObservables
+
+
+def random_walks(n_fibers, seed=0):
+    rng = np.random.default_rng(seed)
+    fibers = {}
+    for fiber_id in range(n_fibers):
+        n_points = int(rng.integers(0, 8))
+        steps = rng.normal(size=(n_points, 3)) + [5.0, 0.0, 0.0]
+        fibers[str(fiber_id)] = {
+            "type_name": "Actin-Polymer",
+            "points": np.cumsum(steps, axis=0) + rng.uniform(0, 100, 3),
+        }
+    return fibers
+
+
+def naive_summary(fibers):
+    """
+    The same observables, fiber by fiber and segment by segment
+    """
+    lengths, end_to_end, turning = [], [], 0.0
+    order = np.zeros((3, 3))
+    for fiber in fibers.values():
+        points = fiber["points"]
+        segments = [b - a for a, b in zip(points[:-1], points[1:])]
+        lengths.append(sum(np.linalg.norm(segment) for segment in segments))
+        end_to_end.append(np.linalg.norm(points[-1] - points[0]) if len(points) else 0)
+        for segment in segments:
+            order += np.outer(segment, segment) / np.linalg.norm(segment)
+        for a, b in zip(segments[:-1], segments[1:]):
+            cosine = a @ b / np.linalg.norm(a) / np.linalg.norm(b)
+            turning += np.arccos(np.clip(cosine, -1.0, 1.0))
+    order = 1.5 * order / sum(lengths) - 0.5 * np.eye(3)
+    points = np.concatenate([fiber["points"] for fiber in fibers.values()])
+    return {
+        "mean_length": np.mean(lengths),
+        "mean_end_to_end": np.mean(end_to_end),
+        "mean_curvature": turning / sum(lengths),
+        "nematic_order": np.linalg.eigvalsh(order)[-1],
+        "radius_of_gyration": np.sqrt(
+            ((points - points.mean(axis=0)) ** 2).sum(axis=1).mean()
+        ),
+    }
+
+
+def assert_summary(summary, fibers):
+    for key, value in naive_summary(fibers).items():
+        assert np.isclose(summary[key], value), key
+
+
+def test_observables():
+    fibers = random_walks(40)
+    summary = IncrementalObservables().update(fibers)
+    assert summary["n_fibers"] == 40 and summary["contraction"] == 1.0
+    assert summary["nematic_order"] > 0.5
+    assert abs(summary["director"][0]) > 0.9
+    assert_summary(summary, fibers)
+
+
+def test_incremental_updates():
+    fibers = random_walks(40)
+    observables = IncrementalObservables()
+    observables.update(FiberArrays.from_dict(fibers))
+
+    moved = dict(fibers)
+    moved["3"] = {**fibers["3"], "points": fibers["3"]["points"] * 0.5}
+    moved["41"] = random_walks(1, seed=1)["0"]
+    del moved["7"]
+    summary = observables.update(FiberArrays.from_dict(moved))
+    assert summary["recomputed_fibers"] == 2
+    assert_summary(summary, moved)
+    assert summary["contraction"] < 1.0
+
+    arrays = FiberArrays.from_dict(moved)
+    observables.update(arrays)
+    assert observables.update(arrays)["recomputed_fibers"] == 0
+
+
+def test_observables_step(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, runner=FakeRunner(jitter=1.0, seed=0))
+    engine = Engine(
+        processes={"medyan": medyan},
+        steps={"fiber_observables": FiberObservables()},
+        flow={"fiber_observables": []},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+            },
+            "fiber_observables": {
+                "fibers": ("fibers",),
+                "observables": ("observables",),
+            },
+        },
+        initial_state=initial_fibers,
+    )
+    engine.update(20.0)
+    state = engine.state.get_value()
+    summary = state["observables"]
+    assert summary["n_fibers"] == len(state["fibers"])
+    assert_summary(summary, state["fibers"])
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.outputs import OutputFile, index_frames
+from vivarium_medyan.library.system_input import read_system_texts
+
+TENSIONS = (
+    "0 0.0 2 1 0 0\n"
+    "FILAMENT 0 0 2 0 0\n"
+    "0.5 1.5\n"
+    "FILAMENT 1 0 1 0 0\n"
+    "2.5\n"
+    "LINKER 0 0\n"
+    "3.0\n"
+    "\n"
+    "1 10.0 1 0 0 0\n"
+    "FILAMENT 1 0 2 0 0\n"
+    "4.0 5.0\n"
+    "\n\n"
+)
+
+
+def test_index_frames():
+    data = TENSIONS.encode()
+    starts = index_frames(data)
+    assert starts.tolist() == [0, data.index(b"1 10.0")]
+    assert index_frames(b"").tolist() == []
+
+
+def test_output_file(tmp_path):
+    path = tmp_path / "tensions.traj"
+    path.write_text(TENSIONS)
+    tensions = OutputFile(path)
+    assert len(tensions) == 2
+    assert tensions.times.tolist() == [0.0, 10.0]
+    first = tensions.frame(0)
+    assert first.ids() == ["0", "1"] and first.ids("LINKER") == ["0"]
+    assert first.values(0).tolist() == [0.5, 1.5]
+    assert first.values("0", kind="LINKER").tolist() == [3.0]
+    assert tensions.frame(-1).all_values()["1"].tolist() == [4.0, 5.0]
+    assert tensions.frame_at(5.0).step == 0
+    with pytest.raises(IndexError):
+        tensions.frame(2)
+
+    # the index is rebuilt when the file is rewritten
+    path.write_text(TENSIONS.split("\n\n")[0])
+    assert len(tensions) == 1
+    assert tensions.frame(-1).time == 0.0
+
+
+def test_process_outputs(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path, outputs=("tensions", "chemistry"), output_ports=("tensions",)
+    )
+    assert "tensions" in medyan.ports_schema()
+    update = medyan.next_update(10.0, initial_fibers)
+
+    # only the requested outputs are written
+    system_text = (medyan.input_path / "systeminput.txt").read_text()
+    assert read_system_texts(system_text, "OUTPUTTYPE") == ["TENSIONS", "CHEMISTRY"]
+    assert not (medyan.output_path / "forces.traj").exists()
+
+    tensions = update["tensions"]
+    assert tensions.keys() == update["fibers"].keys()
+    for fiber_id, fiber in update["fibers"].items():
+        lengths = np.linalg.norm(np.diff(fiber["points"], axis=0), axis=1)
+        assert np.allclose(tensions[fiber_id], lengths)
+    chemistry = medyan.output_file("chemistry").frame(-1).counts()
+    assert chemistry == {"FILAMENT:0": 30, "PLUSEND:0": 30, "MINUSEND:0": 30}
+
+    with pytest.raises(ValueError):
+        fake_medyan(tmp_path, outputs=("stresses",))
+    with pytest.raises(ValueError):
+        fake_medyan(tmp_path, output_ports=("forces",))
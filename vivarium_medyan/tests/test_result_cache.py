@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.fake_medyan import FakeRunner
+from vivarium_medyan.library.result_cache import ResultCache, hash_directory
+
+
+class CountingRunner(FakeRunner):
+    def __init__(self, jitter=0.0, seed=None):
+        super().__init__(jitter, seed)
+        self.runs = 0
+
+    def run(self, input_path, output_path):
+        self.runs += 1
+        return super().run(input_path, output_path)
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    output = tmp_path / "out"
+    output.mkdir()
+    for index, key in enumerate(["aa1", "bb2", "cc3"]):
+        (output / "snapshot.traj").write_bytes(bytes(100))
+        cache.put(key, output, ["snapshot.traj"])
+        # distinct modification times regardless of timer resolution
+        os.utime(cache.entry_path(key), ns=(index, index))
+        if key == "bb2":
+            assert cache.get("aa1", output, ["snapshot.traj"])
+            os.utime(cache.entry_path("aa1"), ns=(10, 10))
+    # bb2 was least recently used
+    assert not cache.get("bb2", output, ["snapshot.traj"])
+    assert cache.stats == {"hits": 1, "misses": 1, "evictions": 1}
+    assert cache.size() == 200
+
+
+def test_hash_directory(tmp_path):
+    (tmp_path / "systeminput.txt").write_text("RUNTIME: 10")
+    key = hash_directory(tmp_path, "medyan 1")
+    assert hash_directory(tmp_path, "medyan 1") == key
+    assert hash_directory(tmp_path, "medyan 2") != key
+    # files left in subdirectories, e.g. by decomposed steps, are ignored
+    (tmp_path / "subdomain_0_0_0").mkdir()
+    (tmp_path / "subdomain_0_0_0" / "systeminput.txt").write_text("NX: 5")
+    assert hash_directory(tmp_path, "medyan 1") == key
+    (tmp_path / "systeminput.txt").write_text("RUNTIME: 20")
+    assert hash_directory(tmp_path, "medyan 1") != key
+
+
+def test_cached_runs(tmp_path, fake_medyan):
+    cache_directory = str(tmp_path / "cache")
+    runner = CountingRunner(jitter=1.0, seed=0)
+    updates = []
+    for replicate in range(2):
+        medyan = fake_medyan(
+            tmp_path / str(replicate), runner=runner, result_cache=cache_directory
+        )
+        updates.append(medyan.next_update(10.0, initial_fibers))
+    assert runner.runs == 1
+    assert medyan.result_cache().stats["hits"] == 1
+    for fiber_id, fiber in updates[0]["fibers"].items():
+        assert np.array_equal(fiber["points"], updates[1]["fibers"][fiber_id]["points"])
+
+    # a different timestep is a different run
+    medyan.next_update(5.0, initial_fibers)
+    assert runner.runs == 2
+
+    # stochastic runs can skip the cache
+    medyan = fake_medyan(
+        tmp_path / "bypass",
+        runner=runner,
+        result_cache=cache_directory,
+        bypass_cache=True,
+    )
+    medyan.next_update(10.0, initial_fibers)
+    assert runner.runs == 3
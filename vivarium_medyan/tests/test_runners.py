@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.log_stream import LogMonitor, MedyanRunError
+from vivarium_medyan.library.runners import (
+    DockerExecRunner,
+    MedyanRunner,
+    RunnerPool,
+)
+
+
+def test_pooled_fake_medyan(tmp_path, fake_medyan, fake_medyan_command):
+    medyan = fake_medyan(
+        tmp_path,
+        time_step=2.0,
+        runner="binary",
+        medyan_command=fake_medyan_command,
+        runner_pool_size=2,
+        workspace_root=str(tmp_path),
+    )
+    pool = medyan.runner_pool()
+    for _ in range(2):
+        update = medyan.next_update(2.0, initial_fibers)
+    assert len(pool.runners) == 2
+    fibers = update["fibers"]
+    assert len(fibers) == len(initial_fibers["fibers"])
+    for fiber, initial in zip(fibers.values(), initial_fibers["fibers"].values()):
+        assert fiber["type_name"] == initial["type_name"]
+        assert np.allclose(fiber["points"], initial["points"])
+    pool.shutdown()
+    assert pool.runners == []
+
+
+class FlakyRunner(MedyanRunner):
+    def __init__(self):
+        self.healthy = True
+        self.stopped = False
+
+    def health_check(self):
+        return self.healthy
+
+    def run(self, input_path, output_path):
+        return "Done with simulation!"
+
+    def shutdown(self):
+        self.stopped = True
+
+
+def test_pool_replaces_unhealthy_runners():
+    with RunnerPool(FlakyRunner, size=2) as pool:
+        first, second = pool.runners
+        first.healthy = False
+        assert pool.health_check() == 1
+        assert first.stopped
+        assert first not in pool.runners and second in pool.runners
+        second.healthy = False
+        with pool.runner() as runner:
+            with pool.runner() as other:
+                assert {runner, other} == set(pool.runners)
+                assert second not in pool.runners
+    assert pool.runners == []
+
+
+def test_pool_replaces_failed_runners():
+    with RunnerPool(FlakyRunner, size=1) as pool:
+        with pytest.raises(MedyanRunError):
+            with pool.runner() as failed:
+                raise MedyanRunError("timed out")
+        assert failed.stopped
+        with pool.runner() as runner:
+            assert runner is not failed and pool.runners == [runner]
+
+
+class ExecContainer:
+    """
+    A started container whose exec'd MEDYAN prints an error
+    """
+
+    def __init__(self, pkill_exit_code):
+        self.pkill_exit_code = pkill_exit_code
+        self.commands = []
+
+    def exec_run(self, command, workdir=None, stream=False):
+        self.commands.append(command)
+        if stream:
+            return None, iter([b"Segmentation fault\n"])
+        return self.pkill_exit_code, b"pkill: usage"
+
+
+@pytest.mark.parametrize("pkill_exit_code", [0, 1, 2])
+def test_exec_runner_kills_failed_runs(tmp_path, pkill_exit_code):
+    runner = DockerExecRunner(workspace_root=tmp_path)
+    runner.container = ExecContainer(pkill_exit_code)
+    monitor = LogMonitor(error_patterns=["Segmentation fault"])
+    error = MedyanRunError if pkill_exit_code < 2 else RuntimeError
+    with pytest.raises(error):
+        runner.run_monitored(tmp_path / "in", tmp_path / "out", monitor)
+    pattern = f"-i {tmp_path / 'in'}"
+    assert runner.container.commands[-1] == ["pkill", "-f", "--", pattern]
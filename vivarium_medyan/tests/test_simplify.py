@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from vivarium_medyan.library.coordinates import concatenate_points
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.simplify import (
+    point_segment_distances,
+    resample_points,
+    simplify_fiber_arrays,
+)
+
+
+def helix(n, radius=20.0, pitch=100.0, turns=2.0):
+    angle = np.linspace(0.0, 2 * np.pi * turns, n)
+    return np.stack(
+        [radius * np.cos(angle), radius * np.sin(angle), pitch * angle / np.pi], axis=1
+    )
+
+
+def polyline_distances(points, polyline):
+    """
+    Brute force distance of each point to the closest segment of polyline
+    """
+    starts, ends = polyline[:-1], polyline[1:]
+    return np.array(
+        [
+            point_segment_distances(
+                np.repeat(point[None], len(starts), axis=0), starts, ends
+            ).min()
+            for point in points
+        ]
+    )
+
+
+def fiber_arrays(fibers):
+    points, offsets = concatenate_points(fibers)
+    return FiberArrays(
+        [str(i) for i in range(len(fibers))],
+        np.zeros(len(fibers)),
+        offsets,
+        points,
+        ["Actin"],
+    )
+
+
+def test_douglas_peucker_bounds_error():
+    straight = np.linspace([0.0, 0.0, 0.0], [100.0, 0.0, 0.0], 11)
+    fibers = fiber_arrays([helix(200), straight, np.zeros((1, 3)), helix(50) + 500])
+    simplified, ratio = simplify_fiber_arrays(fibers, tolerance=2.0)
+    assert ratio > 2.0
+    assert simplified.fiber_ids == fibers.fiber_ids
+    original = fibers.to_dict()
+    for fiber_id, fiber in simplified.to_dict().items():
+        points = original[fiber_id]["points"]
+        # ends are kept and points are a subset of the original ones
+        assert np.array_equal(fiber["points"][[0, -1]], points[[0, -1]])
+        if len(points) > 1:
+            assert polyline_distances(points, fiber["points"]).max() <= 2.0
+    assert len(simplified.to_dict()["1"]["points"]) == 2
+    assert len(simplified.to_dict()["2"]["points"]) == 1
+
+    tighter, tighter_ratio = simplify_fiber_arrays(fibers, tolerance=0.1)
+    assert 1.0 <= tighter_ratio < ratio
+
+
+def test_resample_spacing():
+    fibers = fiber_arrays([helix(500), np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]])])
+    simplified, ratio = simplify_fiber_arrays(fibers, 50.0, method="resample")
+    assert ratio > 1.0
+    resampled = simplified.to_dict()
+    steps = np.linalg.norm(np.diff(resampled["0"]["points"], axis=0), axis=1)
+    assert steps.max() <= 50.0
+    assert np.allclose(resampled["0"]["points"][[0, -1]], helix(500)[[0, -1]])
+    assert np.allclose(resampled["1"]["points"], [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]])
+    with pytest.raises(ValueError):
+        simplify_fiber_arrays(fibers, 1.0, method="spline")
+
+
+def test_resample_empty_fibers():
+    line = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0]])
+    points, offsets = resample_points(line, np.array([0, 0, 3]), 0.5)
+    assert offsets.tolist() == [0, 0, 5]
+    assert np.allclose(points[:, 0], [0.0, 0.5, 1.0, 1.5, 2.0])
+
+    # empty fibers first, between two fibers and last
+    points, offsets = resample_points(
+        np.concatenate([line, line + [0.0, 5.0, 0.0]]),
+        np.array([0, 0, 3, 3, 6, 6]),
+        1.0,
+    )
+    assert offsets.tolist() == [0, 0, 3, 3, 6, 6]
+    assert np.allclose(points[:, 0], [0.0, 1.0, 2.0, 0.0, 1.0, 2.0])
+    assert np.allclose(points[3:, 1], 5.0)
+
+
+def test_resample_keeps_endpoints():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        lengths = rng.integers(0, 5, 30)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        points = rng.uniform(0.0, 100.0, (offsets[-1], 3))
+        resampled, new_offsets = resample_points(points, offsets, 10.0)
+        for index, length in enumerate(lengths):
+            start, end = new_offsets[index : index + 2]
+            if length == 0:
+                assert start == end
+                continue
+            fiber = resampled[start:end]
+            assert np.allclose(fiber[0], points[offsets[index]])
+            assert np.allclose(fiber[-1], points[offsets[index + 1] - 1])
+
+
+def test_process_simplifies(tmp_path, fake_medyan):
+    medyan = fake_medyan(
+        tmp_path,
+        simplify_tolerance=5.0,
+        simplify_stages=("input", "output"),
+        metrics=True,
+    )
+    points = helix(100) + [500.0, 0.0, 0.0]
+    update = medyan.next_update(
+        10.0, {"fibers": {"1": {"type_name": "Actin", "points": points}}}
+    )
+    (fiber,) = update["fibers"].values()
+    assert 2 <= len(fiber["points"]) < len(points)
+    assert polyline_distances(points, fiber["points"]).max() <= 5.0
+    metrics = medyan.last_metrics
+    assert metrics["simplify_input_points"] == 100
+    assert metrics["simplify_input_ratio"] > 1.0
+    assert metrics["simplify_output_ratio"] == 1.0
@@ -0,0 +1,59 @@
+import pytest
+
+from vivarium_medyan.library.snapshot import (
+    read_last_frame,
+    read_last_frame_mapped,
+    write_snapshot,
+)
+
+
+def frame(time, n_fibers):
+    return (
+        time,
+        [
+            (fiber_id, 0, [[time, fiber_id, 0.5], [time + 1.0, fiber_id, 1.5]])
+            for fiber_id in range(n_fibers)
+        ],
+    )
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1 << 16])
+def test_read_last_frame(tmp_path, block_size):
+    snapshot_path = tmp_path / "snapshot.traj"
+    write_snapshot(snapshot_path, [frame(0.0, 3), frame(1.0, 4), frame(2.0, 2)])
+    lines = read_last_frame(snapshot_path, block_size)
+    assert lines[0] == "2 2.0 2 0 0 0"
+    assert lines[1:5] == [
+        "FILAMENT 0 0 1 0 0",
+        "2.0 0.0 0.5 3.0 0.0 1.5",
+        "FILAMENT 1 0 1 0 0",
+        "2.0 1.0 0.5 3.0 1.0 1.5",
+    ]
+    assert not any(line.strip() for line in lines[5:])
+
+
+def test_read_last_frame_trailing_blank_lines(tmp_path):
+    snapshot_path = tmp_path / "snapshot.traj"
+    write_snapshot(snapshot_path, [frame(0.0, 1), frame(1.0, 1)])
+    with open(snapshot_path, "a") as snapshot_file:
+        snapshot_file.write("\n\n\n")
+    lines = read_last_frame(snapshot_path, block_size=3)
+    assert lines[0] == "1 1.0 1 0 0 0"
+
+
+def test_read_last_frame_single_frame(tmp_path):
+    snapshot_path = tmp_path / "snapshot.traj"
+    write_snapshot(snapshot_path, [frame(0.0, 2)])
+    lines = read_last_frame(snapshot_path)
+    assert lines[0] == "0 0.0 2 0 0 0"
+    assert sum("FILAMENT" in line for line in lines) == 2
+
+
+@pytest.mark.parametrize("trailing", ["", "\n\n\n"])
+@pytest.mark.parametrize("n_frames", [0, 1, 3])
+def test_read_last_frame_mapped(tmp_path, n_frames, trailing):
+    snapshot_path = tmp_path / "snapshot.traj"
+    write_snapshot(snapshot_path, [frame(float(t), 2) for t in range(n_frames)])
+    with open(snapshot_path, "a") as snapshot_file:
+        snapshot_file.write(trailing)
+    assert read_last_frame_mapped(snapshot_path) == read_last_frame(snapshot_path)
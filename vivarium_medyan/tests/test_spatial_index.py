@@ -0,0 +1,111 @@
+import numpy as np
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.data.networks import isotropic_network
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.simplify import point_segment_distances
+from vivarium_medyan.library.spatial_index import (
+    SegmentGrid,
+    fiber_segments,
+    segment_box_overlap,
+)
+
+
+def network(seed=0):
+    # long fibers, cut into several pieces, and some outside the box
+    fibers = isotropic_network(
+        300, 4, box_extent=[2000.0] * 3, fiber_length=1500.0, seed=seed
+    )
+    fibers.points[:8] -= 300.0
+    return fibers
+
+
+def brute_force(fibers, point, radius):
+    starts, ends, segment_fibers, positions = fiber_segments(
+        fibers.points, fibers.offsets
+    )
+    distances = point_segment_distances(
+        np.broadcast_to(point, starts.shape), starts, ends
+    )
+    within = np.flatnonzero(distances <= radius)
+    return {
+        (fibers.fiber_ids[segment_fibers[index]], positions[index]): distances[index]
+        for index in within
+    }
+
+
+def hits(fiber_ids, positions, distances=None):
+    if distances is None:
+        distances = np.zeros(len(fiber_ids))
+    return dict(zip(zip(fiber_ids, positions.tolist()), distances))
+
+
+def assert_matches(grid, fibers, rng):
+    for point in rng.uniform(-400.0, 2400.0, (30, 3)):
+        for radius in [10.0, 150.0, 700.0]:
+            expected = brute_force(fibers, point, radius)
+            found = hits(*grid.radius(point, radius))
+            assert found.keys() == expected.keys()
+            for key, distance in found.items():
+                assert np.isclose(distance, expected[key])
+        fiber_id, position, distance = grid.nearest(point)
+        assert np.isclose(distance, min(brute_force(fibers, point, np.inf).values()))
+
+
+def test_queries_match_brute_force():
+    fibers = network()
+    grid = SegmentGrid([4, 4, 4], [500.0] * 3)
+    assert grid.nearest([0.0, 0.0, 0.0]) is None
+    assert grid.update(fibers) == 300
+    assert_matches(grid, fibers, np.random.default_rng(1))
+
+    lower, upper = np.array([400.0, 300.0, 900.0]), np.array([900.0, 1000.0, 1100.0])
+    starts, ends, segment_fibers, positions = fiber_segments(
+        fibers.points, fibers.offsets
+    )
+    inside = np.flatnonzero(segment_box_overlap(starts, ends, lower, upper))
+    expected = {
+        (fibers.fiber_ids[segment_fibers[index]], positions[index]) for index in inside
+    }
+    assert expected and hits(*grid.box(lower, upper)).keys() == expected
+
+    # a segment crossing the box with both ends outside it
+    crossing = segment_box_overlap(
+        np.array([[0.0, 500.0, 1000.0]]),
+        np.array([[2000.0, 500.0, 1000.0]]),
+        lower,
+        upper,
+    )
+    assert crossing.tolist() == [True]
+
+
+def test_incremental_update():
+    fibers = network()
+    grid = SegmentGrid([4, 4, 4], [500.0] * 3)
+    grid.update(fibers)
+    moved = fibers.to_dict()
+    moved["3"] = {**moved["3"], "points": moved["3"]["points"] + 100.0}
+    del moved["5"]
+    moved["new"] = {
+        "type_name": "Actin-Polymer",
+        "points": [[1.0, 2.0, 3.0], [9.0, 9.0, 9.0]],
+    }
+    moved = FiberArrays.from_dict(moved)
+    assert grid.update(moved) == 2
+    assert_matches(grid, moved, np.random.default_rng(2))
+
+    rebuilt = SegmentGrid([4, 4, 4], [500.0] * 3)
+    rebuilt.update(moved)
+    assert len(rebuilt) == len(grid)
+    assert np.array_equal(rebuilt.cell_offsets, grid.cell_offsets)
+
+
+def test_process_index(tmp_path, fake_medyan):
+    medyan = fake_medyan(tmp_path, spatial_index=True)
+    update = medyan.next_update(10.0, initial_fibers)
+    fibers = FiberArrays.from_dict(update["fibers"])
+    grid = medyan.spatial_index
+    assert grid.n_cells.tolist() == [15, 15, 15]
+    point = fibers.points[0] + 5.0
+    expected = brute_force(fibers, point, 50.0)
+    assert expected and hits(*grid.radius(point, 50.0)).keys() == expected.keys()
@@ -0,0 +1,43 @@
+import os
+
+from vivarium_medyan.library.staging import StagingCache
+
+
+def test_stage_file_only_when_changed(tmp_path):
+    source = tmp_path / "chemistryinput.txt"
+    destination = tmp_path / "staged.txt"
+    source.write_text("SPECIESFILAMENT: FA 0\n")
+    staging = StagingCache()
+    assert staging.stage_file(source, destination)
+    assert not staging.stage_file(source, destination)
+
+    source.write_text("SPECIESFILAMENT: FA 1\n")
+    os.utime(source, ns=(0, 1))
+    assert staging.stage_file(source, destination)
+    assert destination.read_text() == "SPECIESFILAMENT: FA 1\n"
+
+    destination.unlink()
+    assert staging.stage_file(source, destination)
+    assert staging.stats["files_written"] == 3
+    assert staging.stats["files_skipped"] == 1
+
+
+def test_hardlink_and_disabled(tmp_path):
+    source = tmp_path / "source.txt"
+    source.write_text("NX: 15\n")
+    linked = StagingCache(hardlink=True)
+    linked.stage_file(source, tmp_path / "linked.txt")
+    assert os.path.samefile(source, tmp_path / "linked.txt")
+
+    disabled = StagingCache(enabled=False)
+    assert disabled.write_text(tmp_path / "system.txt", "RUNTIME: 1.0")
+    assert disabled.write_text(tmp_path / "system.txt", "RUNTIME: 1.0")
+
+
+def test_write_text_only_when_changed(tmp_path):
+    destination = tmp_path / "systeminput.txt"
+    staging = StagingCache()
+    assert staging.write_text(destination, "RUNTIME: 1.0")
+    assert not staging.write_text(destination, "RUNTIME: 1.0")
+    assert staging.write_text(destination, "RUNTIME: 2.0")
+    assert destination.read_text() == "RUNTIME: 2.0"
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from vivarium_medyan.data.fibers import initial_fibers
+from vivarium_medyan.library.system_input import SystemInput
+from vivarium_medyan.processes.medyan import MedyanProcess
+
+SYSTEM_TEXT = """NX:                          15
+NY:                          15
+NZ:                          10
+#NX:                         99
+
+COMPARTMENTSIZEX:            500.0
+COMPARTMENTSIZEY:            500.0
+COMPARTMENTSIZEZ:            250.0
+RUNTIME:                     10.0
+OUTPUTTYPE:                  FORCES
+OUTPUTTYPE:                  TENSIONS
+SNAPSHOTTIME:                1.0
+"""
+
+
+def test_parse():
+    system_input = SystemInput.parse(SYSTEM_TEXT)
+    assert system_input.text == SYSTEM_TEXT
+    assert system_input.n_compartments.tolist() == [15, 15, 10]
+    assert system_input.box_extent.tolist() == [7500.0, 7500.0, 2500.0]
+    assert system_input.runtime == 10.0
+    assert system_input.output_types == ["forces", "tensions"]
+    assert "NDIM" not in system_input
+    assert np.array_equal(
+        system_input.box_extent, MedyanProcess.read_box_extent(SYSTEM_TEXT)
+    )
+
+
+def test_overrides():
+    system_input = SystemInput.parse(SYSTEM_TEXT)
+    changed = system_input.with_values(
+        {"NX": 20, "COMPARTMENTSIZEZ": 100, "OUTPUTTYPE": ["chemistry"]}
+    )
+    assert changed.box_extent.tolist() == [10000.0, 7500.0, 1000.0]
+    assert changed.output_types == ["chemistry"]
+    assert changed.lines[0] == "NX:                          20"
+    assert changed.lines[3] == "#NX:                         99"
+    assert "OUTPUTTYPE:                  CHEMISTRY\nSNAPSHOTTIME" in changed.text
+    # the original is unchanged
+    assert system_input.box_extent.tolist() == [7500.0, 7500.0, 2500.0]
+    assert SystemInput.parse(changed.text).entries == changed.entries
+
+    for values in [{"NX": 2.5}, {"NY": 0}, {"RUNTIME": -1.0}, {"OUTPUTTYPE": "x"}]:
+        with pytest.raises(ValueError):
+            system_input.with_values(values)
+    with pytest.raises(KeyError):
+        system_input.with_values({"BOUNDARYSHAPE": "CUBIC"})
+
+
+def test_process_overrides(tmp_path, fake_medyan):
+    with pytest.raises(ValueError):
+        fake_medyan(tmp_path, system_overrides={"NX": -1})
+    with pytest.raises(ValueError):
+        fake_medyan(tmp_path, system_overrides={"RUNTIME": 5.0})
+    with pytest.raises(KeyError):
+        fake_medyan(tmp_path, system_overrides={"NXX": 5})
+
+    medyan = fake_medyan(
+        tmp_path, system_overrides={"NX": 10, "COMPARTMENTSIZEY": 400.0}
+    )
+    update = medyan.next_update(10.0, initial_fibers)
+    assert update["fibers_box_extent"].tolist() == [5000.0, 6000.0, 7500.0]
+    system_text = (medyan.input_path / "systeminput.txt").read_text()
+    assert medyan.read_box_extent(system_text).tolist() == [5000.0, 6000.0, 7500.0]
+
+    # the template is rendered once; other timesteps only change RUNTIME
+    medyan.render_template(5.0)
+    assert medyan.system_input.runtime == 5.0
+    assert len(medyan._rendered_templates) == 3
+    assert medyan.chemistry_input.values("SPECIESFILAMENT") == ["FA 0"]
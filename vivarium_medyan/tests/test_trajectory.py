@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from vivarium.core.engine import Engine
+
+from vivarium_medyan.data.fibers import initial_fiber_arrays, initial_fibers
+from vivarium_medyan.library.fiber_arrays import FiberArrays
+from vivarium_medyan.library.trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def random_fibers(n_fibers, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        str(fiber_id): {
+            "type_name": ["Actin", "Tubulin"][fiber_id % 2],
+            "points": rng.uniform(0.0, 10.0, (fiber_id % 4 + 1, 3)),
+        }
+        for fiber_id in range(n_fibers)
+    }
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(tmp_path, compress):
+    frames = [(float(step), random_fibers(5 + step, step)) for step in range(7)]
+    with TrajectoryWriter(tmp_path, chunk_size=3, compress=compress) as writer:
+        for time, fibers in frames:
+            writer.append(time, fibers, box_extent=[1.0, 2.0, 3.0])
+
+    reader = TrajectoryReader(tmp_path)
+    assert len(reader) == 7
+    assert reader.times.tolist() == [time for time, _ in frames]
+    for index in [4, 0, 6, -1]:
+        time, fibers = reader[index]
+        assert (time, fibers) == (
+            frames[index][0],
+            FiberArrays.from_dict(frames[index][1]),
+        )
+    assert isinstance(reader.chunk(0)["points"], np.memmap) != compress
+    assert reader.frame_at(2.5)[0] == 2.0
+    assert reader.box_extent(5).tolist() == [1.0, 2.0, 3.0]
+    with pytest.raises(IndexError):
+        reader.frame(7)
+
+    # appending continues after the existing chunks
+    with TrajectoryWriter(tmp_path, chunk_size=3) as writer:
+        writer.append(7.0, random_fibers(2, 7))
+    assert len(TrajectoryReader(tmp_path)) == 8
+
+
+@pytest.mark.parametrize("representation", ["dict", "arrays"])
+def test_emitter(tmp_path, fake_medyan, representation):
+    medyan = fake_medyan(
+        tmp_path,
+        transform_points=[0.0, 0.0, 0.0],
+        fiber_representation=representation,
+    )
+    engine = Engine(
+        processes={"medyan": medyan},
+        topology={
+            "medyan": {
+                "fibers": ("fibers",),
+                "fibers_box_extent": ("fibers_box_extent",),
+            }
+        },
+        initial_state=(
+            initial_fiber_arrays if representation == "arrays" else initial_fibers
+        ),
+        emitter={"type": "fiber_trajectory", "path": str(tmp_path / "trajectory")},
+    )
+    engine.update(20.0)
+    engine.emitter.close()
+
+    reader = TrajectoryReader(tmp_path / "trajectory")
+    assert reader.times.tolist() == [0.0, 10.0, 20.0]
+    assert reader.type_names == ["Actin-Polymer"]
+    assert reader.box_extent(-1).tolist() == [7500.0, 7500.0, 7500.0]
+    data = engine.emitter.get_data()
+    assert len(data[0.0]["fibers"]) == len(initial_fibers["fibers"])
+    if representation == "arrays":
+        fibers = reader[-1][1]
+        assert np.allclose(fibers.points, initial_fiber_arrays["fibers"].points)